@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The wmx_* modules live at the repository root, one level up: put it on the import path explicitly, so that the
+# tests import them whatever the directory pytest is started from.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,35 @@
+from wmx_metrics import Tracer
+
+
+def test_retain_drops_the_series_of_closed_tables_only():
+    tracer = Tracer()
+    tracer.record("window_scan", 0.0, 0.001)
+    for hwnd in (101, 202, 303):
+        with tracer.span("table_update", hwnd):
+            pass
+
+    assert tracer.retain([202]) == {101, 303}
+
+    summary = tracer.summary()
+    assert list(summary["tables"]["table_update"]) == ["202"]
+    assert summary["stages"]["window_scan"]["count"] == 1
+
+
+def test_only_stage_spans_go_to_the_trace():
+    tracer = Tracer()
+    with tracer.span("window_scan"):
+        with tracer.span("table_update", 101):
+            pass
+    tracer.tick()
+
+    assert [event["name"] for event in tracer.chrome_trace()["traceEvents"]] == ["window_scan"]
+
+
+def test_disabled_tracer_hands_back_the_function():
+    tracer = Tracer(enabled=False)
+    fn = lambda: 42
+
+    assert tracer.wrap("stage", fn) is fn
+    with tracer.span("table_update", 101):
+        pass
+    assert tracer.summary() == {"stages": {}, "tables": {}}
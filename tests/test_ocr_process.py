@@ -0,0 +1,47 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from wmx_ocr import FallbackEngine, FakeEngine, ProcessEngine, make_stat_strip
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Suspends the OCR process with SIGSTOP")
+
+
+@pytest.fixture
+def engine():
+    engine = ProcessEngine("fake", timeout=0.5, restart_delay=0)
+    yield engine
+    engine.close()
+
+
+def test_a_hung_process_is_killed_and_started_again(engine):
+    strip = make_stat_strip()
+    os.kill(engine._proc.pid, signal.SIGSTOP)
+
+    with pytest.raises(RuntimeError, match="timed out"):
+        engine.image_to_string(strip)
+
+    assert engine.image_to_string(strip) == "Statistiques"
+    assert engine.restarts == 1
+
+
+def test_the_fallback_answers_while_the_process_hangs(engine):
+    fallback = FallbackEngine(engine, FakeEngine("fallback"))
+    os.kill(engine._proc.pid, signal.SIGSTOP)
+
+    assert fallback.image_to_string(make_stat_strip()) == "fallback"
+    assert fallback.fallback_calls == 1
+
+
+def test_no_restart_before_the_restart_delay():
+    engine = ProcessEngine("fake", timeout=0.5, restart_delay=60)
+    try:
+        engine._proc.kill()
+        engine._proc.wait()
+        with pytest.raises(RuntimeError, match="down"):
+            engine.image_to_string(make_stat_strip())
+        assert engine.restarts == 0
+    finally:
+        engine.close()
@@ -0,0 +1,14 @@
+import pytest
+
+from wmx_ocr_profiles import OCRProfile
+
+
+@pytest.mark.parametrize("binarize", ["adaptive", 300, -1, True, [128]])
+def test_an_invalid_binarization_raises_value_error(binarize):
+    with pytest.raises(ValueError, match="Binarization"):
+        OCRProfile("test", binarize=binarize)
+
+
+@pytest.mark.parametrize("binarize", [None, "otsu", 0, 128, 127.5, 255])
+def test_valid_binarizations_are_accepted(binarize):
+    assert OCRProfile("test", binarize=binarize).binarize == binarize
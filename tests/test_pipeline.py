@@ -0,0 +1,114 @@
+import time
+import threading
+import pytest
+from wmx_pipeline import Pipeline
+from wmx_scheduler import DeadlineScheduler
+
+@pytest.fixture
+def make_pipeline():
+    pipelines = []
+
+    def make(*tasks):
+        scheduler = DeadlineScheduler()
+        for name, fn, interval in tasks:
+            scheduler.add(name, fn, interval=interval)
+        pipeline = Pipeline(scheduler)
+        pipeline.start()
+        pipelines.append(pipeline)
+        return pipeline
+
+    yield make
+    for pipeline in pipelines:
+        assert pipeline.stop(timeout=5)
+
+def post_and_wait(pipeline, timeout=2.0):
+    """
+    Post a call and return the time until it ran on the pipeline thread.
+    """
+    ran = threading.Event()
+    start = time.perf_counter()
+    pipeline.post(ran.set)
+    assert ran.wait(timeout)
+    return time.perf_counter() - start
+
+def test_post_wakes_the_sleeping_pipeline(make_pipeline):
+    pipeline = make_pipeline(("detection", lambda: None, 10.0)) # Next stage due in 10 s
+    time.sleep(0.05) # Let the pipeline run the first pass and go to sleep
+    assert post_and_wait(pipeline) < 0.1
+
+def test_click_waits_for_the_running_stage_only(make_pipeline):
+    stage_time = 0.2
+    started = threading.Event()
+
+    def busy_stage():
+        started.set()
+        time.sleep(stage_time)
+
+    pipeline = make_pipeline(("detection", busy_stage, 10.0))
+    assert started.wait(2)
+    # Posted during the stage: handled when the stage ends, not after the loop interval
+    assert post_and_wait(pipeline) < stage_time + 0.1
+
+def test_post_does_not_block_the_gui_thread(make_pipeline):
+    started = threading.Event()
+
+    def busy_stage():
+        started.set()
+        time.sleep(0.3)
+
+    pipeline = make_pipeline(("detection", busy_stage, 10.0))
+    assert started.wait(2)
+    start = time.perf_counter()
+    pipeline.post(lambda: None)
+    assert time.perf_counter() - start < 0.01
+
+def test_reschedule_soon_coalesces_bursts(make_pipeline):
+    runs = []
+    pipeline = make_pipeline(("window_scan", lambda: runs.append(1), 10.0))
+    post_and_wait(pipeline)
+    post_and_wait(pipeline) # Runs on the pass after the first run of the stage
+    runs.clear()
+    release = threading.Event()
+    pipeline.post(release.wait, 2) # Hold the pipeline while the burst arrives
+    for _ in range(50): # Events of a window being dragged
+        pipeline.reschedule_soon("window_scan")
+    release.set()
+    post_and_wait(pipeline)
+    post_and_wait(pipeline)
+    assert runs == [1]
+
+def test_failing_posted_call_does_not_stop_the_pipeline(make_pipeline):
+    pipeline = make_pipeline(("detection", lambda: None, 10.0))
+    pipeline.post(lambda: 1 / 0)
+    assert post_and_wait(pipeline) < 0.5
+
+def test_calls_posted_before_stop_still_run():
+    scheduler = DeadlineScheduler()
+    scheduler.add("detection", lambda: time.sleep(0.1), interval=10.0)
+    pipeline = Pipeline(scheduler)
+    pipeline.start()
+    saved = []
+    pipeline.post(saved.append, "last click")
+    assert pipeline.stop(timeout=5)
+    assert saved == ["last click"]
+
+def test_the_pipeline_thread_closes_its_own_grabber():
+    from wmx_capture import CaptureService, FramebufferBackend, make_framebuffer
+    framebuffer = make_framebuffer(64, 64)
+    closed_by = []
+
+    class Backend(FramebufferBackend):
+        def close(self):
+            closed_by.append(threading.current_thread().name)
+
+    service = CaptureService(lambda: Backend(framebuffer))
+    scheduler = DeadlineScheduler()
+    scheduler.add("probe", lambda: service.pixel(1, 1), interval=0.01)
+    pipeline = Pipeline(scheduler, on_exit=service.close_thread)
+    pipeline.start()
+    time.sleep(0.05)
+    assert pipeline.stop(timeout=5)
+    service.close() # Main thread: no grabber of its own, nothing closed from here
+
+    assert closed_by == ["pipeline"]
+    assert service.grab_count >= 1
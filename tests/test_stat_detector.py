@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+
+from wmx_stat_detector import StatDetector, StatTemplateMatcher, first_word_box
+from wmx_ocr_profiles import OCRProfile
+
+
+def strip(*words):
+    """Dark 400x50 strip with light words drawn at the given x positions."""
+    img = np.full((50, 400), 35, dtype=np.uint8)
+    for text, x in words:
+        cv2.putText(img, text, (x, 34), cv2.FONT_HERSHEY_SIMPLEX, 0.9, 230, 2, cv2.LINE_AA)
+    return img
+
+
+def test_template_is_learned_at_the_located_word_not_the_leftmost_one():
+    stat_box = first_word_box(strip(("Statistiques", 150)))
+    detector = StatDetector(StatTemplateMatcher(), template_path=None)
+
+    assert detector.detect(strip(("Lobby", 10), ("Statistiques", 150)), lambda: True, lambda: stat_box)
+
+    assert detector.stats()["learned"] == 1
+    assert detector.matcher.decide(strip(("Statistiques", 60)))[0] is True
+    assert detector.matcher.decide(strip(("Lobby", 60)))[0] is False
+
+
+def test_no_template_is_learned_when_the_word_is_not_located():
+    detector = StatDetector(StatTemplateMatcher(), template_path=None)
+
+    assert detector.detect(strip(("Statistiques", 10)), lambda: True, lambda: None)
+    assert detector.detect(strip(("Statistiques", 10)), lambda: True)
+
+    assert detector.matcher.template is None
+    assert detector.stats()["learned"] == 0
+
+
+def test_profile_boxes_map_back_to_the_capture():
+    profile = OCRProfile("test", crop=(20, 5, 380, 45), scale=2, pad=10).compile()
+
+    # A word at (50, 12) 100x20 in the capture is at ((50 - 20) * 2 + 10, (12 - 5) * 2 + 10) 200x40 after apply()
+    assert profile.source_box((70, 24, 200, 40), (50, 400, 3)) == (50, 12, 100, 20)
+
+
+def test_learned_template_is_saved_apart_from_the_shipped_one(tmp_path):
+    shipped = tmp_path / "Assets" / "stat_word.png"
+    shipped.parent.mkdir()
+    shipped_crop = strip(("Statistiques", 10))[10:40, 5:180]
+    cv2.imwrite(str(shipped), shipped_crop)
+    learned = tmp_path / "user" / "WinamaxOCR" / "stat_word.png"
+
+    matcher = StatTemplateMatcher.load(str(learned), str(shipped))
+    assert np.array_equal(matcher.template, shipped_crop)
+
+    detector = StatDetector(matcher, template_path=str(learned))
+    detector.matcher.template = None # As after a contradiction by the OCR
+    detector.detect(strip(("Statistiques", 150)), lambda: True, lambda: first_word_box(strip(("Statistiques", 150))))
+
+    assert learned.exists()
+    assert np.array_equal(cv2.imread(str(shipped), cv2.IMREAD_GRAYSCALE), shipped_crop)
+    assert np.array_equal(StatTemplateMatcher.load(str(learned), str(shipped)).template, detector.matcher.template)
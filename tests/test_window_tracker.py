@@ -0,0 +1,95 @@
+import pytest
+from wmx_window_tracker import ScriptedEventSource, WindowTracker
+
+WMX_PID = 4242
+OTHER_PID = 1000
+
+@pytest.fixture
+def desktop():
+    source = ScriptedEventSource()
+    source.create_window(0x10, OTHER_PID, "Notepad")
+    source.create_window(0x1000, WMX_PID, "Winamax")
+    tracker = WindowTracker(source)
+    tracker.start()
+    tracker.set_pids([WMX_PID])
+    return source, tracker
+
+def resynced(source, pids):
+    """
+    Model rebuilt from scratch by a fresh tracker, the reference for the incremental one.
+    """
+    tracker = WindowTracker(source)
+    tracker.set_pids(pids)
+    return sorted(tracker.windows())
+
+def test_initial_resync_tracks_winamax_windows_only(desktop):
+    source, tracker = desktop
+    assert tracker.windows() == [(0x1000, "Winamax")]
+
+def test_create_and_destroy(desktop):
+    source, tracker = desktop
+    source.create_window(0x2000, WMX_PID, "Table 1")
+    source.create_window(0x2001, WMX_PID, "Table 2")
+    source.create_window(0x11, OTHER_PID, "Browser")
+    assert sorted(tracker.windows()) == [(0x1000, "Winamax"), (0x2000, "Table 1"), (0x2001, "Table 2")]
+    source.destroy_window(0x2000)
+    assert sorted(tracker.windows()) == [(0x1000, "Winamax"), (0x2001, "Table 2")]
+    assert sorted(tracker.windows()) == resynced(source, [WMX_PID])
+
+def test_rename_updates_title_and_version(desktop):
+    source, tracker = desktop
+    source.create_window(0x2000, WMX_PID, "Table 1")
+    version = tracker.version
+    source.rename_window(0x2000, "Table 1 - Kill The Fish")
+    assert tracker.info(0x2000).title == "Table 1 - Kill The Fish"
+    assert tracker.version > version
+    assert sorted(tracker.windows()) == resynced(source, [WMX_PID])
+
+def test_move_updates_rect(desktop):
+    source, tracker = desktop
+    source.move_window(0x1000, (10, 20, 1424, 820))
+    assert tracker.info(0x1000).rect == (10, 20, 1424, 820)
+
+def test_pid_change_resyncs(desktop):
+    source, tracker = desktop
+    new_pid = 5151 # Winamax restarted
+    source.destroy_window(0x1000)
+    source.create_window(0x3000, new_pid, "Winamax") # Created before the registry sees the new PID: not tracked yet
+    assert tracker.windows() == []
+    resyncs = tracker.resyncs
+    tracker.set_pids([new_pid])
+    assert tracker.resyncs == resyncs + 1
+    assert tracker.windows() == [(0x3000, "Winamax")]
+    tracker.set_pids([new_pid]) # Same PIDs: no resync
+    assert tracker.resyncs == resyncs + 1
+    source.create_window(0x3001, WMX_PID, "Stale table of the old process")
+    assert sorted(tracker.windows()) == resynced(source, [new_pid])
+
+def test_child_windows_are_not_tracked(desktop):
+    source, tracker = desktop
+    source.create_window(0x1001, WMX_PID, "Chrome_RenderWidgetHostHWND", parent=0x1000)
+    source.rename_window(0x1001, "Child renamed")
+    assert tracker.windows() == [(0x1000, "Winamax")]
+    assert sorted(tracker.windows()) == resynced(source, [WMX_PID])
+
+def test_foreign_windows_cost_a_pid_check_only(desktop):
+    source, tracker = desktop
+    queries = source.queries
+    for i in range(20):
+        source.create_window(0x100 + i, OTHER_PID, f"Window {i}")
+        source.rename_window(0x100 + i, f"Window {i} renamed")
+    assert source.queries == queries # No title or rect read for windows of other processes
+
+def test_scripted_session_matches_resync(desktop):
+    source, tracker = desktop
+    source.play([
+        ("create_window", 0x2000, WMX_PID, "Table 1"),
+        ("create_window", 0x2001, WMX_PID, "Table 2"),
+        ("move_window", 0x2001, (100, 100, 900, 660)),
+        ("set_foreground", 0x2001),
+        ("rename_window", 0x2000, "Table 1 (2)"),
+        ("destroy_window", 0x2001),
+        ("create_window", 0x2002, WMX_PID, "Table 3"),
+    ])
+    assert sorted(tracker.windows()) == resynced(source, [WMX_PID])
+    assert tracker.foreground == 0x2001
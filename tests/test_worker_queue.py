@@ -0,0 +1,32 @@
+import threading
+
+from wmx_ocr_executor import OCRExecutor
+
+
+def test_a_full_queue_drops_the_oldest_pending_job():
+    release = threading.Event()
+    executor = OCRExecutor(workers=1, max_queue=2)
+    blocker = executor.submit(release.wait)
+    while executor.queue_depth(): # Wait for the worker to take the blocking job
+        pass
+    oldest, middle, newest = (executor.submit(lambda value=value: value) for value in range(3))
+    release.set()
+    executor.shutdown(wait=True, cancel_pending=False)
+
+    assert blocker.result() is True
+    assert oldest.cancelled()
+    assert (middle.result(), newest.result()) == (1, 2)
+    assert executor.metrics()["dropped"] == 1
+
+
+def test_flush_waits_for_the_running_job_and_metrics_share_one_format():
+    executor = OCRExecutor(workers=2, max_queue=4)
+    futures = [executor.submit(sum, [i, i]) for i in range(4)]
+
+    assert executor.flush(timeout=5)
+    assert [future.result() for future in futures] == [0, 2, 4, 6]
+    metrics = executor.metrics()
+    executor.shutdown()
+
+    assert metrics["completed"] == 4
+    assert {"latency_p50_ms", "latency_p95_ms", "run_p50_ms", "run_p95_ms"} <= set(metrics)
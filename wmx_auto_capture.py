@@ -0,0 +1,160 @@
+import time
+from collections import deque
+import numpy as np
+
+# Auto-capture #
+# Optional mode archiving the table results without a click: when the result frame of a table appears, a capture is
+# scheduled after a short debounce (the popup has settled, and a flicker of the probe does not trigger it), and a
+# perceptual hash of the capture keeps the same popup from being saved twice.
+
+def perceptual_hash(image):
+    """
+    64-bit difference hash (dHash) of a BGR/BGRA capture or a grayscale image.
+    The image is reduced to 8x9 block means, then each bit tells whether a block is brighter than its right
+    neighbour: robust to small shifts, JPEG compression and brightness changes.
+    """
+    gray = image[..., 1] if image.ndim == 3 else image # Green channel, close enough to the luminance
+    height, width = gray.shape
+    if height < 8 or width < 9:
+        return 0
+    gray = gray[:height - height % 8, :width - width % 9].astype(np.float32)
+    blocks = gray.reshape(8, gray.shape[0] // 8, 9, gray.shape[1] // 9).mean(axis=(1, 3))
+    bits = blocks[:, 1:] > blocks[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+class AutoCapture:
+    """
+    Debounce and deduplication of the automatic table result captures.
+    Parameters:
+    - debounce (float): Seconds the result frame must stay displayed before it is captured.
+    - hash_threshold (int): Maximum Hamming distance between the hashes of two captures of the same popup.
+    - history (int): Number of hashes kept per table.
+    """
+
+    def __init__(self, debounce=0.5, hash_threshold=6, history=4, clock=time.monotonic):
+        self.debounce = debounce
+        self.hash_threshold = hash_threshold
+        self.history = history
+        self.clock = clock
+        self._shown = set() # Tables whose result frame is displayed
+        self._pending = {} # {hwnd: due time}
+        self._hashes = {} # {hwnd: deque of the hashes of the last saved captures}
+        self.scheduled = 0
+        self.cancelled = 0
+        self.captured = 0
+        self.duplicates = 0
+
+    def on_probe(self, hwnd, displayed):
+        """
+        Record the result of the pixel probe of a table: a capture is scheduled when the result frame appears,
+        and cancelled if it disappears before the debounce delay.
+        """
+        if displayed:
+            if hwnd not in self._shown:
+                self._shown.add(hwnd)
+                self._pending[hwnd] = self.clock() + self.debounce
+                self.scheduled += 1
+        elif hwnd in self._shown:
+            self._shown.discard(hwnd)
+            if self._pending.pop(hwnd, None) is not None:
+                self.cancelled += 1
+
+    def due(self):
+        """
+        Return the tables whose result frame has been displayed for the debounce delay, and forget them.
+        """
+        if not self._pending:
+            return []
+        now = self.clock()
+        hwnds = [hwnd for hwnd, deadline in self._pending.items() if deadline <= now]
+        for hwnd in hwnds:
+            del self._pending[hwnd]
+        return hwnds
+
+    def accept(self, hwnd, image):
+        """
+        Tell whether a capture of a table should be saved: False if it matches a recent capture of the same table.
+        Accepted captures are remembered.
+        """
+        image_hash = perceptual_hash(image)
+        hashes = self._hashes.setdefault(hwnd, deque(maxlen=self.history))
+        if any(hamming_distance(image_hash, known) <= self.hash_threshold for known in hashes):
+            self.duplicates += 1
+            return False
+        hashes.append(image_hash)
+        self.captured += 1
+        return True
+
+    def retain(self, hwnds):
+        """
+        Forget the tables not in `hwnds` (closed tables).
+        """
+        hwnds = set(hwnds)
+        for hwnd in [hwnd for hwnd in self._hashes if hwnd not in hwnds]:
+            del self._hashes[hwnd]
+        for hwnd in [hwnd for hwnd in self._pending if hwnd not in hwnds]:
+            del self._pending[hwnd]
+        self._shown &= hwnds
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "scheduled": self.scheduled,
+            "cancelled": self.cancelled,
+            "captured": self.captured,
+            "duplicates": self.duplicates,
+        }
+
+def benchmark_auto_capture(table_counts=(12, 24), ticks=2000, tick=0.05, width=420, height=260, seed=0):
+    """
+    Per-tick overhead of the auto-capture mode with many tables: probe bookkeeping every tick, plus the grab and the
+    perceptual hash of each debounced capture (the encoding runs on the screenshot writer thread and is not counted).
+    Results appear at random, stay a few seconds, flicker sometimes and sometimes come back with the same popup.
+    """
+    import random
+    from wmx_scheduler import ManualClock
+    from wmx_capture import FramebufferBackend, make_framebuffer
+
+    backend = FramebufferBackend(make_framebuffer())
+    for num_tables in table_counts:
+        rng = random.Random(seed)
+        clock = ManualClock()
+        auto_capture = AutoCapture(clock=clock)
+        tables = list(range(num_tables))
+        displayed = {hwnd: 0 for hwnd in tables} # Ticks left with the result displayed
+        popup = {hwnd: 0 for hwnd in tables} # Index of the popup shown (a new result is a new popup)
+
+        probe_time = capture_time = 0.0
+        for _ in range(ticks):
+            for hwnd in tables:
+                if displayed[hwnd]:
+                    displayed[hwnd] -= 1
+                elif rng.random() < 0.01:
+                    displayed[hwnd] = rng.randint(20, 80)
+                    if rng.random() < 0.8:
+                        popup[hwnd] += 1 # Otherwise the same popup is shown again
+            states = {hwnd: displayed[hwnd] > 0 and rng.random() > 0.02 for hwnd in tables} # 2% probe flicker
+
+            start = time.perf_counter()
+            for hwnd, state in states.items():
+                auto_capture.on_probe(hwnd, state)
+            due = auto_capture.due()
+            probe_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for hwnd in due:
+                left = (hwnd * 37 + popup[hwnd] * 101) % (1920 - width)
+                auto_capture.accept(hwnd, backend.grab(left, 100, width, height))
+            capture_time += time.perf_counter() - start
+            clock.sleep(tick)
+
+        stats = auto_capture.stats()
+        print(f"{num_tables} tables, {ticks} ticks: bookkeeping {probe_time / ticks * 1e6:.1f} us/tick, "
+              f"grab + hash {capture_time / ticks * 1e6:.1f} us/tick ({capture_time / max(1, stats['captured'] + stats['duplicates']) * 1e3:.2f} ms/capture) | "
+              f"{stats['captured']} saved, {stats['duplicates']} duplicates skipped, {stats['cancelled']} cancelled by a flicker")
+
+if __name__ == "__main__":
+    benchmark_auto_capture()
@@ -0,0 +1,177 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Buffer pool #
+# Reusable NumPy buffers for the captures made over and over at the same size (Stat strip, Playground digit crop,
+# result rectangles), checked out and returned explicitly. The pool never holds more than max_bytes: the free buffers
+# of the least recently used shapes are released to make room, and a checkout that still does not fit is refused.
+
+class PoolExhausted(MemoryError):
+    """
+    Raised when a checkout would take the pool over its memory ceiling.
+    """
+
+class BufferPool:
+    """
+    Shape-keyed pool of NumPy buffers with a hard memory ceiling.
+    Parameters:
+    - max_bytes (int): Ceiling on the memory of all the buffers of the pool, checked out or free.
+    - max_free_per_shape (int): Number of free buffers kept per shape, the others are released on return.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, max_free_per_shape=4):
+        self.max_bytes = max_bytes
+        self.max_free_per_shape = max_free_per_shape
+        self._free = OrderedDict() # {(shape, dtype): [buffers]}, least recently used shape first
+        self._out = {} # {id(buffer): (key, buffer)} of the checked out buffers
+        self._lock = threading.Lock()
+        self.nbytes = 0 # Memory of every buffer of the pool
+        self.in_use_bytes = 0 # Memory of the checked out buffers
+        self.high_water_bytes = 0
+        self.high_water_in_use_bytes = 0
+        self.checkouts = 0
+        self.reused = 0
+        self.allocated = 0
+        self.released = 0 # Free buffers given back to the allocator (over max_free_per_shape or for room)
+        self.refused = 0
+
+    def checkout(self, shape, dtype=np.uint8):
+        """
+        Take a buffer of the given shape and dtype (contents undefined), reusing a returned one when possible.
+        Raises PoolExhausted if the pool would go over max_bytes.
+        """
+        shape = tuple(int(n) for n in shape)
+        dtype = np.dtype(dtype)
+        key = (shape, dtype.str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                self._free.move_to_end(key)
+                self.reused += 1
+            else:
+                size = int(np.prod(shape)) * dtype.itemsize
+                self._make_room(size)
+                if self.nbytes + size > self.max_bytes:
+                    self.refused += 1
+                    raise PoolExhausted(f"Buffer pool full: {shape} {dtype} needs {size} bytes, {self.in_use_bytes} "
+                                        f"of {self.max_bytes} bytes checked out")
+                buffer = np.empty(shape, dtype)
+                self.nbytes += size
+                self.allocated += 1
+                self.high_water_bytes = max(self.high_water_bytes, self.nbytes)
+            self._out[id(buffer)] = (key, buffer)
+            self.in_use_bytes += buffer.nbytes
+            self.high_water_in_use_bytes = max(self.high_water_in_use_bytes, self.in_use_bytes)
+            self.checkouts += 1
+        return buffer
+
+    def _make_room(self, size):
+        # Release free buffers, least recently used shapes first, until `size` more bytes fit under the ceiling
+        while self.nbytes + size > self.max_bytes and self._free:
+            key, free = next(iter(self._free.items()))
+            if not free:
+                del self._free[key]
+                continue
+            self.nbytes -= free.pop().nbytes
+            self.released += 1
+
+    def checkin(self, buffer):
+        """
+        Return a checked out buffer. It must not be used afterwards.
+        """
+        with self._lock:
+            entry = self._out.pop(id(buffer), None)
+            if entry is None or entry[1] is not buffer:
+                raise ValueError("Buffer not checked out from this pool (or already returned)")
+            key = entry[0]
+            self.in_use_bytes -= buffer.nbytes
+            free = self._free.setdefault(key, [])
+            self._free.move_to_end(key)
+            if len(free) < self.max_free_per_shape:
+                free.append(buffer)
+            else:
+                self.nbytes -= buffer.nbytes
+                self.released += 1
+
+    def borrow(self, shape, dtype=np.uint8):
+        """
+        Context manager checking a buffer out and in: `with pool.borrow((50, 400, 4)) as buffer:`.
+        """
+        return _Borrowed(self, shape, dtype)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bytes": self.nbytes,
+                "in_use_bytes": self.in_use_bytes,
+                "max_bytes": self.max_bytes,
+                "high_water_bytes": self.high_water_bytes,
+                "high_water_in_use_bytes": self.high_water_in_use_bytes,
+                "checked_out": len(self._out),
+                "shapes": sum(1 for free in self._free.values() if free),
+                "checkouts": self.checkouts,
+                "reused": self.reused,
+                "allocated": self.allocated,
+                "released": self.released,
+                "refused": self.refused,
+            }
+
+class _Borrowed:
+    __slots__ = ("pool", "shape", "dtype", "buffer")
+
+    def __init__(self, pool, shape, dtype):
+        self.pool = pool
+        self.shape = shape
+        self.dtype = dtype
+
+    def __enter__(self):
+        self.buffer = self.pool.checkout(self.shape, self.dtype)
+        return self.buffer
+
+    def __exit__(self, *exc):
+        self.pool.checkin(self.buffer)
+        return False
+
+def benchmark_buffer_pool(ticks=2000, num_tables=12, max_bytes=8 * 1024 * 1024, seed=0):
+    """
+    Buffers allocated over a session of captures (Stat strip and Playground digit crop every tick, a result rectangle
+    of varying size now and then, each released after use) with a new array per capture, against the pool.
+    """
+    import random
+    rng = random.Random(seed)
+    shapes = [(50, 400, 4), (15, 28, 4), (15, 28)] # Stat strip, digit crop and its grayscale conversion
+    result_shapes = [(260 + rng.randrange(-20, 20), 420 + rng.randrange(-20, 20), 4) for _ in range(num_tables)]
+
+    def session(take, give):
+        rng = random.Random(seed) # Same captures for both sessions
+        start = time.perf_counter()
+        for _ in range(ticks):
+            buffers = [take(shape) for shape in shapes]
+            if rng.random() < 0.05:
+                buffers.append(take(result_shapes[rng.randrange(num_tables)]))
+            for buffer in buffers:
+                buffer[0] = 0 # Touch the pages, as a grab would
+            for buffer in buffers:
+                give(buffer)
+        return (time.perf_counter() - start) / ticks
+
+    allocations = [0, 0]
+
+    def take_new(shape):
+        allocations[0] += 1
+        allocations[1] += int(np.prod(shape))
+        return np.empty(shape, np.uint8)
+
+    legacy = session(take_new, lambda buffer: None)
+    pool = BufferPool(max_bytes)
+    pooled = session(pool.checkout, pool.checkin)
+    stats = pool.stats()
+    print(f"{ticks} ticks: new arrays {allocations[0]} allocations ({allocations[1] / 2**20:.1f} MiB), {legacy * 1e6:.1f} us/tick | "
+          f"pool {stats['allocated']} allocations, {stats['reused']} reused, high water {stats['high_water_bytes'] / 1024:.0f} KiB "
+          f"of {max_bytes / 1024:.0f} KiB, {pooled * 1e6:.1f} us/tick")
+
+if __name__ == "__main__":
+    benchmark_buffer_pool()
@@ -0,0 +1,197 @@
+import time
+from collections import namedtuple
+
+# Button layout #
+# Model of the buttons drawn by the overlay windows (one per monitor): which buttons are on which monitor, which
+# screen areas must be repainted after a change, and which button is under a click. Setting a button to the
+# position it already has produces no repaint.
+
+OverlayButton = namedtuple("OverlayButton", ["key", "rect", "hwnd", "on_click"]) # rect = (left, top, right, bottom)
+
+def rect_contains(rect, x, y):
+    return rect[0] <= x < rect[2] and rect[1] <= y < rect[3]
+
+class ButtonLayout:
+    """
+    Buttons of the overlay, in screen coordinates, grouped by monitor.
+    Parameters:
+    - monitors (list): Monitor rectangles (left, top, right, bottom); buttons outside every monitor go to the first one.
+    - button_size (tuple): (width, height) of a button.
+    """
+
+    def __init__(self, monitors, button_size=(100, 100)):
+        self.monitors = list(monitors) or [(0, 0, 0, 0)]
+        self.button_size = button_size
+        self._buttons = {} # {key: OverlayButton}, in drawing order (the last one is on top)
+        self._monitor_of = {} # {key: monitor index}
+        self._dirty = {} # {monitor index: list of screen rects to repaint}
+        self._shape_changed = set() # Monitors whose set of button rects changed (click region to update)
+        self.changes = 0
+        self.unchanged = 0
+
+    def monitor_index(self, x, y):
+        for index, monitor in enumerate(self.monitors):
+            if rect_contains(monitor, x, y):
+                return index
+        return 0
+
+    def _invalidate(self, index, rect):
+        self._dirty.setdefault(index, []).append(rect)
+        self._shape_changed.add(index)
+
+    def set_button(self, key, pos, hwnd, on_click):
+        """
+        Show a button at pos (x, y), or move it there. Returns True if anything changed.
+        """
+        rect = (int(pos[0]), int(pos[1]), int(pos[0]) + self.button_size[0], int(pos[1]) + self.button_size[1])
+        old = self._buttons.get(key)
+        if old is not None and old.rect == rect:
+            if old.hwnd != hwnd or old.on_click is not on_click:
+                self._buttons[key] = old._replace(hwnd=hwnd, on_click=on_click) # Same pixels, no repaint
+            self.unchanged += 1
+            return False
+        if old is not None:
+            self._invalidate(self._monitor_of[key], old.rect)
+        index = self.monitor_index(rect[0], rect[1])
+        self._buttons[key] = OverlayButton(key, rect, hwnd, on_click)
+        self._monitor_of[key] = index
+        self._invalidate(index, rect)
+        self.changes += 1
+        return True
+
+    def remove_button(self, key):
+        """
+        Remove a button. Returns True if it was shown.
+        """
+        old = self._buttons.pop(key, None)
+        if old is None:
+            return False
+        self._invalidate(self._monitor_of.pop(key), old.rect)
+        self.changes += 1
+        return True
+
+    def button(self, key):
+        return self._buttons.get(key)
+
+    def __len__(self):
+        return len(self._buttons)
+
+    def buttons_on(self, index):
+        """
+        Buttons of a monitor, in drawing order.
+        """
+        return [button for key, button in self._buttons.items() if self._monitor_of[key] == index]
+
+    def hit_test(self, x, y):
+        """
+        Return the topmost button under the screen point (x, y), or None.
+        """
+        for button in reversed(list(self._buttons.values())):
+            if rect_contains(button.rect, x, y):
+                return button
+        return None
+
+    def take_dirty(self):
+        """
+        Return and clear the pending changes: ({monitor index: [screen rects to repaint]}, {monitors whose button
+        region changed}).
+        """
+        dirty, shape_changed = self._dirty, self._shape_changed
+        self._dirty, self._shape_changed = {}, set()
+        return dirty, shape_changed
+
+    def set_monitors(self, monitors):
+        """
+        Change the monitor layout (display change): every button is reassigned and every monitor repainted.
+        """
+        self.monitors = list(monitors) or [(0, 0, 0, 0)]
+        for key, button in self._buttons.items():
+            self._monitor_of[key] = self.monitor_index(button.rect[0], button.rect[1])
+        self._dirty = {index: [monitor] for index, monitor in enumerate(self.monitors)}
+        self._shape_changed = set(range(len(self.monitors)))
+
+class Hysteresis:
+    """
+    Debounce of the probe results driving a button: shown on the first positive probe, hidden only after
+    `hide_after` consecutive negative probes, so a flickering probe does not hide and show it again.
+    """
+
+    def __init__(self, hide_after=3):
+        self.hide_after = hide_after
+        self._misses = {} # {key: consecutive negative probes} of the shown buttons
+        self.absorbed = 0 # Negative probes that did not hide a shown button
+
+    def update(self, key, positive):
+        """
+        Record a probe result and return whether the button should be shown.
+        """
+        if positive:
+            self._misses[key] = 0
+            return True
+        misses = self._misses.get(key)
+        if misses is None:
+            return False
+        misses += 1
+        if misses >= self.hide_after:
+            del self._misses[key]
+            return False
+        self._misses[key] = misses
+        self.absorbed += 1
+        return True
+
+    def is_on(self, key):
+        """
+        Whether the button of `key` is currently shown.
+        """
+        return key in self._misses
+
+    def forget(self, key):
+        self._misses.pop(key, None)
+
+def benchmark_button_layout(num_tables=24, ticks=2000, flicker=0.02, hide_after=3, seed=0):
+    """
+    Repaints caused by the table buttons over a session: one window per button, re-positioned (and so repainted) on
+    every positive probe and destroyed on every negative one, against the diffed layout that only repaints the buttons
+    that appeared, moved or vanished, with the hysteresis absorbing the probe flickers.
+    """
+    import random
+    rng = random.Random(seed)
+    layout = ButtonLayout([(0, 0, 1920, 1080), (1920, 0, 3840, 1080)])
+    hysteresis = Hysteresis(hide_after)
+    positions = {hwnd: (rng.randrange(0, 3700), rng.randrange(0, 980)) for hwnd in range(num_tables)}
+    displayed = {hwnd: 0 for hwnd in positions}
+
+    legacy_repaints = legacy_windows = 0
+    shown = set()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for hwnd in positions:
+            if displayed[hwnd]:
+                displayed[hwnd] -= 1
+            elif rng.random() < 0.01:
+                displayed[hwnd] = rng.randint(20, 80)
+            if rng.random() < 0.002: # The table is moved
+                positions[hwnd] = (rng.randrange(0, 3700), rng.randrange(0, 980))
+
+            probe = displayed[hwnd] > 0 and rng.random() > flicker
+            if probe:
+                legacy_repaints += 1 # setGeometry of its own window
+                if hwnd not in shown:
+                    legacy_windows += 1 # A new top-level window and a pixmap loaded from disk
+                    shown.add(hwnd)
+            else:
+                shown.discard(hwnd)
+
+            if hysteresis.update(hwnd, probe):
+                layout.set_button(hwnd, positions[hwnd], hwnd, None)
+            else:
+                layout.remove_button(hwnd)
+        layout.take_dirty()
+    elapsed = time.perf_counter() - start
+
+    print(f"{num_tables} tables, {ticks} ticks: one window per button {legacy_repaints} repaints and {legacy_windows} windows "
+          f"created | overlay {layout.changes} repaints, 2 windows, {layout.unchanged} unchanged updates skipped, "
+          f"{hysteresis.absorbed} flickers absorbed ({elapsed / ticks * 1e6:.1f} us/tick)")
+
+if __name__ == "__main__":
+    benchmark_button_layout()
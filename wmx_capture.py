@@ -0,0 +1,359 @@
+import time
+import logging
+import threading
+import numpy as np
+from wmx_frame import Frame
+
+# Screen capture service #
+# One long-lived grabber per thread instead of a new `with mss.mss()` context for every capture.
+# Captures are returned as BGRA NumPy arrays of shape (height, width, 4), the native mss layout.
+
+def region_to_box(region):
+    """
+    Normalize a capture region to a (left, top, width, height) tuple.
+    Parameters:
+    - region (tuple | dict): Either (left, top, right, bottom) or an mss-style dict with left/top/width/height.
+    Returns:
+    - tuple: (left, top, width, height)
+    """
+    if isinstance(region, dict):
+        return int(region["left"]), int(region["top"]), int(region["width"]), int(region["height"])
+    left, top, right, bottom = region
+    return int(left), int(top), int(right - left), int(bottom - top)
+
+def hex_to_rgb(hex_color):
+    """
+    Convert a hex color code such as "#232323" to an (r, g, b) tuple.
+    """
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+def color_matches(colors, hex_color, tolerance=0):
+    """
+    Compare one or several RGB colors against a reference hex color, tolerating a color distance.
+    Parameters:
+    - colors (array-like): An (r, g, b) color or an array of shape (N, 3).
+    - hex_color (str): Reference hex color code, e.g. result_frame_hex_color.
+    - tolerance (float): Maximum Euclidean distance in RGB space still considered a match (0 = exact match).
+    Returns:
+    - bool | np.ndarray: A bool for a single color, a boolean array of shape (N,) otherwise.
+    """
+    colors = np.asarray(colors, dtype=np.int32)
+    diff = colors - np.array(hex_to_rgb(hex_color), dtype=np.int32)
+    matches = (diff * diff).sum(axis=-1) <= tolerance * tolerance
+    return bool(matches) if matches.ndim == 0 else matches
+
+def group_points_by_monitor(points, monitors):
+    """
+    Group probe points by the monitor containing them, so a bounding box never spans two screens.
+    Parameters:
+    - points (np.ndarray): Array of shape (N, 2) of (x, y) desktop coordinates.
+    - monitors (list): List of (left, top, right, bottom) monitor rectangles.
+    Returns:
+    - list: A list of index arrays, one per non-empty group. Points outside every monitor form their own group.
+    """
+    remaining = np.ones(len(points), dtype=bool)
+    groups = []
+    for left, top, right, bottom in monitors:
+        inside = remaining & (points[:, 0] >= left) & (points[:, 0] < right) & (points[:, 1] >= top) & (points[:, 1] < bottom)
+        if inside.any():
+            groups.append(np.flatnonzero(inside))
+            remaining &= ~inside
+    if remaining.any():
+        groups.append(np.flatnonzero(remaining))
+    return groups
+
+def split_bounding_boxes(points, indexes, max_pixels):
+    """
+    Split a group of probe points until the bounding box of each sub-group covers at most max_pixels,
+    cutting at the median of the longer axis. Keeps a wide spread of tables from turning into a full-screen grab.
+    Parameters:
+    - points (np.ndarray): Array of shape (N, 2) of (x, y) desktop coordinates.
+    - indexes (np.ndarray): Indexes of the points forming the group.
+    - max_pixels (int): Maximum area of a bounding box.
+    Returns:
+    - list: A list of index arrays.
+    """
+    group = points[indexes]
+    extent = group.max(axis=0) - group.min(axis=0) + 1
+    if len(indexes) == 1 or extent[0] * extent[1] <= max_pixels:
+        return [indexes]
+    axis = int(np.argmax(extent))
+    order = indexes[np.argsort(group[:, axis], kind="stable")]
+    half = len(order) // 2
+    return split_bounding_boxes(points, order[:half], max_pixels) + split_bounding_boxes(points, order[half:], max_pixels)
+
+class MssBackend:
+    """
+    Grabber backed by a persistent mss instance.
+    mss keeps its device contexts and bitmap buffers alive between grabs of the same size,
+    so one instance must be created per thread and kept open.
+    """
+
+    def __init__(self):
+        import mss # Imported here so the service can run headless with the framebuffer backend
+        self._sct = mss.mss()
+
+    def grab(self, left, top, width, height):
+        shot = self._sct.grab({"left": left, "top": top, "width": width, "height": height})
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def monitors(self):
+        """
+        Return the (left, top, right, bottom) rectangle of every physical monitor.
+        """
+        return [(m["left"], m["top"], m["left"] + m["width"], m["top"] + m["height"]) for m in self._sct.monitors[1:]]
+
+    def close(self):
+        self._sct.close()
+
+class FramebufferBackend:
+    """
+    In-memory grabber reading from a BGRA NumPy framebuffer, used to measure the service headless.
+    Parameters:
+    - framebuffer (np.ndarray): Array of shape (height, width, 4) representing the virtual desktop.
+    - origin (tuple): Desktop coordinates of the framebuffer top-left pixel.
+    - monitors (list): Optional (left, top, right, bottom) rectangles splitting the framebuffer into monitors.
+    """
+
+    def __init__(self, framebuffer, origin=(0, 0), monitors=None):
+        self.framebuffer = framebuffer
+        self.origin = origin
+        if monitors is None:
+            height, width = framebuffer.shape[:2]
+            monitors = [(origin[0], origin[1], origin[0] + width, origin[1] + height)]
+        self._monitors = list(monitors)
+
+    def grab(self, left, top, width, height):
+        x = left - self.origin[0]
+        y = top - self.origin[1]
+        fb_height, fb_width = self.framebuffer.shape[:2]
+        if x < 0 or y < 0 or x + width > fb_width or y + height > fb_height:
+            raise ValueError(f"Region ({left}, {top}, {width}x{height}) is outside the framebuffer")
+        return self.framebuffer[y:y + height, x:x + width].copy() # A real grab returns its own buffer
+
+    def monitors(self):
+        return list(self._monitors)
+
+    def close(self):
+        pass
+
+class CaptureService:
+    """
+    Long-lived capture service owning a single grabber per thread. The mss handles and device contexts of a
+    grabber belong to its thread: each thread closes its own with close_thread().
+    Parameters:
+    - backend_factory (callable): Called with no argument to create the grabber of a thread (MssBackend by default).
+    - max_probe_bbox_pixels (int): Largest bounding box probe_pixels() grabs at once before splitting the probes.
+    """
+
+    def __init__(self, backend_factory=MssBackend, max_probe_bbox_pixels=256 * 1024):
+        self.backend_factory = backend_factory
+        self.max_probe_bbox_pixels = max_probe_bbox_pixels
+        self._local = threading.local()
+        self._backends = {} # {thread ident: grabber}, to tell how many are still open
+        self._lock = threading.Lock()
+        self.grab_count = 0
+        self.pixels_grabbed = 0
+        self._monitors = None
+
+    def _backend(self):
+        backend = getattr(self._local, "backend", None)
+        if backend is None:
+            backend = self.backend_factory()
+            self._local.backend = backend
+            with self._lock:
+                self._backends[threading.get_ident()] = backend
+            logging.debug("Capture backend created for thread %s", threading.current_thread().name)
+        return backend
+
+    def grab(self, region, out=None):
+        """
+        Grab a region of the screen.
+        Parameters:
+        - region (tuple | dict): (left, top, right, bottom) or an mss-style dict.
+        - out (np.ndarray): Optional uint8 array of shape (height, width, 4) to copy the capture into (e.g. a pooled
+          buffer), so the grabber's own buffer can be freed right away.
+        Returns:
+        - np.ndarray: BGRA array of shape (height, width, 4), `out` if given.
+        """
+        left, top, width, height = region_to_box(region)
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Invalid capture region: {region}")
+        img = self._backend().grab(left, top, width, height)
+        with self._lock:
+            self.grab_count += 1
+            self.pixels_grabbed += width * height
+        if out is not None:
+            np.copyto(out, img)
+            return out
+        return img
+
+    def grab_frame(self, region, pool=None):
+        """
+        Grab a region of the screen as a Frame (see wmx_frame): BGR, grayscale and PIL derived on demand, once.
+        With a BufferPool (see wmx_buffer_pool), the capture and its grayscale conversion are pooled buffers, returned
+        by Frame.release(). Raises PoolExhausted if the pool is full.
+        """
+        if pool is None:
+            return Frame(self.grab(region), region)
+        _, _, width, height = region_to_box(region)
+        buffer = pool.checkout((height, width, 4))
+        try:
+            self.grab(region, out=buffer)
+        except BaseException:
+            pool.checkin(buffer)
+            raise
+        return Frame(buffer, region, pool=pool)
+
+    def grab_pil(self, region):
+        """
+        Grab a region of the screen as an RGB PIL image, as the capture functions returned until now.
+        """
+        from PIL import Image
+        img = self.grab(region)
+        height, width = img.shape[:2]
+        return Image.frombuffer('RGB', (width, height), np.ascontiguousarray(img), 'raw', 'BGRX', 0, 1)
+
+    def pixel(self, x, y):
+        """
+        Return the (r, g, b) color of a single screen pixel.
+        """
+        b, g, r = self.grab((x, y, x + 1, y + 1))[0, 0, :3]
+        return int(r), int(g), int(b)
+
+    def monitors(self):
+        """
+        Return the monitor rectangles, queried once and cached until invalidate_monitors() is called.
+        """
+        if self._monitors is None:
+            self._monitors = self._backend().monitors()
+        return self._monitors
+
+    def invalidate_monitors(self):
+        """
+        Forget the cached monitor layout (to be called on a display change).
+        """
+        self._monitors = None
+
+    def probe_pixels(self, points):
+        """
+        Read the color of several screen pixels with one grab per monitor instead of one grab per pixel.
+        The bounding box covering the points of each monitor is grabbed once (split if larger than
+        max_probe_bbox_pixels), then every probe is read from that array with NumPy indexing.
+        Parameters:
+        - points (list): List of (x, y) desktop coordinates.
+        Returns:
+        - np.ndarray: uint8 array of shape (N, 3) with the (r, g, b) color of each point, in input order.
+        """
+        colors = np.empty((len(points), 3), dtype=np.uint8)
+        if not len(points):
+            return colors
+
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        boxes = []
+        for indexes in group_points_by_monitor(points, self.monitors()):
+            boxes.extend(split_bounding_boxes(points, indexes, self.max_probe_bbox_pixels))
+
+        for indexes in boxes:
+            group = points[indexes]
+            left, top = group.min(axis=0)
+            right, bottom = group.max(axis=0) + 1
+            img = self.grab((left, top, right, bottom))
+            bgr = img[group[:, 1] - top, group[:, 0] - left, :3]
+            colors[indexes] = bgr[:, ::-1] # BGRA capture to RGB
+        return colors
+
+    def close_thread(self):
+        """
+        Close the grabber of the calling thread, if it has one (a later grab opens a new one).
+        """
+        backend = getattr(self._local, "backend", None)
+        if backend is None:
+            return
+        self._local.backend = None
+        with self._lock:
+            self._backends.pop(threading.get_ident(), None)
+        backend.close()
+
+    def close(self):
+        """
+        Close the grabber of the calling thread. The grabbers of threads that did not call close_thread() are left
+        to be released at process exit, closing them from another thread is not safe.
+        """
+        self.close_thread()
+        with self._lock:
+            left_open = len(self._backends)
+        if left_open:
+            logging.debug("%d capture grabbers of other threads left to the process exit", left_open)
+
+def make_framebuffer(width=1920, height=1080, seed=0):
+    """
+    Build a random BGRA framebuffer for benchmarks.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+
+def benchmark_capture_service(backend="framebuffer", iterations=2000):
+    """
+    Measure the throughput of the persistent service for a 1x1 pixel probe and the 400x50 Stat strip.
+    With the mss backend, the legacy pattern (one grabber opened and closed per call) is measured too.
+    """
+    if backend == "mss":
+        factory = MssBackend
+    else:
+        framebuffer = make_framebuffer()
+        factory = lambda: FramebufferBackend(framebuffer)
+
+    regions = {"pixel 1x1": (100, 100, 101, 101), "stat 400x50": (0, 134, 400, 184)}
+
+    for label, region in regions.items():
+        service = CaptureService(factory)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            service.grab(region)
+        persistent = (time.perf_counter() - start) / iterations
+        service.close()
+        line = f"{label:12s} persistent service: {persistent * 1e6:8.1f} us | {1 / persistent:10.0f} grabs/s"
+
+        if backend == "mss":
+            left, top, width, height = region_to_box(region)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                grabber = factory()
+                grabber.grab(left, top, width, height)
+                grabber.close()
+            per_call = (time.perf_counter() - start) / iterations
+            line += f" | per-call grabber: {per_call * 1e6:8.1f} us"
+
+        print(line)
+
+    # Batched probes: one pixel per table, tables tiled over a 1920x1080 screen
+    for num_tables in (1, 6, 12, 24):
+        columns = min(num_tables, 4)
+        points = [(20 + (i % columns) * (1920 // columns), 20 + (i // columns) * 180) for i in range(num_tables)]
+        service = CaptureService(factory)
+
+        start = time.perf_counter()
+        for _ in range(iterations // 10):
+            [service.pixel(x, y) for x, y in points]
+        one_by_one = (time.perf_counter() - start) / (iterations // 10)
+
+        start = time.perf_counter()
+        grabs_before = service.grab_count
+        for _ in range(iterations // 10):
+            service.probe_pixels(points)
+        batched = (time.perf_counter() - start) / (iterations // 10)
+        grabs_per_tick = (service.grab_count - grabs_before) / (iterations // 10)
+        service.close()
+
+        print(f"{num_tables:2d} tables     one grab per probe: {one_by_one * 1e6:8.1f} us ({num_tables} grabs) "
+              f"| probe_pixels: {batched * 1e6:8.1f} us ({grabs_per_tick:.0f} grabs)")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Capture service throughput benchmark")
+    parser.add_argument("--backend", choices=("framebuffer", "mss"), default="framebuffer")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    benchmark_capture_service(args.backend, args.iterations)
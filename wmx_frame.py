@@ -0,0 +1,176 @@
+import time
+import threading
+import numpy as np
+
+# Capture frames #
+# A Frame wraps the BGRA array of a grab (a view of the grabber's buffer, no copy) and derives the other
+# representations on demand: BGR (a view), grayscale and PIL are each computed at most once and shared by every
+# detector reading the frame. PIL is only materialised by the code that needs it (the screenshot writer, an OCR
+# engine working on PIL images). Every conversion is counted, so the allocations of a tick can be measured.
+# A frame grabbed into a pooled buffer (see wmx_buffer_pool) gives its buffers back with release().
+
+class FrameStats:
+    """
+    Counters of the frames wrapped and of the conversions they computed (allocations) or served from their cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._last = {}
+
+    def add(self, name, value=1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def delta(self):
+        """
+        Return the counters accumulated since the previous call (e.g. once per tick).
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            delta = {name: value - self._last.get(name, 0) for name, value in counts.items() if value != self._last.get(name, 0)}
+            self._last = counts
+        return delta
+
+frame_stats = FrameStats()
+
+class Frame:
+    """
+    Screen capture and its lazily derived representations.
+    Parameters:
+    - bgra (np.ndarray): BGRA array of shape (height, width, 4), as returned by the capture service. Not copied.
+    - region (tuple): Desktop rectangle (left, top, right, bottom) of the capture, if known.
+    - timestamp (float): time.monotonic() of the grab.
+    - pool (BufferPool): Pool `bgra` was checked out from, if any; the grayscale conversion is taken from it too.
+    """
+
+    __slots__ = ("bgra", "region", "timestamp", "stats", "pool", "_pooled", "_gray", "_pil")
+
+    def __init__(self, bgra, region=None, timestamp=None, stats=frame_stats, pool=None):
+        self.bgra = bgra
+        self.region = region
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.stats = stats
+        self.pool = pool
+        self._pooled = [bgra] if pool is not None else [] # Buffers to return to the pool
+        self._gray = None
+        self._pil = None
+        stats.add("frames")
+
+    @property
+    def shape(self):
+        return self.bgra.shape[:2]
+
+    @property
+    def bgr(self):
+        """
+        BGR view of the capture (no copy, not contiguous: the alpha byte is skipped by the strides).
+        """
+        return self.bgra[:, :, :3]
+
+    @property
+    def gray(self):
+        """
+        Grayscale (uint8, height x width) conversion of the capture, computed on first use.
+        """
+        if self._gray is None:
+            import cv2
+            gray = None
+            if self.pool is not None:
+                from wmx_buffer_pool import PoolExhausted
+                try:
+                    gray = self.pool.checkout(self.bgra.shape[:2])
+                    self._pooled.append(gray)
+                except PoolExhausted:
+                    gray = None # Allocated normally below
+            if gray is None:
+                self._gray = cv2.cvtColor(self.bgra, cv2.COLOR_BGRA2GRAY)
+                self.stats.add("bytes", self._gray.nbytes)
+            else:
+                self._gray = cv2.cvtColor(self.bgra, cv2.COLOR_BGRA2GRAY, dst=gray)
+            self.stats.add("gray")
+        else:
+            self.stats.add("gray_reused")
+        return self._gray
+
+    def pil(self):
+        """
+        RGB PIL image of the capture, converted from BGRA in one pass on first use.
+        """
+        if self._pil is None:
+            from PIL import Image
+            height, width = self.bgra.shape[:2]
+            self._pil = Image.frombuffer('RGB', (width, height), np.ascontiguousarray(self.bgra), 'raw', 'BGRX', 0, 1)
+            self.stats.add("pil")
+            self.stats.add("bytes", width * height * 3)
+        else:
+            self.stats.add("pil_reused")
+        return self._pil
+
+    def release(self):
+        """
+        Return the pooled buffers of the frame (no-op for a frame without pool, or already released).
+        The arrays must not be used afterwards; a PIL image already built stays valid (it owns its pixels).
+        """
+        pooled, self._pooled = self._pooled, []
+        for buffer in pooled:
+            self.pool.checkin(buffer)
+        if pooled:
+            self.stats.add("released")
+
+def benchmark_frames(iterations=2000, width=28, height=15, strip=(400, 50)):
+    """
+    Allocations and time of a detection tick on the Playground digit crop (template classification and test save)
+    and the Stat strip (OCR input digest), through the PIL path (frombytes, np.array, RGB2BGR then BGR2GRAY) against
+    Frame views (the PIL image of the save is built once, by the writer).
+    """
+    import cv2
+    import tracemalloc
+    from PIL import Image
+    rng = np.random.default_rng(0)
+    digit = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    stat = rng.integers(0, 256, size=(strip[1], strip[0], 4), dtype=np.uint8)
+
+    def grab_pil(bgra):
+        h, w = bgra.shape[:2]
+        return Image.frombytes('RGB', (w, h), bgra.tobytes(), 'raw', 'BGRX') # mss .rgb then frombytes
+
+    def legacy_tick():
+        digit_pil = grab_pil(digit)
+        digit_bgr = cv2.cvtColor(np.array(digit_pil), cv2.COLOR_RGB2BGR) # pil_to_cv2
+        cv2.cvtColor(digit_bgr, cv2.COLOR_BGR2GRAY) # Classifier input
+        digit_pil.convert('RGB') # Save of the test capture
+        stat_pil = grab_pil(stat)
+        stat_pil.tobytes() # OCR cache digest of the PIL image
+
+    def frame_tick():
+        digit_frame = Frame(digit)
+        digit_frame.gray
+        digit_frame.pil() # Save of the test capture, on the writer
+        stat_frame = Frame(stat)
+        np.ascontiguousarray(stat_frame.bgra).data # OCR cache digest of the BGRA array
+
+    for label, tick in (("PIL round-trips", legacy_tick), ("Frame views", frame_tick)):
+        for _ in range(50):
+            tick()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            tick()
+        elapsed = (time.perf_counter() - start) / iterations
+        before = frame_stats.snapshot()
+        tracemalloc.start()
+        tick()
+        _, peak = tracemalloc.get_traced_memory() # Python and NumPy buffers (PIL's own buffers are not traced)
+        tracemalloc.stop()
+        after = frame_stats.snapshot()
+        conversions = {name: after[name] - before.get(name, 0) for name in after if after[name] != before.get(name, 0)}
+        print(f"{label:16s}: {elapsed * 1e6:7.1f} us/tick | traced allocation peak {peak / 1024:5.1f} KiB/tick"
+              f"{' | frame counters ' + str(conversions) if conversions else ''}")
+
+if __name__ == "__main__":
+    benchmark_frames()
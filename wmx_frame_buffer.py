@@ -0,0 +1,154 @@
+import time
+import threading
+from collections import deque, namedtuple, OrderedDict
+import numpy as np
+
+# Result frame buffer #
+# The result rectangle of a table is grabbed as soon as the pixel probe sees the result frame appear, and kept in a
+# small per-table ring buffer. A click on the table button then saves the buffered frame without a new grab, even if
+# the result popup has moved or closed in the meantime.
+
+BufferedFrame = namedtuple("BufferedFrame", ["image", "timestamp", "rect"]) # image: BGR uint8 array (height, width, 3)
+
+class ResultFrameBuffer:
+    """
+    Per-HWND ring buffers of result rectangle captures, with a global memory cap.
+    Frames are stored as BGR arrays (the alpha channel of the capture is dropped). When the cap is exceeded the oldest
+    frames of all the tables are evicted first.
+    Parameters:
+    - frames_per_table (int): Number of frames kept per table.
+    - max_bytes (int): Maximum memory used by all the buffered frames.
+    """
+
+    def __init__(self, frames_per_table=3, max_bytes=32 * 1024 * 1024, clock=time.monotonic):
+        self.frames_per_table = frames_per_table
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._frames = {} # {hwnd: deque of BufferedFrame}
+        self._order = OrderedDict() # {(hwnd, id(frame)): frame}, oldest first, for the global eviction
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.pushed = 0
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def push(self, hwnd, image, rect=None, timestamp=None):
+        """
+        Buffer a capture of the result rectangle of a table.
+        Parameters:
+        - hwnd (int): Handle of the table window.
+        - image (np.ndarray): BGRA or BGR capture.
+        - rect (tuple): Screen rectangle of the capture.
+        Returns:
+        - BufferedFrame: The stored frame, or None if it is larger than the memory cap.
+        """
+        image = np.ascontiguousarray(image[..., :3])
+        if image.nbytes > self.max_bytes:
+            return None
+        frame = BufferedFrame(image, self.clock() if timestamp is None else timestamp, rect)
+        with self._lock:
+            frames = self._frames.setdefault(hwnd, deque())
+            if len(frames) >= self.frames_per_table:
+                self._forget(hwnd, frames.popleft())
+            frames.append(frame)
+            self._order[(hwnd, id(frame))] = frame
+            self.nbytes += image.nbytes
+            self.pushed += 1
+            while self.nbytes > self.max_bytes:
+                (old_hwnd, _), old_frame = next(iter(self._order.items()))
+                old_frames = self._frames[old_hwnd]
+                old_frames.popleft() # The oldest frame overall is also the oldest of its table
+                self._forget(old_hwnd, old_frame)
+                if not old_frames:
+                    del self._frames[old_hwnd]
+        return frame
+
+    def _forget(self, hwnd, frame):
+        del self._order[(hwnd, id(frame))]
+        self.nbytes -= frame.image.nbytes
+        self.evicted += 1
+
+    def latest(self, hwnd, max_age=None):
+        """
+        Return the most recent frame of a table (younger than max_age seconds if given), or None.
+        """
+        with self._lock:
+            frames = self._frames.get(hwnd)
+            frame = frames[-1] if frames else None
+            if frame is not None and max_age is not None and self.clock() - frame.timestamp > max_age:
+                frame = None
+            if frame is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return frame
+
+    def frames(self, hwnd):
+        with self._lock:
+            return list(self._frames.get(hwnd, ()))
+
+    def evict(self, hwnd):
+        """
+        Drop every frame of a table (e.g. when it is closed).
+        """
+        with self._lock:
+            for frame in list(self._frames.get(hwnd, ())):
+                self._forget(hwnd, frame)
+            self._frames.pop(hwnd, None)
+
+    def retain(self, hwnds):
+        """
+        Drop the frames of every table not in `hwnds` (the tables still open).
+        """
+        hwnds = set(hwnds)
+        with self._lock:
+            closed = [hwnd for hwnd in self._frames if hwnd not in hwnds]
+        for hwnd in closed:
+            self.evict(hwnd)
+        return closed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tables": len(self._frames),
+                "frames": len(self._order),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "pushed": self.pushed,
+                "evicted": self.evicted,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+def benchmark_frame_buffer(num_tables=24, results_per_table=20, width=420, height=260, max_bytes=8 * 1024 * 1024):
+    """
+    Cost of buffering the result frames of many tables (grab included), time to get the frame to save on a click,
+    and the memory kept by the buffer under its cap.
+    """
+    from wmx_capture import FramebufferBackend, make_framebuffer
+
+    backend = FramebufferBackend(make_framebuffer())
+    buffer = ResultFrameBuffer(max_bytes=max_bytes)
+    tables = list(range(0x2000, 0x2000 + num_tables))
+
+    start = time.perf_counter()
+    for _ in range(results_per_table):
+        for hwnd in tables:
+            buffer.push(hwnd, backend.grab(100, 100, width, height))
+    push = (time.perf_counter() - start) / (results_per_table * num_tables)
+
+    start = time.perf_counter()
+    for hwnd in tables:
+        buffer.latest(hwnd)
+    lookup = (time.perf_counter() - start) / num_tables
+
+    buffer.retain(tables[:num_tables // 2]) # Half of the tables are closed
+    stats = buffer.stats()
+    print(f"{num_tables} tables, {width}x{height} results: grab and push {push * 1e3:.3f} ms | click: buffered frame "
+          f"in {lookup * 1e6:.1f} us, no grab | "
+          f"{stats['frames']} frames / {stats['bytes'] / 2**20:.1f} MiB kept after closing half the tables "
+          f"(cap {max_bytes / 2**20:.0f} MiB), {stats['evicted']} evicted")
+
+if __name__ == "__main__":
+    benchmark_frame_buffer()
@@ -0,0 +1,539 @@
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import functools
+import numpy as np
+from wmx_ocr import OCREngine
+
+# Fixed-font glyph OCR #
+# Winamax draws its UI text with a few fixed fonts, so a text line can be read glyph by glyph: the capture is
+# binarized (Otsu), cut into connected components, each glyph is resampled to a small cell and matched against the
+# glyphs of labelled crops (nearest neighbour on the normalized cells). Pure NumPy, no Tesseract process.
+# The model is a single file (JSON header + float32 glyph matrix) memory-mapped at load and used in place.
+
+MODEL_MAGIC = b"WMXGLYPH"
+MODEL_VERSION = 1
+MODEL_ALIGN = 64
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class UnrecognizedText(ValueError):
+    """
+    Raised by a strict GlyphEngine when a glyph matches none of the model (e.g. to fall back to Tesseract).
+    """
+
+def to_gray(img):
+    """
+    Grayscale uint8 array of a PIL image or of a grayscale, RGB, BGR or BGRA NumPy array (BGR order assumed for
+    3 and 4 channel arrays, as returned by the capture service and OpenCV).
+    """
+    if not isinstance(img, np.ndarray):
+        img = np.asarray(img.convert('L'))
+    if img.ndim == 2:
+        return img
+    return (img[:, :, 0] * 0.114 + img[:, :, 1] * 0.587 + img[:, :, 2] * 0.299).astype(np.uint8)
+
+def otsu_threshold(gray):
+    """
+    Otsu threshold of a uint8 image (the level maximising the between-class variance).
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(hist)
+    means = np.cumsum(hist * np.arange(256))
+    total, total_mean = weights[-1], means[-1]
+    background = weights[:-1]
+    foreground = total - background
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (total_mean * background - means[:-1] * total) ** 2 / (background * foreground)
+    return int(np.nanargmax(variance)) if np.isfinite(variance).any() else 127
+
+def binarize(gray):
+    """
+    Ink mask of a text crop: Otsu threshold, the ink being the minority side (light text on a dark background or
+    the opposite).
+    """
+    threshold = otsu_threshold(gray)
+    bright = gray > threshold
+    return ~bright if bright.mean() > 0.5 else bright
+
+def label_components(mask):
+    """
+    8-connected components of a boolean mask.
+    Every ink pixel starts with its own index as label, then takes the smallest label of its neighbours, with
+    pointer jumping (label = label of the label) so the labels spread in a few passes.
+    :return: int32 array of the mask shape, -1 outside the ink, the component label (a pixel index) inside
+    """
+    height, width = mask.shape
+    big = np.int32(height * width)
+    labels = np.where(mask, np.arange(height * width, dtype=np.int32).reshape(height, width), big)
+    padded = np.full((height + 2, width + 2), big, dtype=np.int32)
+    while True:
+        padded[1:-1, 1:-1] = labels
+        smallest = labels.copy()
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                np.minimum(smallest, padded[dy:dy + height, dx:dx + width], out=smallest)
+        smallest = np.where(mask, smallest, big)
+        flat = np.append(smallest.ravel(), big)
+        for _ in range(4): # Pointer jumping
+            flat[:-1] = flat[flat[:-1]]
+        smallest = flat[:-1].reshape(height, width)
+        if np.array_equal(smallest, labels):
+            return np.where(mask, labels, -1)
+        labels = smallest
+
+def glyph_boxes(mask, min_area=2):
+    """
+    Glyph bounding boxes (x0, y0, x1, y1, exclusive ends) of a text line, left to right.
+    Components smaller than min_area pixels are dropped, components stacked over each other (the dot of an i,
+    an accent) are merged into one glyph.
+    """
+    labels = label_components(mask)
+    ink = np.flatnonzero(labels.ravel() >= 0)
+    if not len(ink):
+        return []
+    ids, inverse, areas = np.unique(labels.ravel()[ink], return_inverse=True, return_counts=True)
+    ys, xs = np.divmod(ink, mask.shape[1])
+    count = len(ids)
+    x0 = np.full(count, mask.shape[1]); np.minimum.at(x0, inverse, xs)
+    y0 = np.full(count, mask.shape[0]); np.minimum.at(y0, inverse, ys)
+    x1 = np.zeros(count, dtype=np.int64); np.maximum.at(x1, inverse, xs + 1)
+    y1 = np.zeros(count, dtype=np.int64); np.maximum.at(y1, inverse, ys + 1)
+
+    boxes = sorted((int(x0[i]), int(y0[i]), int(x1[i]), int(y1[i])) for i in range(count) if areas[i] >= min_area)
+    merged = []
+    for box in boxes:
+        if merged:
+            last = merged[-1]
+            overlap = min(last[2], box[2]) - max(last[0], box[0])
+            if overlap > 0.5 * min(last[2] - last[0], box[2] - box[0]):
+                merged[-1] = (min(last[0], box[0]), min(last[1], box[1]), max(last[2], box[2]), max(last[3], box[3]))
+                continue
+        merged.append(box)
+    return merged
+
+def split_lines(mask, min_height_ratio=0.4):
+    """
+    Row ranges (top, bottom) of the text lines of a mask, separated by rows without ink. Bands lower than
+    min_height_ratio of the highest one (specks of noise, an underline) are dropped.
+    """
+    rows = mask.any(axis=1)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.astype(np.int8), [0]))))
+    lines = list(zip(edges[::2], edges[1::2]))
+    highest = max((bottom - top for top, bottom in lines), default=0)
+    return [(top, bottom) for top, bottom in lines if bottom - top >= min_height_ratio * highest]
+
+@functools.lru_cache(maxsize=256)
+def _resample_matrix(size_in, size_out):
+    # Box filter: weight of input pixel k in output pixel i = overlap of their extents, rows normalized
+    edges = np.arange(size_in + 1) * (size_out / size_in)
+    out = np.arange(size_out)[:, None]
+    overlap = np.clip(np.minimum(edges[1:][None, :], out + 1) - np.maximum(edges[:-1][None, :], out), 0, None)
+    return (overlap / overlap.sum(axis=1, keepdims=True)).astype(np.float32)
+
+class GlyphModel:
+    """
+    Glyph prototypes and the parameters of the recognizer.
+    Parameters:
+    - prototypes (np.ndarray): (count, dim) unit-norm glyph features (float32, possibly memory-mapped).
+    - labels (list): Character of each prototype.
+    - cell (tuple): (height, width) of the resampled glyph cell.
+    - space_gap (float): Gap between two glyphs, relative to the line height, from which a space is inserted.
+    - min_score (float): Cosine similarity below which a glyph is not recognized.
+    - geometry_weight (float): Weight of the glyph geometry (aspect, height and position in the line) in the features.
+    """
+
+    def __init__(self, prototypes, labels, cell=(16, 12), space_gap=0.35, min_score=0.85, geometry_weight=3.0):
+        self.prototypes = prototypes
+        self.labels = list(labels)
+        self.cell = tuple(cell)
+        self.space_gap = space_gap
+        self.min_score = min_score
+        self.geometry_weight = geometry_weight
+        self._labels = np.array(self.labels + ["?"])
+        self._matrix = np.asarray(prototypes).T # View of the (mapped) prototypes, no copy
+
+    def features(self, mask, boxes, line):
+        """
+        Unit-norm feature vectors of the glyphs `boxes` of a line (top, bottom) of the ink mask.
+        """
+        cell_height, cell_width = self.cell
+        line_top, line_bottom = line
+        line_height = max(1, line_bottom - line_top)
+        features = np.empty((len(boxes), cell_height * cell_width + 3), dtype=np.float32)
+        for i, (x0, y0, x1, y1) in enumerate(boxes):
+            glyph = mask[y0:y1, x0:x1].astype(np.float32)
+            cell = _resample_matrix(y1 - y0, cell_height) @ glyph @ _resample_matrix(x1 - x0, cell_width).T
+            features[i, :-3] = cell.ravel()
+            features[i, -3:] = ((x1 - x0) / (y1 - y0), (y1 - y0) / line_height, (y0 - line_top) / line_height)
+        features[:, -3:] *= self.geometry_weight
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return features / np.maximum(norms, 1e-6)
+
+    def classify(self, features):
+        """
+        :return: Tuple (characters, scores); "?" for the glyphs scoring below min_score
+        """
+        if not len(features):
+            return np.array([], dtype=self._labels.dtype), np.array([], dtype=np.float32)
+        similarities = features @ self._matrix
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(best)), best]
+        best[scores < self.min_score] = len(self.labels)
+        return self._labels[best], scores
+
+    def segment(self, gray):
+        """
+        Lines of glyphs of a grayscale crop: list of (line, boxes) with line = (top, bottom).
+        """
+        mask = binarize(gray)
+        lines = []
+        for top, bottom in split_lines(mask):
+            boxes = [(x0, y0 + top, x1, y1 + top) for x0, y0, x1, y1 in glyph_boxes(mask[top:bottom])]
+            lines.append(((top, bottom), boxes))
+        return mask, lines
+
+    def read_words(self, img):
+        """
+        Read the words of a crop, split at the gaps of at least space_gap.
+        :return: Tuple (lines, lowest glyph score or 1.0 without glyphs, number of unrecognized glyphs), lines being
+                 lists of (word, (x, y, width, height)) in the coordinates of the crop
+        """
+        mask, lines = self.segment(to_gray(img))
+        words_by_line, lowest, unknown = [], 1.0, 0
+        for line, boxes in lines:
+            if not boxes:
+                continue
+            characters, scores = self.classify(self.features(mask, boxes, line))
+            line_height = max(1, line[1] - line[0])
+            words, start = [], 0
+            for i in range(1, len(boxes) + 1):
+                if i < len(boxes) and (boxes[i][0] - boxes[i - 1][2]) / line_height < self.space_gap:
+                    continue
+                x0, x1 = boxes[start][0], boxes[i - 1][2]
+                y0 = int(min(box[1] for box in boxes[start:i]))
+                y1 = int(max(box[3] for box in boxes[start:i]))
+                words.append(("".join(characters[start:i]), (int(x0), y0, int(x1 - x0), y1 - y0)))
+                start = i
+            words_by_line.append(words)
+            lowest = min(lowest, float(scores.min()))
+            unknown += int((characters == "?").sum())
+        return words_by_line, lowest, unknown
+
+    def recognize(self, img):
+        """
+        Read the text of a crop.
+        :return: Tuple (text, lowest glyph score or 1.0 without glyphs, number of unrecognized glyphs)
+        """
+        lines, lowest, unknown = self.read_words(img)
+        return "\n".join(" ".join(word for word, _ in words) for words in lines), lowest, unknown
+
+    def save(self, path):
+        """
+        Write the model file: magic, header length, JSON header, then the float32 matrix at an aligned offset.
+        """
+        header = {
+            "version": MODEL_VERSION,
+            "labels": self.labels,
+            "cell": list(self.cell),
+            "dim": int(self.prototypes.shape[1]),
+            "space_gap": self.space_gap,
+            "min_score": self.min_score,
+            "geometry_weight": self.geometry_weight,
+        }
+        data = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        offset = -(-(len(MODEL_MAGIC) + 4 + len(data)) // MODEL_ALIGN) * MODEL_ALIGN
+        with open(path, "wb") as f:
+            f.write(MODEL_MAGIC)
+            f.write(len(data).to_bytes(4, "little"))
+            f.write(data)
+            f.write(b"\0" * (offset - len(MODEL_MAGIC) - 4 - len(data)))
+            f.write(np.ascontiguousarray(self.prototypes, dtype="<f4").tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a model file, the glyph matrix memory-mapped (read-only).
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+                raise ValueError(f"{path} is not a glyph model file")
+            size = int.from_bytes(f.read(4), "little")
+            header = json.loads(f.read(size).decode("utf-8"))
+        if header["version"] != MODEL_VERSION:
+            raise ValueError(f"Unsupported glyph model version {header['version']} in {path}")
+        offset = -(-(len(MODEL_MAGIC) + 4 + size) // MODEL_ALIGN) * MODEL_ALIGN
+        prototypes = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=(len(header["labels"]), header["dim"]))
+        return cls(prototypes, header["labels"], header["cell"], header["space_gap"], header["min_score"],
+                   header["geometry_weight"])
+
+class GlyphTrainer:
+    """
+    Collect the glyphs of labelled crops (one text line each) into a GlyphModel.
+    A crop whose glyph count does not match its label (spaces excluded) is skipped.
+    """
+
+    def __init__(self, cell=(16, 12), min_score=0.85, geometry_weight=3.0, dedup_score=0.995):
+        self.model = GlyphModel(np.zeros((0, cell[0] * cell[1] + 3), np.float32), [], cell, min_score=min_score,
+                                geometry_weight=geometry_weight)
+        self.dedup_score = dedup_score
+        self._features = []
+        self._labels = []
+        self._word_gaps = [] # Gaps between glyphs of a word, relative to the line height
+        self._space_gaps = [] # Gaps replaced by a space in the label
+        self.skipped = []
+
+    def add(self, img, text, name=None):
+        """
+        Add the glyphs of a crop labelled `text`. Returns False if the crop was skipped.
+        """
+        mask, lines = self.model.segment(to_gray(img))
+        lines = [(line, boxes) for line, boxes in lines if boxes]
+        characters = text.replace(" ", "")
+        if len(lines) != 1 or len(lines[0][1]) != len(characters):
+            found = sum(len(boxes) for _, boxes in lines)
+            self.skipped.append((name or text, f"{found} glyphs on {len(lines)} lines for {len(characters)} characters"))
+            return False
+        line, boxes = lines[0]
+        self._features.append(self.model.features(mask, boxes, line))
+        self._labels.extend(characters)
+        line_height = max(1, line[1] - line[0])
+        spaced = [False] * len(characters)
+        position = 0
+        for character in text.strip():
+            if character == " ":
+                spaced[position] = True
+            else:
+                position += 1
+        for previous, box, space in zip(boxes, boxes[1:], spaced[1:]):
+            (self._space_gaps if space else self._word_gaps).append((box[0] - previous[2]) / line_height)
+        return True
+
+    def build(self):
+        """
+        Return the GlyphModel of the glyphs added so far, near-duplicate glyphs of the same character kept once.
+        """
+        if not self._features:
+            raise ValueError("No glyph to train on")
+        features = np.concatenate(self._features)
+        labels = np.array(self._labels)
+        keep = []
+        for i in range(len(features)):
+            if keep:
+                kept = np.array(keep)
+                same = labels[kept] == labels[i]
+                if same.any() and float((features[kept[same]] @ features[i]).max()) >= self.dedup_score:
+                    continue
+            keep.append(i)
+        space_gap = self.model.space_gap
+        if self._space_gaps:
+            widest_word_gap = max(self._word_gaps, default=0.0)
+            space_gap = (widest_word_gap + min(self._space_gaps)) / 2
+        model = self.model
+        return GlyphModel(np.ascontiguousarray(features[keep], dtype=np.float32), labels[keep].tolist(), model.cell, space_gap,
+                          model.min_score, model.geometry_weight)
+
+class GlyphEngine(OCREngine):
+    """
+    OCR engine reading fixed-font text with a GlyphModel.
+    Parameters:
+    - model (GlyphModel): Trained glyph model.
+    - strict (bool): Raise UnrecognizedText instead of returning "?" for unknown glyphs, so that a FallbackEngine
+      hands the image to Tesseract.
+    """
+
+    name = "glyph"
+
+    def __init__(self, model, strict=True):
+        self.model = model
+        self.strict = strict
+
+    def image_to_string(self, img):
+        text, score, unknown = self.model.recognize(img)
+        if unknown and self.strict:
+            raise UnrecognizedText(f"{unknown} unrecognized glyphs (lowest score {score:.3f}) in {text!r}")
+        return text
+
+    def image_to_words(self, img):
+        lines, score, unknown = self.model.read_words(img)
+        words = [word for line in lines for word in line]
+        if unknown and self.strict:
+            raise UnrecognizedText(f"{unknown} unrecognized glyphs (lowest score {score:.3f}) in {words!r}")
+        return words
+
+def load_glyph_engine(path, strict=True):
+    """
+    GlyphEngine of the model file at `path`, or None if there is no usable model there.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        model = GlyphModel.load(path)
+    except Exception as e:
+        logging.info("Glyph model %s unusable: %s", path, e)
+        return None
+    logging.info("Glyph OCR model loaded from %s (%s glyphs)", path, len(model.labels))
+    return GlyphEngine(model, strict)
+
+def read_labels(path):
+    """
+    Labels file: one "file name<TAB>text" line per crop, relative to the labels file.
+    """
+    labels = {}
+    folder = os.path.dirname(path)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                name, _, text = line.rstrip("\n").partition("\t")
+                labels[os.path.normpath(os.path.join(folder, name))] = text
+    return labels
+
+def load_samples(patterns, labels_path=None):
+    """
+    Labelled crops (text, grayscale image, path) from files, folders or glob patterns. The label of a crop comes
+    from the labels file if given, otherwise from its file name (Assets/12.jpg is "12").
+    """
+    import cv2
+    labels = read_labels(labels_path) if labels_path else None
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(os.path.join(pattern, name) for name in os.listdir(pattern)))
+        else:
+            paths.extend(sorted(glob.glob(pattern)))
+    samples = []
+    for path in paths:
+        if not path.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        if labels is not None:
+            text = labels.get(os.path.normpath(path))
+            if text is None:
+                continue
+        else:
+            text = os.path.splitext(os.path.basename(path))[0]
+        img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE) # Non-ASCII paths on Windows
+        if img is not None:
+            samples.append((text, img, path))
+    return samples
+
+SYNTHETIC_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz€.,:-+%()/"
+
+def synthetic_samples(count, seed=0, scale=0.8, noise_sigma=6.0, light_on_dark=True):
+    """
+    Labelled text lines drawn with an OpenCV font (stand-in for the client fonts): random words of the charset and
+    amounts, a varying background and noise.
+    """
+    import cv2
+    rng = np.random.default_rng(seed)
+    charset = SYNTHETIC_CHARSET.replace("€", "") # Not drawable by the Hershey fonts
+    samples = []
+    for i in range(count):
+        words = []
+        for _ in range(int(rng.integers(1, 4))):
+            if rng.random() < 0.4:
+                words.append(f"{rng.integers(0, 100000) / 100:.2f}")
+            else:
+                words.append("".join(rng.choice(list(charset), size=int(rng.integers(2, 9)))))
+        text = " ".join(words)
+        (width, height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 1)
+        background = int(rng.integers(20, 50)) if light_on_dark else int(rng.integers(200, 240))
+        ink = 230 if light_on_dark else 20
+        img = np.full((height + baseline + 10, width + 12), background, dtype=np.uint8)
+        cv2.putText(img, text, (6, height + 5), cv2.FONT_HERSHEY_SIMPLEX, scale, ink, 1, cv2.LINE_AA)
+        img = np.clip(img + rng.normal(0, noise_sigma, img.shape), 0, 255).astype(np.uint8)
+        samples.append((text, img, f"synthetic {i}"))
+    return samples
+
+def augment_samples(samples, copies=5, noise_sigma=10.0, max_offset=2, seed=0):
+    """
+    Noisy, shifted copies of labelled crops (edge pixels repeated), to measure the robustness on few samples.
+    """
+    rng = np.random.default_rng(seed)
+    augmented = []
+    for text, img, name in samples:
+        for copy in range(copies):
+            dy, dx = rng.integers(-max_offset, max_offset + 1, size=2)
+            padded = np.pad(img, max_offset, mode="edge")
+            shifted = np.roll(padded, (dy, dx), axis=(0, 1))[max_offset:max_offset + img.shape[0], max_offset:max_offset + img.shape[1]]
+            noisy = np.clip(shifted + rng.normal(0, noise_sigma, img.shape), 0, 255).astype(np.uint8)
+            augmented.append((text, noisy, f"{name} #{copy}"))
+    return augmented
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def accuracy_report(engine, samples, label):
+    """
+    Print the exact-match and character accuracy and the latency of an engine over labelled crops.
+    """
+    times, exact, errors, characters, failures = [], 0, 0, 0, 0
+    for text, img, name in samples:
+        start = time.perf_counter()
+        try:
+            result = engine.image_to_string(img).strip()
+        except Exception:
+            result = None
+            failures += 1
+        times.append(time.perf_counter() - start)
+        if result is None:
+            errors += len(text)
+        else:
+            exact += result == text
+            errors += edit_distance(result, text)
+        characters += len(text)
+    times.sort()
+    p50, p95 = times[len(times) // 2], times[min(len(times) - 1, int(0.95 * len(times)))]
+    print(f"{label:24s}: {len(samples)} crops | exact {exact / len(samples):6.1%} | characters "
+          f"{1 - errors / max(1, characters):6.1%} | {failures} failed | p50 {p50 * 1e3:7.2f} ms | p95 {p95 * 1e3:7.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fixed-font glyph OCR: training and accuracy report")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in ("train", "report"):
+        command = subparsers.add_parser(name)
+        command.add_argument("--model", required=True, help="Glyph model file (written by train, read by report)")
+        command.add_argument("--samples", nargs="*", default=[], help="Labelled crops: files, folders or glob patterns")
+        command.add_argument("--labels", help="Labels file (file name<TAB>text per line), file names otherwise")
+        command.add_argument("--synthetic", type=int, default=0, help="Add this many synthetic text lines")
+        command.add_argument("--seed", type=int, default=0)
+    subparsers.choices["report"].add_argument("--augment", type=int, default=0, help="Noisy shifted copies per crop")
+    subparsers.choices["report"].add_argument("--tesseract", action="store_true", help="Also measure Tesseract")
+    args = parser.parse_args(argv)
+
+    samples = load_samples(args.samples, args.labels)
+    if args.synthetic:
+        samples += synthetic_samples(args.synthetic, seed=args.seed)
+    if not samples:
+        parser.error("no labelled crop found")
+
+    if args.command == "train":
+        trainer = GlyphTrainer()
+        for text, img, name in samples:
+            trainer.add(img, text, name)
+        model = trainer.build()
+        model.save(args.model)
+        for name, reason in trainer.skipped:
+            print(f"Skipped {name}: {reason}")
+        print(f"{len(samples) - len(trainer.skipped)} crops, {len(model.labels)} glyphs of {len(set(model.labels))} "
+              f"characters, space gap {model.space_gap:.2f} -> {args.model} ({os.path.getsize(args.model)} bytes)")
+        return
+
+    engine = GlyphEngine(GlyphModel.load(args.model), strict=False)
+    if args.augment:
+        samples = augment_samples(samples, args.augment, seed=args.seed)
+    accuracy_report(engine, samples, "Glyph OCR")
+    if args.tesseract:
+        from wmx_ocr import create_ocr_engine
+        accuracy_report(create_ocr_engine(), samples, "Tesseract")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,243 @@
+import sys
+import time
+import queue
+import logging
+import threading
+import logging.handlers
+from collections import deque, OrderedDict
+
+# Logging subsystem #
+# The calling threads only filter the record and put it on a queue: formatting and writing happen on a background
+# listener thread. Identical messages repeated within a time window are dropped and counted, and the formatted
+# lines are also kept in a ring buffer that can be dumped to a file on demand.
+
+class Lazy:
+    """
+    Value computed only when the message is formatted, on the listener thread:
+    logging.debug("OCR executor: %s", Lazy(ocr_executor.metrics))
+    """
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+    __repr__ = __str__
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler leaving the formatting to the listener (the stock handler formats on the calling thread).
+    The arguments of a record must not be modified after the call, as they are formatted later.
+    """
+
+    def prepare(self, record):
+        return record
+
+class RepeatFilter(logging.Filter):
+    """
+    Drop the records identical to one emitted less than `window` seconds ago, and count them.
+    Two records are identical if they have the same level, template and arguments, or the same `key` extra
+    (logging.debug("...", extra={"key": ("probe", hwnd)})). The next record emitted for a key carries the number of
+    records dropped in between (see RepeatCountFormatter).
+    """
+
+    def __init__(self, window=30.0, max_keys=4096, clock=time.monotonic):
+        super(RepeatFilter, self).__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._seen = OrderedDict() # {key: [last emitted time, records dropped since]}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record):
+        key = getattr(record, "key", None)
+        if key is None:
+            key = (record.levelno, record.msg, record.args)
+        try:
+            hash(key)
+        except TypeError:
+            return True # Unhashable arguments, never suppressed
+        now = self.clock()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                self.suppressed += 1
+                return False
+            if entry is not None and entry[1]:
+                record.repeated = entry[1]
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        return True
+
+class RepeatCountFormatter(logging.Formatter):
+    """
+    Formatter appending the number of identical records dropped before this one.
+    """
+
+    def format(self, record):
+        line = super(RepeatCountFormatter, self).format(record)
+        repeated = getattr(record, "repeated", 0)
+        return f"{line} (repeated {repeated} times)" if repeated else line
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keep the last `capacity` formatted lines in memory, to be dumped on demand.
+    """
+
+    def __init__(self, capacity=5000):
+        super(RingBufferHandler, self).__init__()
+        self.lines = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def dump(self, path):
+        lines = list(self.lines)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+        return len(lines)
+
+class LoggingSystem:
+    """
+    Root logger wiring: DeferredQueueHandler (with the RepeatFilter) on the calling threads, and a listener
+    writing to the console and to the ring buffer.
+    """
+
+    def __init__(self, level=logging.INFO, fmt='%(asctime)s - %(levelname)s - %(message)s', datefmt=None,
+                 ring_size=5000, repeat_window=30.0, stream=None):
+        formatter = RepeatCountFormatter(fmt, datefmt)
+        self.console = logging.StreamHandler(stream if stream is not None else sys.stderr)
+        self.console.setFormatter(formatter)
+        self.ring = RingBufferHandler(ring_size)
+        self.ring.setFormatter(formatter)
+        self.repeat_filter = RepeatFilter(repeat_window)
+        self.queue = queue.SimpleQueue()
+        self.handler = DeferredQueueHandler(self.queue)
+        self.handler.addFilter(self.repeat_filter)
+        self.listener = logging.handlers.QueueListener(self.queue, self.console, self.ring, respect_handler_level=True)
+        self.level = level
+
+    def install(self):
+        # The format uses neither the caller location nor the process/thread fields: skip collecting them
+        # for every record (see "Optimization" in the logging documentation)
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        return self
+
+    def dump(self, path):
+        """
+        Write the ring buffer to a file. Returns the number of lines written.
+        """
+        count = self.ring.dump(path)
+        logging.info("Log buffer dumped to %s (%d lines)", path, count)
+        return count
+
+    def stats(self):
+        return {"suppressed": self.repeat_filter.suppressed, "buffered_lines": len(self.ring.lines)}
+
+    def stop(self):
+        """
+        Write the queued records and stop the listener.
+        """
+        self.listener.stop()
+        root = logging.getLogger()
+        root.removeHandler(self.handler)
+
+def setup_logging(level=logging.INFO, fmt='%(asctime)s - %(levelname)s - %(message)s', datefmt=None, ring_size=5000,
+                  repeat_window=30.0):
+    """
+    Configure the root logger with the queued, deduplicated logging and return the LoggingSystem.
+    """
+    return LoggingSystem(level, fmt, datefmt, ring_size, repeat_window).install()
+
+def benchmark_logging(num_tables=12, ticks=500):
+    """
+    Logging cost per tick on the calling thread, for the messages of a detection tick with num_tables tables:
+    f-strings through basicConfig's StreamHandler, against lazy arguments through the queued, deduplicated system.
+    The output goes to os.devnull.
+    """
+    import os
+
+    tables = [(0x2000 + i, f"Winamax Table {i} (No Limit Hold'em)") for i in range(num_tables)]
+    positions = {hwnd: (100 * i, 50 * i) for i, (hwnd, _) in enumerate(tables)}
+    metrics = {"queue_depth": 0, "submitted": 1000, "completed": 998, "latency_p95_ms": 231.5}
+
+    def legacy_tick():
+        logging.debug(f"Winamax HWNDs: {[hwnd for hwnd, _ in tables]}")
+        logging.debug(f"Tables HWNDs and Title: {tables}")
+        logging.info("Playground window not found.")
+        logging.debug(f"Boucle OCR thread relancé, OCR executor: {dict(metrics)}")
+        for hwnd, title in tables:
+            x, y = positions[hwnd]
+            logging.debug(f"Pixel color at {(x + 20, y + 20)}: R={35}, G={35}, B={35}, HWND: {hwnd}")
+            logging.debug(f"Result frame not displayed on table {title}")
+
+    def lazy_tick():
+        logging.debug("Winamax HWNDs: %s", Lazy(lambda: [hwnd for hwnd, _ in tables]))
+        logging.debug("Tables HWNDs and Title: %s", Lazy(list, tables))
+        logging.debug("Playground window not found.")
+        logging.debug("Boucle OCR thread relancé, OCR executor: %s", Lazy(dict, metrics))
+        for hwnd, title in tables:
+            x, y = positions[hwnd]
+            logging.debug("Pixel color at (%d, %d): R=%d, G=%d, B=%d, HWND: %s", x + 20, y + 20, 35, 35, 35, hwnd)
+            logging.debug("Result frame not displayed on table %s", title)
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    saved_flags = (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+    with open(os.devnull, "w") as devnull:
+        results = {}
+        for label, tick in (("f-strings, StreamHandler", legacy_tick), ("lazy, queued, deduplicated", lazy_tick)):
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            if tick is legacy_tick:
+                handler = logging.StreamHandler(devnull)
+                handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+                root.addHandler(handler)
+                root.setLevel(logging.DEBUG)
+                system = None
+            else:
+                system = LoggingSystem(logging.DEBUG, stream=devnull).install()
+            start = time.perf_counter()
+            for _ in range(ticks):
+                tick()
+            caller = (time.perf_counter() - start) / ticks
+            drained = time.perf_counter()
+            if system is not None:
+                system.stop()
+            results[label] = (caller, (time.perf_counter() - drained) / ticks, system)
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in saved_handlers:
+        root.addHandler(handler)
+    root.setLevel(saved_level)
+    logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing = saved_flags
+
+    messages = 4 + 2 * num_tables
+    for label, (caller, drain, system) in results.items():
+        extra = f", listener drain {drain * 1e6:.0f} us/tick, {system.repeat_filter.suppressed} of {messages * ticks} records suppressed" if system else ""
+        print(f"{num_tables} tables, {label:28s}: {caller * 1e6:7.1f} us/tick on the calling thread{extra}")
+
+if __name__ == "__main__":
+    benchmark_logging()
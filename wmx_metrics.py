@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+
+# Stage timing #
+# Timing spans around the detection stages, aggregated into rolling windows of durations per stage and per table
+# (p50/p95/p99 computed on export), exported to a JSON file or a localhost-only HTTP endpoint, plus a Chrome trace
+# (chrome://tracing, Perfetto) of the stage spans of the last ticks (the per-table spans are only aggregated).
+# A disabled tracer hands the functions back unwrapped.
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+_clock = time.perf_counter
+_get_ident = threading.get_ident
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, _clock())
+        return False
+
+class _KeySpan:
+    # Span of a table: only aggregated, appended straight to its series
+    __slots__ = ("series", "start")
+
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.append(_clock() - self.start)
+        return False
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))] if sorted_values else 0.0
+
+class Tracer:
+    """
+    Per-stage timing.
+    Parameters:
+    - enabled (bool): When False, wrap() returns the function itself and span() a shared no-op context manager.
+    - window (int): Number of recent durations kept per stage (and per stage and table).
+    - trace_ticks (int): Number of recent ticks kept for the Chrome trace.
+    """
+
+    def __init__(self, enabled=True, window=1024, trace_ticks=100):
+        self.enabled = enabled
+        self.window = window
+        self._durations = {} # {(stage, key): deque of durations in seconds}
+        self._ticks = deque(maxlen=trace_ticks) # Trace events of the last ticks
+        self._current = [] # Trace events of the current tick
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def record(self, name, start, end, key=None):
+        """
+        Record a span of stage `name` (optionally for a table `key`) from start to end (perf_counter seconds).
+        Only the stage spans (without key) go to the Chrome trace, a dozen tables would multiply its events.
+        """
+        self._series(name, key).append(end - start)
+        if key is None:
+            self._current.append((name, _get_ident(), start, end))
+
+    def _series(self, name, key):
+        series = self._durations.get((name, key))
+        if series is None:
+            with self._lock:
+                series = self._durations.setdefault((name, key), deque(maxlen=self.window))
+        return series
+
+    def retain(self, keys):
+        """
+        Drop the per-table series of every table not in `keys` (the tables still open). Returns the dropped keys.
+        """
+        keys = set(keys)
+        with self._lock:
+            closed = [series for series in self._durations if series[1] is not None and series[1] not in keys]
+            for series in closed:
+                del self._durations[series]
+        return {key for _, key in closed}
+
+    def span(self, name, key=None):
+        """
+        Context manager timing a block: `with tracer.span("visibility"):`.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        if key is not None:
+            return _KeySpan(self._series(name, key))
+        return _Span(self, name)
+
+    def wrap(self, name, fn):
+        """
+        Return fn timed as stage `name`, or fn itself when the tracer is disabled.
+        """
+        if not self.enabled:
+            return fn
+        record = self.record
+
+        def timed(*args, **kwargs):
+            start = _clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, start, _clock())
+        timed.__name__ = getattr(fn, "__name__", name)
+        return timed
+
+    def tick(self):
+        """
+        Close the current tick of the Chrome trace (called once per loop iteration).
+        """
+        if self.enabled and self._current:
+            self._ticks.append(self._current)
+            self._current = []
+
+    def summary(self):
+        """
+        Return {"stages": {stage: stats}, "tables": {stage: {key: stats}}} with count, mean, p50, p95, p99 and max
+        in milliseconds over the rolling window.
+        """
+        with self._lock:
+            items = [(name, key, list(series)) for (name, key), series in self._durations.items()]
+        stages, tables = {}, {}
+        for name, key, values in items:
+            values.sort()
+            stats = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values) * 1e3 if values else 0.0,
+                "p50_ms": percentile(values, 0.50) * 1e3,
+                "p95_ms": percentile(values, 0.95) * 1e3,
+                "p99_ms": percentile(values, 0.99) * 1e3,
+                "max_ms": values[-1] * 1e3 if values else 0.0,
+            }
+            if key is None:
+                stages[name] = stats
+            else:
+                tables.setdefault(name, {})[str(key)] = stats
+        return {"stages": stages, "tables": tables}
+
+    def chrome_trace(self):
+        """
+        Chrome trace-event document of the last ticks (complete "X" events, microseconds).
+        """
+        events = []
+        pid = os.getpid()
+        for tick in list(self._ticks) + [list(self._current)]:
+            for name, tid, start, end in tick:
+                events.append({"name": name, "cat": "stage", "ph": "X", "pid": pid, "tid": tid,
+                               "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_summary(self, path):
+        """
+        Write the summary to a JSON file (replaced atomically).
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def write_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def serve(self, port=8765):
+        """
+        Serve /metrics (summary) and /trace (Chrome trace) as JSON on 127.0.0.1 only, from a daemon thread.
+        Returns the server (server.shutdown() to stop it).
+        """
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = json.dumps(tracer.summary()).encode("utf-8")
+                elif self.path == "/trace":
+                    body = json.dumps(tracer.chrome_trace()).encode("utf-8")
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug("Metrics endpoint: " + format, *args)
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info("Stage metrics served on http://127.0.0.1:%s/metrics and /trace", server.server_address[1])
+        return server
+
+def benchmark_tracer(ticks=1000, num_tables=12, stage_work=0.5e-3, trace_path=None):
+    """
+    Cost of the instrumentation on a loop of 4 stages doing `stage_work` seconds of work each (NumPy, the Win32, mss
+    and Tesseract calls of the real stages take milliseconds), with the tracer disabled (functions not wrapped) and
+    enabled (timed stages, per-table spans and trace ticks).
+    """
+    import numpy as np
+    data = np.random.default_rng(0).random(4096)
+
+    def work():
+        end = time.perf_counter() + stage_work
+        while time.perf_counter() < end:
+            data.sum()
+
+    def run(tracer):
+        stages = [tracer.wrap(name, work) for name in ("process_scan", "window_scan", "visibility", "stat_ocr")]
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for stage in stages:
+                stage()
+            for hwnd in range(num_tables):
+                with tracer.span("table_probe", hwnd):
+                    pass
+            tracer.tick()
+        return (time.perf_counter() - start) / ticks
+
+    run(Tracer(enabled=False)) # Warm-up
+    disabled = min(run(Tracer(enabled=False)) for _ in range(3))
+    tracer = Tracer(enabled=True)
+    enabled = min(run(tracer) for _ in range(3))
+    # Cost of the spans alone, without the work
+    bare = Tracer(enabled=True)
+    spans = ticks * (4 + num_tables)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for _ in range(4 + num_tables):
+            with bare.span("stage"):
+                pass
+        bare.tick()
+    per_span = (time.perf_counter() - start) / spans
+    summary = tracer.summary()
+    print(f"{ticks} ticks, 4 stages + {num_tables} table spans: disabled {disabled * 1e3:.3f} ms/tick | "
+          f"enabled {enabled * 1e3:.3f} ms/tick ({(enabled - disabled) / disabled:+.2%}) | {per_span * 1e6:.2f} us/span | "
+          f"window_scan p95 {summary['stages']['window_scan']['p95_ms']:.3f} ms, "
+          f"{len(tracer.chrome_trace()['traceEvents'])} trace events kept")
+    if trace_path:
+        print(f"Chrome trace written to {tracer.write_chrome_trace(trace_path)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stage timing instrumentation.")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--tables", type=int, default=12)
+    parser.add_argument("--trace", default=None, help="Also write the Chrome trace of the benchmark to this file")
+    args = parser.parse_args()
+    benchmark_tracer(ticks=args.ticks, num_tables=args.tables, trace_path=args.trace)
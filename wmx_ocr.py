@@ -0,0 +1,691 @@
+import os
+import sys
+import glob
+import json
+import time
+import struct
+import logging
+import threading
+import hashlib
+import subprocess
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import xxhash # Optional, faster digest of the captures
+except ImportError:
+    xxhash = None
+
+# OCR engines #
+# A common image_to_string() interface over several Tesseract backends:
+# - TesserocrEngine keeps the Tesseract C-API resident, with the model loaded once,
+# - CapiEngine does the same through ctypes on the libtesseract DLL shipped with the Tesseract installer,
+# - ProcessEngine talks to a long-lived local OCR process (CapiEngine by default) through its stdin/stdout pipes,
+# - PytesseractEngine is the historical path (temp file + tesseract.exe spawned for every call).
+# An engine can be built with the Tesseract settings of a region profile (see wmx_ocr_profiles), and wrapped in a
+# ProfiledEngine that preprocesses the captures of the region.
+# image_to_words() returns the recognized words with their boxes (Tesseract TSV output), to locate a word.
+
+DEFAULT_LANG = 'eng'
+
+class OCREngine:
+    """
+    Base class of the OCR engines.
+    """
+
+    name = "base"
+
+    def image_to_string(self, img):
+        """
+        Run OCR on an image and return the recognized text.
+        :param img: PIL image or NumPy array (grayscale, RGB, or BGRA as returned by the capture service)
+        """
+        raise NotImplementedError
+
+    def image_to_words(self, img):
+        """
+        Run OCR on an image and return the recognized words with their boxes.
+        :param img: Same as image_to_string
+        :return: List of (text, (x, y, width, height)) tuples, in reading order
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+def parse_tsv_words(tsv):
+    """
+    Words of a Tesseract TSV output (image_to_data, GetTSVText): the rows of level 5 with a non-empty text.
+    """
+    words = []
+    for line in tsv.splitlines():
+        fields = line.split('\t')
+        if len(fields) != 12 or fields[0] != '5' or not fields[11].strip():
+            continue # Header, page/block/line rows, empty words
+        words.append((fields[11], (int(fields[6]), int(fields[7]), int(fields[8]), int(fields[9]))))
+    return words
+
+def to_pil(img):
+    """
+    Convert a NumPy capture to a PIL image, leave PIL images untouched.
+    BGRA arrays (capture service layout) are converted to RGB.
+    """
+    from PIL import Image
+    if isinstance(img, Image.Image):
+        return img
+    if img.ndim == 2:
+        return Image.fromarray(img)
+    if img.shape[2] == 4: # One pass from BGRA to RGB, without the intermediate reversed copy
+        return Image.frombuffer('RGB', (img.shape[1], img.shape[0]), np.ascontiguousarray(img), 'raw', 'BGRX', 0, 1)
+    return Image.fromarray(img)
+
+class PytesseractEngine(OCREngine):
+    """
+    OCR through pytesseract: a temp file is written and tesseract.exe is spawned for every call.
+    Parameters:
+    - profile (CompiledProfile): Region profile whose Tesseract settings are added to `config`.
+    """
+
+    name = "pytesseract"
+
+    def __init__(self, lang=DEFAULT_LANG, config='', tesseract_cmd=None, profile=None):
+        import pytesseract
+        self._pytesseract = pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.lang = lang
+        self.config = f"{config} {profile.config}".strip() if profile is not None else config
+
+    def image_to_string(self, img):
+        return self._pytesseract.image_to_string(to_pil(img), lang=self.lang, config=self.config)
+
+    def image_to_words(self, img):
+        return parse_tsv_words(self._pytesseract.image_to_data(to_pil(img), lang=self.lang, config=self.config))
+
+class TesserocrEngine(OCREngine):
+    """
+    OCR through tesserocr, a binding of the Tesseract C-API. The API object, and the model it loaded,
+    stay resident for the lifetime of the engine; images are handed over in memory.
+    A Tesseract API object is not thread-safe, calls are serialized with a lock.
+    Parameters:
+    - profile (CompiledProfile): Region profile whose page segmentation mode and variables are set on the API.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang=DEFAULT_LANG, tessdata_path=None, profile=None):
+        import tesserocr
+        kwargs = {"lang": lang}
+        if tessdata_path:
+            kwargs["path"] = tessdata_path
+        self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        if profile is not None:
+            if profile.psm is not None:
+                self._api.SetPageSegMode(profile.psm)
+            for name, value in profile.variables.items():
+                self._api.SetVariable(name, value)
+        self._lock = threading.Lock()
+
+    def image_to_string(self, img):
+        with self._lock:
+            self._api.SetImage(to_pil(img))
+            return self._api.GetUTF8Text()
+
+    def image_to_words(self, img):
+        with self._lock:
+            self._api.SetImage(to_pil(img))
+            return parse_tsv_words(self._api.GetTSVText(0))
+
+    def close(self):
+        with self._lock:
+            self._api.End()
+
+def find_tesseract_library(tesseract_cmd=None):
+    """
+    Path of the Tesseract C library: the libtesseract DLL installed next to tesseract.exe (Windows installer),
+    or the system library. None if not found.
+    """
+    if tesseract_cmd:
+        folder = os.path.dirname(tesseract_cmd)
+        matches = sorted(glob.glob(os.path.join(folder, "libtesseract*.dll")) + glob.glob(os.path.join(folder, "tesseract*.dll")))
+        if matches:
+            return matches[-1] # Newest version first in name order (libtesseract-5.dll after libtesseract-4.dll)
+    import ctypes.util
+    return ctypes.util.find_library("tesseract") or ctypes.util.find_library("libtesseract-5")
+
+class CapiEngine(OCREngine):
+    """
+    OCR through the C API of the Tesseract library, loaded with ctypes: the API object and its model stay
+    resident like with tesserocr, without needing a compiled binding. Calls are serialized with a lock.
+    Parameters:
+    - tesseract_cmd (str): Path of tesseract.exe, the library is looked up in the same folder.
+    - profile (CompiledProfile): Region profile whose page segmentation mode and variables are set on the API.
+    """
+
+    name = "capi"
+
+    def __init__(self, lang=DEFAULT_LANG, tessdata_path=None, tesseract_cmd=None, profile=None):
+        import ctypes
+        path = find_tesseract_library(tesseract_cmd)
+        if not path:
+            raise OSError("Tesseract library not found")
+        if hasattr(os, "add_dll_directory") and os.path.isabs(path):
+            self._dll_directory = os.add_dll_directory(os.path.dirname(path)) # Leptonica and the other DLLs next to it
+        lib = ctypes.CDLL(path)
+        api, text = ctypes.c_void_p, ctypes.c_char_p
+        lib.TessBaseAPICreate.restype = api
+        lib.TessBaseAPIInit3.argtypes = [api, text, text]
+        lib.TessBaseAPIInit3.restype = ctypes.c_int
+        lib.TessBaseAPISetPageSegMode.argtypes = [api, ctypes.c_int]
+        lib.TessBaseAPISetVariable.argtypes = [api, text, text]
+        lib.TessBaseAPISetVariable.restype = ctypes.c_int
+        lib.TessBaseAPISetImage.argtypes = [api, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.TessBaseAPIGetUTF8Text.argtypes = [api]
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p # Freed with TessDeleteText
+        lib.TessBaseAPIGetTsvText.argtypes = [api, ctypes.c_int]
+        lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+        lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIEnd.argtypes = [api]
+        lib.TessBaseAPIDelete.argtypes = [api]
+        self._ctypes = ctypes
+        self._lib = lib
+        self._api = lib.TessBaseAPICreate()
+        datapath = os.fsencode(tessdata_path) if tessdata_path else None
+        if lib.TessBaseAPIInit3(self._api, datapath, lang.encode()) != 0:
+            lib.TessBaseAPIDelete(self._api)
+            raise RuntimeError(f"Tesseract could not load the '{lang}' model from {tessdata_path or 'TESSDATA_PREFIX'}")
+        if profile is not None:
+            if profile.psm is not None:
+                lib.TessBaseAPISetPageSegMode(self._api, profile.psm)
+            for name, value in profile.variables.items():
+                lib.TessBaseAPISetVariable(self._api, name.encode(), value.encode())
+        self._lock = threading.Lock()
+
+    def _recognize(self, img, get_text, *args):
+        array = _to_protocol_array(img)
+        height, width = array.shape[:2]
+        channels = 1 if array.ndim == 2 else array.shape[2]
+        with self._lock:
+            self._lib.TessBaseAPISetImage(self._api, array.ctypes.data, width, height, channels, width * channels)
+            text = get_text(self._api, *args)
+            if not text:
+                return ""
+            try:
+                return self._ctypes.string_at(text).decode('utf-8')
+            finally:
+                self._lib.TessDeleteText(text)
+
+    def image_to_string(self, img):
+        return self._recognize(img, self._lib.TessBaseAPIGetUTF8Text)
+
+    def image_to_words(self, img):
+        return parse_tsv_words(self._recognize(img, self._lib.TessBaseAPIGetTsvText, 0))
+
+    def close(self):
+        with self._lock:
+            if self._api:
+                self._lib.TessBaseAPIEnd(self._api)
+                self._lib.TessBaseAPIDelete(self._api)
+                self._api = None
+
+class FakeEngine(OCREngine):
+    """
+    Engine returning a fixed text without any OCR, to measure the overhead of the other layers.
+    """
+
+    name = "fake"
+
+    def __init__(self, text="Statistiques"):
+        self.text = text
+        self.calls = 0
+
+    def image_to_string(self, img):
+        self.calls += 1
+        return self.text
+
+    def image_to_words(self, img):
+        self.calls += 1
+        height, width = (img.shape[:2] if isinstance(img, np.ndarray) else (img.size[1], img.size[0]))
+        return [(self.text, (0, 0, width, height))]
+
+# Protocol of the local OCR process, over its stdin/stdout pipes:
+# request  = header struct '<III' (width, height, channels) followed by the raw uint8 pixels (row-major),
+#            a header of (0, 0, 0) asks the process to exit,
+#            WORDS_REQUEST set in channels asks for the words with their boxes instead of the text,
+# response = header struct '<I' (length) followed by the UTF-8 text (JSON list of [text, [x, y, w, h]] for words).
+# Once its engine is loaded, the process sends a first response: "ready", or the error that prevented it.
+_REQUEST_HEADER = struct.Struct('<III')
+_RESPONSE_HEADER = struct.Struct('<I')
+WORDS_REQUEST = 0x100
+
+def _read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise EOFError("OCR process pipe closed")
+        data += chunk
+    return data
+
+def _to_protocol_array(img):
+    """
+    Convert an image to the contiguous uint8 array sent to the OCR process (grayscale or RGB).
+    """
+    if not isinstance(img, np.ndarray):
+        img = np.asarray(img.convert('RGB') if img.mode not in ('L', 'RGB') else img)
+    elif img.ndim == 3 and img.shape[2] == 4:
+        img = img[:, :, 2::-1] # BGRA capture to RGB
+    return np.ascontiguousarray(img, dtype=np.uint8)
+
+class ProcessEngine(OCREngine):
+    """
+    OCR through a long-lived local process (`python wmx_ocr.py --serve`) that keeps its own engine loaded, by
+    default CapiEngine on the Tesseract DLL, so that no binding is needed and a crash of the library leaves the
+    main process alive. Raises RuntimeError if the process cannot load its engine.
+    A process that does not answer within the timeout is killed and the call raises RuntimeError (so that a
+    FallbackEngine takes over); the process is started again on a later call, at most once every restart_delay seconds.
+    Parameters:
+    - backend (str): Engine used by the process ("capi", "tesserocr", "pytesseract" or "fake").
+    - profile (CompiledProfile): Region profile whose Tesseract settings the process engine is built with.
+    - timeout (float): Seconds an OCR request may take.
+    - start_timeout (float): Seconds the process may take to load its engine.
+    - restart_delay (float): Minimum seconds between two starts of the process.
+    """
+
+    name = "process"
+
+    def __init__(self, backend="capi", lang=DEFAULT_LANG, tessdata_path=None, tesseract_cmd=None, profile=None,
+                 timeout=5.0, start_timeout=30.0, restart_delay=10.0):
+        command = [sys.executable, os.path.abspath(__file__), "--serve", "--backend", backend, "--lang", lang]
+        if tessdata_path:
+            command += ["--tessdata-path", tessdata_path]
+        if tesseract_cmd:
+            command += ["--tesseract-cmd", tesseract_cmd]
+        if profile is not None:
+            command += ["--profile", json.dumps(profile.profile.to_dict())]
+        self.backend = backend
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.restart_delay = restart_delay
+        self.restarts = 0
+        self._command = command
+        self._lock = threading.Lock()
+        self._restart_after = 0.0
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        # Called with the lock held
+        self._restart_after = time.monotonic() + self.restart_delay
+        self._proc = subprocess.Popen(self._command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        try:
+            status = self._exchange((), self.start_timeout)
+        except RuntimeError as e:
+            status = str(e)
+        if status != "ready":
+            self._stop()
+            raise RuntimeError(f"OCR process ({self.backend}) unavailable: {status}")
+
+    def _stop(self):
+        # Called with the lock held: kill the process, a later call starts a new one
+        self._proc.kill()
+        self._proc.wait()
+
+    def _exchange(self, parts, timeout):
+        """
+        Write the request parts and read the response, the process being killed if it takes more than timeout
+        seconds. A failed or partial exchange leaves the framing of the pipes unknown: the process is not reused.
+        """
+        proc = self._proc
+        watchdog = threading.Timer(timeout, proc.kill) # Unblocks the pipe write or read below
+        watchdog.daemon = True
+        start = time.monotonic()
+        watchdog.start()
+        try:
+            for part in parts:
+                proc.stdin.write(part)
+            proc.stdin.flush()
+            return _read_response(proc.stdout)
+        except (OSError, EOFError, ValueError) as e:
+            self._stop()
+            if time.monotonic() - start >= timeout:
+                raise RuntimeError(f"OCR process ({self.backend}) timed out after {timeout:.1f} s, killed") from e
+            raise RuntimeError(f"OCR process ({self.backend}) failed ({e!r}), exited with code {proc.returncode}") from e
+        finally:
+            watchdog.cancel()
+
+    def _request(self, img, flags=0):
+        array = _to_protocol_array(img)
+        height, width = array.shape[:2]
+        channels = 1 if array.ndim == 2 else array.shape[2]
+        with self._lock:
+            if self._proc.poll() is not None:
+                if time.monotonic() < self._restart_after:
+                    raise RuntimeError(f"OCR process ({self.backend}) down, restarting it in "
+                                       f"{self._restart_after - time.monotonic():.1f} s")
+                logging.info("OCR process (%s) exited with code %s, restarting it.", self.backend, self._proc.returncode)
+                self.restarts += 1
+                self._start()
+            header = _REQUEST_HEADER.pack(width, height, channels | flags)
+            return self._exchange((header, array.tobytes()), self.timeout)
+
+    def image_to_string(self, img):
+        return self._request(img)
+
+    def image_to_words(self, img):
+        return [(text, tuple(box)) for text, box in json.loads(self._request(img, WORDS_REQUEST))]
+
+    def close(self):
+        with self._lock:
+            if self._proc.poll() is None:
+                try:
+                    self._proc.stdin.write(_REQUEST_HEADER.pack(0, 0, 0))
+                    self._proc.stdin.flush()
+                    self._proc.wait(timeout=2)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._proc.kill()
+
+def _read_response(stream):
+    (length,) = _RESPONSE_HEADER.unpack(_read_exact(stream, _RESPONSE_HEADER.size))
+    return _read_exact(stream, length).decode('utf-8')
+
+def _write_response(stream, text):
+    data = text.encode('utf-8')
+    stream.write(_RESPONSE_HEADER.pack(len(data)))
+    stream.write(data)
+    stream.flush()
+
+def serve(engine, stdin=None, stdout=None):
+    """
+    Loop of the local OCR process: read images from stdin, write the recognized text to stdout.
+    """
+    from PIL import Image
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    _write_response(stdout, "ready")
+    while True:
+        try:
+            width, height, channels = _REQUEST_HEADER.unpack(_read_exact(stdin, _REQUEST_HEADER.size))
+        except EOFError:
+            break
+        if width == 0 and height == 0:
+            break
+        words = bool(channels & WORDS_REQUEST)
+        channels &= ~WORDS_REQUEST
+        pixels = _read_exact(stdin, width * height * channels)
+        img = Image.frombytes('L' if channels == 1 else 'RGB', (width, height), pixels)
+        try:
+            text = json.dumps(engine.image_to_words(img)) if words else engine.image_to_string(img)
+        except Exception as e:
+            logging.error("OCR process error: %s", e)
+            text = "[]" if words else ""
+        _write_response(stdout, text)
+    engine.close()
+
+class FallbackEngine(OCREngine):
+    """
+    Use a primary engine and switch to the fallback engine for a call if the primary one fails.
+    """
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+        self.fallback_calls = 0
+
+    def image_to_string(self, img):
+        try:
+            return self.primary.image_to_string(img)
+        except Exception as e:
+            logging.debug("OCR engine %s failed (%s), falling back to %s", self.primary.name, e, self.fallback.name)
+            self.fallback_calls += 1
+            return self.fallback.image_to_string(img)
+
+    def image_to_words(self, img):
+        try:
+            return self.primary.image_to_words(img)
+        except Exception as e:
+            logging.debug("OCR engine %s cannot locate words (%r), falling back to %s", self.primary.name, e, self.fallback.name)
+            return self.fallback.image_to_words(img)
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+class ProfiledEngine(OCREngine):
+    """
+    Preprocess the captures of a region with its compiled profile before the OCR of the wrapped engine
+    (built with the Tesseract settings of the same profile).
+    """
+
+    def __init__(self, engine, profile):
+        self.engine = engine
+        self.profile = profile
+        self.name = f"{engine.name} ({profile.name})"
+
+    def image_to_string(self, img):
+        return self.engine.image_to_string(self.profile.apply(img))
+
+    def image_to_words(self, img):
+        """
+        Words with their boxes in the coordinates of the capture (not of the preprocessed image).
+        """
+        shape = img.shape if isinstance(img, np.ndarray) else (img.size[1], img.size[0])
+        return [(text, self.profile.source_box(box, shape)) for text, box in self.engine.image_to_words(self.profile.apply(img))]
+
+    def close(self):
+        self.engine.close()
+
+def _make_engine(name, lang, tessdata_path, tesseract_cmd, profile=None):
+    if name == "tesserocr":
+        return TesserocrEngine(lang, tessdata_path, profile)
+    if name == "capi":
+        return CapiEngine(lang, tessdata_path, tesseract_cmd, profile)
+    if name == "process":
+        return ProcessEngine("capi", lang, tessdata_path, tesseract_cmd, profile)
+    if name == "pytesseract":
+        return PytesseractEngine(lang, tesseract_cmd=tesseract_cmd, profile=profile)
+    if name == "fake":
+        return FakeEngine()
+    raise ValueError(f"Unknown OCR engine: {name}")
+
+def create_ocr_engine(preferred=("tesserocr", "process"), lang=DEFAULT_LANG, tessdata_path=None, tesseract_cmd=None,
+                      profile=None):
+    """
+    Create the first resident engine of `preferred` that can be initialized, backed by pytesseract as a fallback.
+    If no resident engine is available, the plain pytesseract engine is returned.
+    With a compiled region profile, the engines use its Tesseract settings and are wrapped in a ProfiledEngine.
+    """
+    fallback = PytesseractEngine(lang, tesseract_cmd=tesseract_cmd, profile=profile)
+    engine = fallback
+    for name in preferred:
+        try:
+            engine = FallbackEngine(_make_engine(name, lang, tessdata_path, tesseract_cmd, profile), fallback)
+            break
+        except Exception as e:
+            logging.info("OCR engine %s unavailable: %s", name, e)
+    region = f", profile {profile.name}" if profile is not None else ""
+    if isinstance(engine, FallbackEngine):
+        logging.info("OCR engine: %s (fallback: %s)%s", engine.primary.name, fallback.name, region)
+    else:
+        logging.info("OCR engine: %s%s", fallback.name, region)
+    return ProfiledEngine(engine, profile) if profile is not None else engine
+
+def image_bytes(img):
+    """
+    Raw pixel bytes of a PIL image or NumPy array, with its shape, for digests.
+    """
+    if isinstance(img, np.ndarray):
+        return np.ascontiguousarray(img).data, img.shape
+    return img.tobytes(), (img.size[1], img.size[0], len(img.getbands()))
+
+class OCRResultCache:
+    """
+    Frame-change detector in front of the OCR: the text recognized for a capture is cached against a digest
+    of its pixels, so the OCR only runs again when the pixels actually change.
+    Parameters:
+    - mode (str): "exact" hashes the raw pixels (xxhash if installed, blake2b otherwise),
+                  "perceptual" hashes a downsampled, quantized copy so that tiny rendering noise is ignored.
+    - max_entries (int): Number of recent digests kept (e.g. to switch between two pages without new OCR).
+    """
+
+    def __init__(self, mode="exact", max_entries=8):
+        if mode not in ("exact", "perceptual"):
+            raise ValueError(f"Unknown digest mode: {mode}")
+        self.mode = mode
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def digest(self, img):
+        """
+        Return the digest of a capture.
+        """
+        if self.mode == "perceptual":
+            import cv2
+            array = np.asarray(img)
+            if array.ndim == 3:
+                array = np.ascontiguousarray(array[:, :, 1]) # Green channel, close enough to the luminance
+            small = cv2.resize(array, (max(1, array.shape[1] // 4), max(1, array.shape[0] // 4)), interpolation=cv2.INTER_AREA)
+            data, shape = (small >> 4).tobytes(), small.shape # 16 grey levels per 4x4 block
+        else:
+            data, shape = image_bytes(img)
+        if xxhash is not None:
+            return (shape, xxhash.xxh3_64_intdigest(data))
+        return (shape, hashlib.blake2b(data, digest_size=8).digest())
+
+    def get(self, digest):
+        """
+        Return the cached text of a digest, or None if the frame was not seen recently. Updates the counters.
+        """
+        with self._lock:
+            text = self._entries.get(digest)
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(digest)
+            return text
+
+    def put(self, digest, text):
+        with self._lock:
+            self._entries[digest] = text
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Return the hit and miss counters and the share of OCR calls saved.
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+class CachedEngine(OCREngine):
+    """
+    OCR engine skipping the OCR when the image did not change since a previous call (see OCRResultCache).
+    """
+
+    def __init__(self, engine, cache=None):
+        self.engine = engine
+        self.cache = cache if cache is not None else OCRResultCache()
+        self.name = f"cached {engine.name}"
+
+    def image_to_string(self, img):
+        digest = self.cache.digest(img)
+        text = self.cache.get(digest)
+        if text is None:
+            text = self.engine.image_to_string(img)
+            self.cache.put(digest, text)
+        return text
+
+    def image_to_words(self, img):
+        return self.engine.image_to_words(img) # Only needed to locate a word once, not cached
+
+    def close(self):
+        self.engine.close()
+
+def make_stat_strip(text="Statistiques", width=400, height=50):
+    """
+    Synthetic stand-in for the 400x50 Stat region: dark background, light text.
+    """
+    import cv2
+    img = np.full((height, width, 3), 35, dtype=np.uint8)
+    cv2.putText(img, text, (10, 34), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (230, 230, 230), 2, cv2.LINE_AA)
+    return img
+
+def benchmark_ocr_engines(engines=("pytesseract", "tesserocr", "capi", "process", "fake"), iterations=20,
+                          image_path=None, tessdata_path=None, tesseract_cmd=None):
+    """
+    Compare the per-call latency of the OCR engines on the 400x50 Stat region
+    (a saved capture if image_path is given, a synthetic strip otherwise).
+    """
+    if image_path:
+        from PIL import Image
+        img = np.asarray(Image.open(image_path).convert('RGB'))
+    else:
+        img = make_stat_strip()
+
+    for name in engines:
+        try:
+            engine = ProcessEngine("fake") if name == "process-fake" else _make_engine(name, DEFAULT_LANG, tessdata_path, tesseract_cmd)
+            text = engine.image_to_string(img) # Warm-up, loads the model
+        except Exception as e:
+            print(f"{name:14s} unavailable: {e}")
+            continue
+        start = time.perf_counter()
+        for _ in range(iterations):
+            engine.image_to_string(img)
+        elapsed = (time.perf_counter() - start) / iterations
+        engine.close()
+        print(f"{name:14s} {elapsed * 1e3:8.2f} ms/call  text: {text.strip()!r}")
+
+def benchmark_ocr_cache(iterations=200, change_every=10, mode="exact"):
+    """
+    Cost of the digest on the 400x50 Stat strip, and the OCR calls saved when the screen changes
+    once every change_every captures.
+    """
+    frames = [make_stat_strip("Statistiques"), make_stat_strip("Tournois")]
+    engine = CachedEngine(FakeEngine(), OCRResultCache(mode))
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        frame = frames[(i // change_every) % 2].copy() # A new capture buffer every call, like the real grabs
+        engine.image_to_string(frame)
+    elapsed = (time.perf_counter() - start) / iterations
+
+    stats = engine.cache.stats()
+    print(f"{mode} digest ({'xxhash' if xxhash else 'blake2b'}): {elapsed * 1e6:.1f} us/call, "
+          f"{stats['hits']} hits, {stats['misses']} misses, OCR saved: {stats['hit_rate']:.0%}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="OCR engines: local OCR process and benchmark")
+    parser.add_argument("--serve", action="store_true", help="Run as the local OCR process (stdin/stdout protocol)")
+    parser.add_argument("--backend", default="capi", help="Engine used by the local OCR process")
+    parser.add_argument("--lang", default=DEFAULT_LANG)
+    parser.add_argument("--tessdata-path")
+    parser.add_argument("--tesseract-cmd")
+    parser.add_argument("--profile", help="Region profile (JSON) whose Tesseract settings the served engine uses")
+    parser.add_argument("--image", help="Saved 400x50 Stat capture to benchmark on")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.serve:
+        profile = None
+        if args.profile: # Settings only, the captures arrive already preprocessed by the ProfiledEngine of the client
+            from wmx_ocr_profiles import OCRProfile
+            profile = OCRProfile.from_dict(json.loads(args.profile)).compile()
+        try:
+            engine = _make_engine(args.backend, args.lang, args.tessdata_path, args.tesseract_cmd, profile)
+        except Exception as e:
+            _write_response(sys.stdout.buffer, f"{type(e).__name__}: {e}") # Instead of "ready"
+            sys.exit(1)
+        serve(engine)
+    else:
+        benchmark_ocr_engines(("pytesseract", "tesserocr", "capi", "process", "process-fake", "fake"), args.iterations,
+                              args.image, args.tessdata_path, args.tesseract_cmd)
+        benchmark_ocr_cache(mode="exact")
+        benchmark_ocr_cache(mode="perceptual")
@@ -0,0 +1,119 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from wmx_worker_queue import WorkerQueue
+
+# OCR executor #
+# A fixed number of worker threads fed by a bounded queue. When the queue is full the oldest pending frame is
+# dropped (its future is cancelled): a newer capture of the same screen makes it stale anyway.
+
+class OCRExecutor(WorkerQueue):
+    """
+    Bounded executor for the OCR jobs.
+    Parameters:
+    - workers (int): Number of worker threads.
+    - max_queue (int): Maximum number of pending jobs; the oldest one is dropped when a new job arrives on a full queue.
+    - latency_window (int): Number of recent jobs kept for the latency metrics.
+    """
+
+    def __init__(self, workers=1, max_queue=2, latency_window=256, name="ocr"):
+        super().__init__(latency_window) # Pending jobs: (future, key, fn, args, submit_time)
+        self.max_queue = max_queue
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self._start(f"{name}-{i}" for i in range(workers))
+
+    def submit(self, fn, *args, key=None):
+        """
+        Queue a job and return its Future.
+        If `key` is given, a pending job with the same key (an older frame of the same region) is replaced.
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OCR executor is shut down")
+            if key is not None:
+                for job in list(self._pending):
+                    if job[1] == key:
+                        self._pending.remove(job)
+                        self._drop(job)
+            while len(self._pending) >= self.max_queue:
+                self._drop(self._pending.popleft())
+            self._put((future, key, fn, args, time.perf_counter()))
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+        return future
+
+    def _drop(self, job):
+        job[0].cancel()
+        self.dropped += 1
+        logging.debug("Stale OCR job dropped (key: %s)", job[1])
+
+    def _run(self, job):
+        future, key, fn, args, submit_time = job
+        if not future.set_running_or_notify_cancel():
+            return
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            with self._cond:
+                self.failed += 1
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        end = time.perf_counter()
+        with self._cond:
+            self.completed += 1
+            self._record(submit_time, start, end)
+
+    def metrics(self):
+        """
+        Return the queue depth and job counters, and the latency percentiles in milliseconds.
+        """
+        with self._cond:
+            metrics = {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+        metrics.update(self.latency_metrics("run"))
+        return metrics
+
+    def shutdown(self, wait=True, cancel_pending=True):
+        """
+        Stop the workers. Pending jobs are cancelled unless cancel_pending is False, in which case they run first.
+        """
+        if cancel_pending:
+            with self._cond:
+                while self._pending:
+                    self._pending.popleft()[0].cancel()
+        self._stop(wait)
+
+def benchmark_ocr_executor(job_time=0.8, interval=0.5, ticks=20, workers=1, max_queue=2):
+    """
+    Simulate OCR jobs slower than the submit interval (the case where the threads used to pile up)
+    and show that the queue and the latency stay bounded. Times are scaled down by 100.
+    """
+    scale = 0.01
+    executor = OCRExecutor(workers=workers, max_queue=max_queue)
+    futures = []
+    for _ in range(ticks):
+        futures.append(executor.submit(time.sleep, job_time * scale, key="stat"))
+        time.sleep(interval * scale)
+    executor.shutdown(wait=True, cancel_pending=False)
+
+    metrics = executor.metrics()
+    print(f"{ticks} jobs of {job_time}s every {interval}s (x{scale}), {workers} worker(s), queue of {max_queue}: "
+          f"{metrics['completed']} completed, {metrics['dropped']} dropped, max depth {metrics['max_queue_depth']}, "
+          f"{threading.active_count()} threads alive, latency p95 {metrics['latency_p95_ms'] / scale:.0f} ms (unscaled)")
+
+if __name__ == "__main__":
+    benchmark_ocr_executor()
@@ -0,0 +1,252 @@
+import os
+import time
+import json
+import numpy as np
+import cv2
+
+# OCR region profiles #
+# Each OCR region gets a declarative profile: the preprocessing that makes its text easy for Tesseract (crop,
+# contrast, upscale, binarization, dark text on a light padded background) and the Tesseract settings that fit its
+# content (page segmentation mode, character whitelist, resolution hint). A profile is compiled once into lookup
+# tables, cv2 flags and engine settings, then applied to every capture with a few whole-array cv2 calls.
+# The same steps as the PIL chains of the old prototypes (grayscale, ImageEnhance.Contrast, ImageOps.invert).
+
+PSM_SINGLE_LINE = 7
+PSM_SINGLE_WORD = 8
+
+class OCRProfile:
+    """
+    Preprocessing and Tesseract settings of an OCR region.
+    Parameters:
+    - name (str): Name of the region.
+    - crop (tuple): (left, top, right, bottom) pixels of the capture to keep, as slice bounds (None or negative
+      values allowed), or None for the whole capture.
+    - scale (float): Resize factor (Tesseract reads best with capitals about 30 pixels high).
+    - contrast (float): Contrast factor around the mean level, as PIL's ImageEnhance.Contrast (1 leaves the levels).
+    - binarize: "otsu", a fixed threshold (0-255) or None to keep the gray levels.
+    - polarity (str): "light" for light text on a dark background (inverted), "dark" for the opposite, "auto" to
+      decide per capture from the mean level.
+    - pad (int): Width of the background border added around the text, in pixels after resizing.
+    - psm (int): Tesseract page segmentation mode (7 single line, 8 single word, None for the default).
+    - whitelist (str): Characters Tesseract may return (no spaces or quotes), None for all.
+    - dpi (int): Resolution hint given to Tesseract, None for none.
+    """
+
+    FIELDS = ("name", "crop", "scale", "contrast", "binarize", "polarity", "pad", "psm", "whitelist", "dpi")
+
+    def __init__(self, name, crop=None, scale=1.0, contrast=1.0, binarize="otsu", polarity="auto", pad=0, psm=None,
+                 whitelist=None, dpi=None):
+        if polarity not in ("light", "dark", "auto"):
+            raise ValueError(f"Unknown text polarity: {polarity}")
+        if binarize not in (None, "otsu") and (not isinstance(binarize, (int, float)) or isinstance(binarize, bool)
+                                               or not 0 <= binarize <= 255):
+            raise ValueError(f"Binarization must be 'otsu', a threshold between 0 and 255 or None: {binarize}")
+        if whitelist and any(c.isspace() or c in "'\"" for c in whitelist):
+            raise ValueError("The character whitelist cannot contain spaces or quotes")
+        self.name = name
+        self.crop = tuple(crop) if crop is not None else None
+        self.scale = scale
+        self.contrast = contrast
+        self.binarize = binarize
+        self.polarity = polarity
+        self.pad = pad
+        self.psm = psm
+        self.whitelist = whitelist
+        self.dpi = dpi
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    def compile(self):
+        return CompiledProfile(self)
+
+    def __repr__(self):
+        return f"OCRProfile({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+class CompiledProfile:
+    """
+    Profile ready to apply: slices, lookup table, cv2 flags and Tesseract settings computed once.
+    The Tesseract settings are exposed as a command line (`config`, pytesseract) and as the page segmentation
+    mode and variables of the C-API (`psm`, `variables`, tesserocr).
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.name = profile.name
+        left, top, right, bottom = profile.crop or (None, None, None, None)
+        self._rows = slice(top, bottom)
+        self._cols = slice(left, right)
+        self._scale = profile.scale if profile.scale != 1 else None
+        # Bilinear is enough before a threshold (and half the cost of bicubic), area averaging to shrink
+        self._interpolation = cv2.INTER_LINEAR if profile.scale > 1 else cv2.INTER_AREA
+        self._invert = profile.polarity == "light" # Known at compile time, folded into the LUT or the threshold
+        self._auto_invert = profile.polarity == "auto"
+        # Levels table of the contrast (the pivot, the mean level of the capture, is only known per capture)
+        self._levels = np.arange(256, dtype=np.float32)
+        self._contrast = profile.contrast if profile.contrast != 1 else None
+        # Without binarization, the inversion goes through a fixed LUT (or the contrast one)
+        self._invert_lut = (255 - self._levels).astype(np.uint8) if self._invert and profile.binarize is None and self._contrast is None else None
+        if profile.binarize is None:
+            self._threshold = None
+        else:
+            flag = cv2.THRESH_BINARY_INV if self._invert else cv2.THRESH_BINARY
+            if profile.binarize == "otsu":
+                self._threshold = (0, flag | cv2.THRESH_OTSU)
+            else:
+                self._threshold = (int(profile.binarize), flag)
+
+        self.psm = profile.psm
+        self.variables = {}
+        options = []
+        if profile.psm is not None:
+            options.append(f"--psm {profile.psm}")
+        if profile.dpi:
+            options.append(f"--dpi {profile.dpi}")
+            self.variables["user_defined_dpi"] = str(profile.dpi)
+        if profile.whitelist:
+            options.append(f"-c tessedit_char_whitelist={profile.whitelist}")
+            self.variables["tessedit_char_whitelist"] = profile.whitelist
+        self.config = " ".join(options)
+
+    def apply(self, img):
+        """
+        Preprocess a capture (PIL image, or grayscale, BGR or BGRA array) into a uint8 grayscale array with dark
+        text on a light background.
+        """
+        if not isinstance(img, np.ndarray):
+            img = np.asarray(img.convert('L'))
+        img = img[self._rows, self._cols]
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        if self._contrast is not None:
+            # One LUT pass: contrast around the mean level (ImageEnhance.Contrast) and the known inversion
+            mean = cv2.mean(img)[0]
+            lut = np.clip(mean + self._contrast * (self._levels - mean) + 0.5, 0, 255)
+            if self._invert and self._threshold is None:
+                lut = 255 - lut
+            img = cv2.LUT(img, lut.astype(np.uint8))
+        elif self._invert_lut is not None:
+            img = cv2.LUT(img, self._invert_lut)
+        if self._scale is not None:
+            img = cv2.resize(img, None, fx=self._scale, fy=self._scale, interpolation=self._interpolation)
+        if self._threshold is not None:
+            img = cv2.threshold(img, self._threshold[0], 255, self._threshold[1])[1]
+        if self._auto_invert and cv2.mean(img)[0] < 128: # Mostly dark: the background is dark, the text light
+            img = cv2.bitwise_not(img)
+        if self.profile.pad:
+            pad = self.profile.pad
+            img = cv2.copyMakeBorder(img, pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=255)
+        return img
+
+    def source_box(self, box, shape):
+        """
+        Map a box (x, y, width, height) found on the output of apply() back to the capture it was computed from.
+        :param shape: Shape of the capture (height, width, ...)
+        """
+        x, y, width, height = box
+        scale = self._scale or 1
+        pad = self.profile.pad
+        left = self._cols.indices(shape[1])[0]
+        top = self._rows.indices(shape[0])[0]
+        x, y = left + max(0, int((x - pad) / scale)), top + max(0, int((y - pad) / scale))
+        return (x, y, max(1, min(int(round(width / scale)), shape[1] - x)), max(1, min(int(round(height / scale)), shape[0] - y)))
+
+# Steps of the prototypes' PIL chain, to compare the costs
+PROTOTYPE_PROFILE = OCRProfile("prototype", contrast=2.0, binarize=None, polarity="light")
+# Stat strip (400x50 capture): light text on the dark client background, read as one line
+STAT_PROFILE = OCRProfile("stat", scale=2, contrast=2.0, binarize="otsu", polarity="light", pad=10,
+                          psm=PSM_SINGLE_LINE, whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzéèàç&",
+                          dpi=300)
+# Playground digit crop (about 15x28): a number from 1 to 12, read as one word of digits
+PLAYGROUND_DIGITS_PROFILE = OCRProfile("playground_digits", scale=4, binarize="otsu", polarity="auto", pad=8,
+                                       psm=PSM_SINGLE_WORD, whitelist="0123456789", dpi=300)
+
+def prototype_preprocess(img):
+    """
+    PIL chain of the old prototypes (.old/detecter winamax.py): grayscale, contrast x2, inversion.
+    """
+    from PIL import Image, ImageEnhance, ImageOps
+    from wmx_ocr import to_pil
+    gray = to_pil(img).convert('L') if isinstance(img, np.ndarray) else img.convert('L')
+    return ImageOps.invert(ImageEnhance.Contrast(gray).enhance(2))
+
+def _playground_samples(copies=10, seed=0):
+    # Digit crops of the Assets folder (file name = value), as light-on-dark BGRA captures with shifts and noise
+    from wmx_glyph_ocr import load_samples, augment_samples
+    assets = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Assets")
+    samples = augment_samples(load_samples([os.path.join(assets, f"{i}.jpg") for i in range(1, 13)]), copies, seed=seed)
+    return [(text, cv2.cvtColor(255 - img, cv2.COLOR_GRAY2BGRA)) for text, img, _ in samples]
+
+def benchmark_ocr_profiles(count=200, copies=10, ocr_engines=("tesserocr", "pytesseract"), tessdata_path=None,
+                           tesseract_cmd=None, dump_dir=None):
+    """
+    Per region (synthetic Stat strips, Assets digit crops): the cost of the compiled profile against the PIL chain
+    of the prototypes, then the accuracy and latency of Tesseract on the raw captures (default settings) against
+    the profiled ones, when a Tesseract engine is installed.
+    """
+    from wmx_ocr import _make_engine, DEFAULT_LANG
+    from wmx_stat_detector import make_stat_samples
+
+    regions = [
+        ("Stat strip", STAT_PROFILE, [(truth, cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)) for truth, img in make_stat_samples(count)],
+         lambda text, truth: ("Stat" in text) == truth),
+        ("Playground digits", PLAYGROUND_DIGITS_PROFILE, _playground_samples(copies),
+         lambda text, truth: text.strip() == truth),
+    ]
+
+    for label, profile, samples, correct in regions:
+        compiled = profile.compile()
+        images = [img for _, img in samples]
+        for name, preprocess in (("PIL prototype chain", prototype_preprocess),
+                                 ("same steps compiled", PROTOTYPE_PROFILE.compile().apply),
+                                 (f"{profile.name} profile", compiled.apply)):
+            preprocess(images[0])
+            start = time.perf_counter()
+            for img in images:
+                preprocess(img)
+            elapsed = (time.perf_counter() - start) / len(images)
+            print(f"{label:18s} {name:20s}: {elapsed * 1e6:8.1f} us/crop")
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+            for i, img in enumerate(images[:5]):
+                cv2.imwrite(os.path.join(dump_dir, f"{profile.name}_{i}.png"), compiled.apply(img))
+
+        for settings in (None, compiled):
+            engine = None
+            for name in ocr_engines:
+                try:
+                    engine = _make_engine(name, DEFAULT_LANG, tessdata_path, tesseract_cmd, settings)
+                    break
+                except Exception as e:
+                    error = e
+            if engine is None:
+                print(f"{label:18s} Tesseract unavailable ({error}), accuracy not measured")
+                break
+            prepare = compiled.apply if settings is not None else (lambda img: img)
+            engine.image_to_string(prepare(images[0])) # Warm-up, loads the model
+            start = time.perf_counter()
+            hits = sum(correct(engine.image_to_string(prepare(img)), truth) for truth, img in samples)
+            elapsed = (time.perf_counter() - start) / len(samples)
+            engine.close()
+            print(f"{label:18s} {engine.name} {'profiled' if settings is not None else 'raw':8s}: accuracy "
+                  f"{hits / len(samples):6.1%} | {elapsed * 1e3:7.2f} ms/crop"
+                  f"{' | ' + compiled.config if settings is not None else ''}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="OCR region profiles: preprocessing cost and Tesseract accuracy")
+    parser.add_argument("--count", type=int, default=200, help="Synthetic Stat strips")
+    parser.add_argument("--copies", type=int, default=10, help="Noisy shifted copies of each Assets digit crop")
+    parser.add_argument("--tessdata-path")
+    parser.add_argument("--tesseract-cmd")
+    parser.add_argument("--dump", help="Write a few preprocessed crops of each region to this folder")
+    parser.add_argument("--show", action="store_true", help="Print the profiles as JSON")
+    args = parser.parse_args()
+    if args.show:
+        print(json.dumps([STAT_PROFILE.to_dict(), PLAYGROUND_DIGITS_PROFILE.to_dict()], indent=1, ensure_ascii=False))
+    benchmark_ocr_profiles(args.count, args.copies, tessdata_path=args.tessdata_path, tesseract_cmd=args.tesseract_cmd,
+                           dump_dir=args.dump)
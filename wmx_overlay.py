@@ -0,0 +1,194 @@
+import logging
+import threading
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPixmap, QPainter, QRegion
+from PyQt5.QtCore import Qt, QRect, QObject, QThread, pyqtSignal
+from wmx_button_layout import ButtonLayout
+
+# Button overlay #
+# One transparent, always-on-top window per monitor draws every button from a single pixmap loaded once, and
+# hit-tests the clicks itself. The window's mask is the union of its buttons, so clicks anywhere else go to the
+# windows below. Only the areas of the buttons that appeared, moved or vanished are repainted. A window without
+# buttons is hidden, never destroyed, and shown again for the next button.
+
+OVERLAY_WINDOW_TITLE = "WinamaxOCR overlay"
+
+class GuiInvoker(QObject):
+    """
+    Runs functions on the GUI thread from any thread, through a queued signal.
+    To be created on the GUI thread.
+    """
+
+    _invoke = pyqtSignal(object, object, object)
+
+    def __init__(self):
+        super(GuiInvoker, self).__init__()
+        self._invoke.connect(self._run, Qt.QueuedConnection)
+
+    def call(self, fn, *args, wait=False, timeout=1.0):
+        """
+        Call fn(*args) on the GUI thread: directly when already on it, otherwise queued to the Qt event loop.
+        With wait=True, block until it has run (at most `timeout` seconds).
+        """
+        if QThread.currentThread() is self.thread():
+            fn(*args)
+            return
+        done = threading.Event() if wait else None
+        self._invoke.emit(fn, args, done)
+        if done is not None and not done.wait(timeout):
+            logging.debug("GUI call %s still pending after %ss.", getattr(fn, '__name__', fn), timeout)
+
+    def _run(self, fn, args, done):
+        try:
+            fn(*args)
+        except Exception as e:
+            logging.error("GUI call %s failed: %s", getattr(fn, '__name__', fn), e)
+        finally:
+            if done is not None:
+                done.set()
+
+class OverlayWindow(QWidget):
+    """
+    Transparent window covering one monitor, drawing the buttons the layout puts on it.
+    """
+
+    def __init__(self, overlay, index, geometry):
+        super(OverlayWindow, self).__init__(None)
+        self.overlay = overlay
+        self.index = index
+        self.setWindowTitle(OVERLAY_WINDOW_TITLE)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.set_monitor_geometry(geometry)
+        self.shown_once = False
+        overlay.windows_created += 1
+
+    def set_monitor_geometry(self, geometry):
+        left, top, right, bottom = geometry
+        self.origin = (left, top)
+        self.setGeometry(QRect(left, top, right - left, bottom - top))
+
+    def local_rect(self, rect):
+        return QRect(rect[0] - self.origin[0], rect[1] - self.origin[1], rect[2] - rect[0], rect[3] - rect[1])
+
+    def update_shape(self, buttons):
+        """
+        Restrict the window (drawing and clicks) to its buttons, and hide it when it has none.
+        """
+        if not buttons:
+            self.hide()
+            return
+        region = QRegion()
+        for button in buttons:
+            region = region.united(QRegion(self.local_rect(button.rect)))
+        self.setMask(region)
+        if not self.isVisible():
+            self.overlay.windows_reused += self.shown_once
+            self.shown_once = True
+            self.show()
+            self.raise_()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(event.rect(), Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        for button in self.overlay.layout.buttons_on(self.index):
+            target = self.local_rect(button.rect)
+            if target.intersects(event.rect()):
+                painter.drawPixmap(target, self.overlay.pixmap)
+        painter.end()
+        self.overlay.paints += 1
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        pos = event.globalPos()
+        button = self.overlay.layout.hit_test(pos.x(), pos.y())
+        if button is not None and button.on_click is not None:
+            logging.debug("Button %s clicked.", button.key)
+            button.on_click(button.hwnd)
+
+class ButtonOverlay:
+    """
+    Overlay windows of every monitor and their button layout.
+    Parameters:
+    - app (QApplication): Application, for the screen geometries.
+    - pixmap_path (str): Image of the buttons, loaded once.
+    - button_size (int): Size in pixels of the (square) buttons.
+    """
+
+    def __init__(self, app, pixmap_path, button_size=100):
+        self.app = app
+        self.pixmap = QPixmap(pixmap_path)
+        self.windows_created = 0
+        self.windows_reused = 0
+        self.layout = ButtonLayout(self._screen_rects(), (button_size, button_size))
+        self.windows = [OverlayWindow(self, index, rect) for index, rect in enumerate(self.layout.monitors)]
+        self.paints = 0
+
+    def _screen_rects(self):
+        rects = []
+        for screen in self.app.screens():
+            geometry = screen.geometry()
+            rects.append((geometry.left(), geometry.top(), geometry.left() + geometry.width(), geometry.top() + geometry.height()))
+        return rects
+
+    def show_button(self, key, pos, hwnd, on_click):
+        """
+        Show a button at the screen position pos (x, y), or move it there. Nothing is repainted if it is already there.
+        """
+        if self.layout.set_button(key, pos, hwnd, on_click):
+            self._apply()
+
+    def hide_button(self, key, immediate=False):
+        """
+        Hide a button. With immediate=True the area is repainted before returning (e.g. before a screen grab).
+        """
+        if self.layout.remove_button(key):
+            self._apply(immediate)
+
+    def is_shown(self, key):
+        return self.layout.button(key) is not None
+
+    def _apply(self, immediate=False):
+        dirty, shape_changed = self.layout.take_dirty()
+        for index in shape_changed:
+            self.windows[index].update_shape(self.layout.buttons_on(index))
+        for index, rects in dirty.items():
+            window = self.windows[index]
+            for rect in rects:
+                if immediate:
+                    window.repaint(window.local_rect(rect))
+                else:
+                    window.update(window.local_rect(rect)) # Coalesced by Qt into one paint per event loop pass
+
+    def on_display_change(self):
+        """
+        Follow a change of the monitor layout: one window per screen, every button redrawn.
+        """
+        rects = self._screen_rects()
+        while len(self.windows) < len(rects):
+            self.windows.append(OverlayWindow(self, len(self.windows), rects[len(self.windows)]))
+        while len(self.windows) > len(rects):
+            self.windows.pop().close()
+        for window, rect in zip(self.windows, rects):
+            window.set_monitor_geometry(rect)
+        self.layout.set_monitors(rects)
+        self._apply()
+
+    def stats(self):
+        return {
+            "windows": len(self.windows),
+            "windows_created": self.windows_created,
+            "windows_reused": self.windows_reused,
+            "buttons": len(self.layout),
+            "changes": self.layout.changes,
+            "unchanged": self.layout.unchanged,
+            "paints": self.paints,
+        }
+
+    def close(self):
+        for window in self.windows:
+            window.close()
@@ -0,0 +1,193 @@
+import time
+import queue
+import logging
+import threading
+
+# Detection pipeline thread #
+# The scheduled detection stages (process scan, window scan, pixel probes, OCR) run on their own thread, so the Qt
+# event loop owns the GUI thread and handles the clicks as soon as they happen. The GUI posts work to the pipeline
+# with post(); the pipeline sends its GUI updates back through a Qt signal (see wmx_overlay.GuiInvoker).
+
+class Pipeline:
+    """
+    Thread running a DeadlineScheduler (see wmx_scheduler) plus the calls posted by other threads.
+    Parameters:
+    - scheduler (DeadlineScheduler): Scheduler of the detection stages, only used from the pipeline thread.
+    - on_tick (callable): Called after each pass over the due stages (e.g. wmx_metrics.Tracer.tick).
+    - on_exit (callable): Called on the pipeline thread when it stops, to release what the thread owns (e.g.
+      wmx_capture.CaptureService.close_thread).
+    """
+
+    def __init__(self, scheduler, name="pipeline", on_tick=None, on_exit=None):
+        self.scheduler = scheduler
+        self.on_tick = on_tick
+        self.on_exit = on_exit
+        self._posted = queue.SimpleQueue()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._reschedules = set() # Tasks already posted for a reschedule
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.posted = 0
+        self.ticks = 0
+
+    def start(self):
+        self._thread.start()
+
+    def post(self, fn, *args):
+        """
+        Run fn(*args) on the pipeline thread as soon as possible (thread-safe).
+        """
+        self._posted.put((fn, args))
+        self.posted += 1
+        self._wakeup.set()
+
+    def wake(self):
+        """
+        End the current sleep of the pipeline (thread-safe).
+        """
+        self._wakeup.set()
+
+    def reschedule_soon(self, name):
+        """
+        Run a scheduled task right away, e.g. from a window event (thread-safe). A burst of requests before the
+        pipeline gets to it (e.g. the events of a window being dragged) results in a single run.
+        """
+        with self._lock:
+            if name in self._reschedules:
+                return
+            self._reschedules.add(name)
+        self.post(self._reschedule, name)
+
+    def _reschedule(self, name):
+        with self._lock:
+            self._reschedules.discard(name)
+        self.scheduler.reschedule(name)
+
+    def _wait(self, timeout):
+        woken = self._wakeup.wait(timeout)
+        self._wakeup.clear()
+        return woken
+
+    def _run_posted(self):
+        while True:
+            try:
+                fn, args = self._posted.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn(*args)
+            except Exception as e:
+                logging.error("Posted call %s failed: %s", getattr(fn, '__name__', fn), e)
+
+    def _run(self):
+        while not self._stopping:
+            self._run_posted()
+            self.scheduler.run_pending()
+            self.ticks += 1
+            if self.on_tick is not None:
+                self.on_tick()
+            self.scheduler.sleep_until_next(wait=self._wait)
+        self._run_posted() # Calls posted before stop() (e.g. a last click) still run
+        if self.on_exit is not None:
+            try:
+                self.on_exit()
+            except Exception as e:
+                logging.error("Pipeline exit call failed: %s", e)
+
+    def stop(self, timeout=None):
+        """
+        Stop the pipeline after its current stage and wait for the thread. Returns False on timeout.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+def benchmark_click_latency(clicks=40, tick_work=0.3, loop_interval=1.0, scale=0.05, seed=0):
+    """
+    Time from a click to its handler while the detection stages are busy: the single-threaded loop (work, then
+    processEvents(), then sleep) against the Qt event loop on its own thread with the pipeline thread doing the work.
+    The GUI event loop is stood in for by a thread blocked on its event queue. Times are scaled by `scale`.
+    """
+    import random
+    import numpy as np
+    from wmx_scheduler import DeadlineScheduler
+
+    rng = random.Random(seed)
+    work = tick_work * scale
+    interval = loop_interval * scale
+    data = np.random.default_rng(seed).random((256, 256))
+
+    def detection_tick():
+        time.sleep(work / 2) # Win32 / mss / Tesseract calls release the GIL
+        end = time.perf_counter() + work / 2
+        while time.perf_counter() < end: # NumPy and Python work holds it part of the time
+            data.sum()
+
+    def click_times(start):
+        times, now = [], start
+        for _ in range(clicks):
+            now += rng.uniform(0.5, 1.5) * interval
+            times.append(now)
+        return times
+
+    def percentiles(latencies):
+        latencies = sorted(latencies)
+        return latencies[len(latencies) // 2] / scale * 1e3, latencies[int(0.95 * len(latencies))] / scale * 1e3, latencies[-1] / scale * 1e3
+
+    def run_clicker(events, times):
+        for click_time in times:
+            delay = click_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            events.put(click_time)
+        events.put(None)
+
+    # Single thread: the clicks wait for processEvents() between the work and the sleep
+    events = queue.SimpleQueue()
+    times = click_times(time.perf_counter() + interval)
+    clicker = threading.Thread(target=run_clicker, args=(events, times))
+    clicker.start()
+    legacy, done = [], False
+    while not done:
+        detection_tick()
+        while True: # processEvents()
+            try:
+                click_time = events.get_nowait()
+            except queue.Empty:
+                break
+            if click_time is None:
+                done = True
+                break
+            legacy.append(time.perf_counter() - click_time)
+        time.sleep(interval)
+    clicker.join()
+
+    # Event loop on the GUI thread, detection on the pipeline thread
+    scheduler = DeadlineScheduler()
+    scheduler.add("detection", detection_tick, interval=interval)
+    pipeline = Pipeline(scheduler)
+    pipeline.start()
+    events = queue.SimpleQueue()
+    times = click_times(time.perf_counter() + interval)
+    clicker = threading.Thread(target=run_clicker, args=(events, times))
+    clicker.start()
+    threaded, handled = [], []
+    while True: # app.exec_()
+        click_time = events.get()
+        if click_time is None:
+            break
+        threaded.append(time.perf_counter() - click_time)
+        pipeline.post(handled.append, click_time) # The save itself runs on the pipeline
+    clicker.join()
+    pipeline.stop()
+
+    for label, latencies in (("processEvents() + sleep loop", legacy), ("Qt loop + pipeline thread", threaded)):
+        p50, p95, worst = percentiles(latencies)
+        print(f"{label:30s} click to handler p50 {p50:7.1f} ms | p95 {p95:7.1f} ms | max {worst:7.1f} ms (unscaled)")
+    print(f"{len(handled)} saves run on the pipeline thread, {pipeline.ticks} pipeline ticks")
+
+if __name__ == "__main__":
+    benchmark_click_latency()
@@ -0,0 +1,193 @@
+import time
+
+# Process registry #
+# A single pass over the process table per tick, with the Winamax and explorer PIDs cached
+# until one of them goes away. Replaces the repeated psutil.process_iter() walks of the main loop.
+
+DEFAULT_RESCAN_INTERVAL = 5.0 # Interval in seconds after which a full scan is forced even if every cached PID is alive
+
+class PsutilProcessSource:
+    """
+    Process source backed by psutil, restricted to the 'pid' and 'name' attributes.
+    """
+
+    def __init__(self):
+        import psutil # Imported here so the registry can be used (and benchmarked) without psutil installed
+        self._psutil = psutil
+
+    def iter_processes(self):
+        """
+        Yield a (pid, name) tuple for every running process.
+        The name may be None if the process denied access to it.
+        """
+        for proc in self._psutil.process_iter(['pid', 'name']):
+            yield proc.info['pid'], proc.info['name']
+
+    def pid_exists(self, pid):
+        """
+        Return True if a process with the given PID is still running.
+        """
+        return self._psutil.pid_exists(pid)
+
+class FakeProcessSource:
+    """
+    In-memory process source, used to benchmark the registry on any platform.
+    Counts how many process entries were visited so scans can be compared.
+    """
+
+    def __init__(self, processes=None):
+        """
+        :param processes: dict {pid: name} of the initial fake processes
+        """
+        self.processes = dict(processes or {})
+        self.scans = 0 # Number of full scans requested
+        self.visited = 0 # Number of process entries yielded across all scans
+
+    def add(self, pid, name):
+        self.processes[pid] = name
+
+    def remove(self, pid):
+        self.processes.pop(pid, None)
+
+    def iter_processes(self):
+        self.scans += 1
+        for pid, name in list(self.processes.items()):
+            self.visited += 1
+            yield pid, name
+
+    def pid_exists(self, pid):
+        return pid in self.processes
+
+class ProcessRegistry:
+    """
+    Cache of the Winamax and explorer.exe PIDs.
+    refresh() is meant to be called once per tick: it only rescans the process table when a cached
+    PID went away, when nothing was found yet, or when the forced rescan interval elapsed.
+    """
+
+    def __init__(self, wmx_proc_name, source=None, explorer_proc_name="explorer.exe",
+                 rescan_interval=DEFAULT_RESCAN_INTERVAL, clock=time.monotonic):
+        self.wmx_proc_name = wmx_proc_name
+        self.explorer_proc_name = explorer_proc_name
+        self.source = source if source is not None else PsutilProcessSource()
+        self.rescan_interval = rescan_interval
+        self.clock = clock
+        self._wmx_pids = []
+        self._explorer_pid = None
+        self._last_scan = None
+
+    def _needs_scan(self):
+        """
+        Decide whether the cached PIDs can be reused for this tick.
+        """
+        if self._last_scan is None or not self._wmx_pids:
+            return True # Never scanned, or Winamax not running: a new process may have started
+        if self.clock() - self._last_scan >= self.rescan_interval:
+            return True
+        cached = self._wmx_pids + ([self._explorer_pid] if self._explorer_pid is not None else [])
+        return not all(self.source.pid_exists(pid) for pid in cached)
+
+    def scan(self):
+        """
+        Walk the process table once and update the cached PIDs.
+        """
+        wmx_name = self.wmx_proc_name
+        explorer_name = self.explorer_proc_name.lower()
+        wmx_pids = []
+        explorer_pid = None
+
+        for pid, name in self.source.iter_processes():
+            if not name:
+                continue # Access denied or process vanished during the scan
+            if name == wmx_name:
+                wmx_pids.append(pid)
+            elif explorer_pid is None and name.lower() == explorer_name:
+                explorer_pid = pid
+
+        self._wmx_pids = wmx_pids
+        self._explorer_pid = explorer_pid
+        self._last_scan = self.clock()
+
+    def refresh(self):
+        """
+        Rescan the process table if the cache is stale. Returns True if a scan was performed.
+        """
+        if self._needs_scan():
+            self.scan()
+            return True
+        return False
+
+    def _ensure_scanned(self):
+        if self._last_scan is None:
+            self.scan()
+
+    def wmx_proc_names(self):
+        """
+        Same answer as check_wmx_proc_alive_(): a set containing the Winamax process name if it runs.
+        """
+        self._ensure_scanned()
+        return {self.wmx_proc_name} if self._wmx_pids else set()
+
+    def wmx_pids(self):
+        """
+        Same answer as get_wmx_pids_(): the list of Winamax PIDs.
+        """
+        self._ensure_scanned()
+        return list(self._wmx_pids)
+
+    def explorer_pid(self):
+        """
+        Same answer as get_explorer_pid(): the PID of explorer.exe, or None if not found.
+        """
+        self._ensure_scanned()
+        return self._explorer_pid
+
+def build_fake_source(num_processes=300, wmx_proc_name="Winamax.exe", num_wmx=1):
+    """
+    Build a FakeProcessSource with num_processes processes, including explorer.exe and num_wmx Winamax processes.
+    """
+    processes = {4 * (i + 1): f"process_{i}.exe" for i in range(num_processes)}
+    pids = sorted(processes)
+    processes[pids[len(pids) // 3]] = "explorer.exe"
+    for i in range(num_wmx):
+        processes[pids[-1 - i]] = wmx_proc_name
+    return FakeProcessSource(processes)
+
+def benchmark_process_registry(num_processes=300, num_tables=12, ticks=500):
+    """
+    Compare the legacy per-tick scans (check alive + get PIDs + one explorer lookup per visible table)
+    against a single ProcessRegistry.refresh() per tick, on a fake process table.
+    """
+    wmx_proc_name = "Winamax.exe"
+
+    # Legacy: every helper walks the whole process table
+    legacy_source = build_fake_source(num_processes, wmx_proc_name)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        alive = {name for _, name in legacy_source.iter_processes() if name == wmx_proc_name}
+        if alive:
+            [pid for pid, name in legacy_source.iter_processes() if name == wmx_proc_name]
+            for _ in range(num_tables):
+                next((pid for pid, name in legacy_source.iter_processes() if name.lower() == "explorer.exe"), None)
+    legacy_elapsed = time.perf_counter() - start
+
+    # Registry: one refresh per tick, cached answers for every lookup
+    registry_source = build_fake_source(num_processes, wmx_proc_name)
+    registry = ProcessRegistry(wmx_proc_name, source=registry_source)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        registry.refresh()
+        if registry.wmx_proc_names():
+            registry.wmx_pids()
+            for _ in range(num_tables):
+                registry.explorer_pid()
+    registry_elapsed = time.perf_counter() - start
+
+    print(f"{ticks} ticks, {num_processes} processes, {num_tables} tables")
+    print(f"Legacy   : {legacy_source.scans} scans, {legacy_source.visited} entries visited, "
+          f"{legacy_elapsed / ticks * 1e6:.1f} us/tick")
+    print(f"Registry : {registry_source.scans} scans, {registry_source.visited} entries visited, "
+          f"{registry_elapsed / ticks * 1e6:.1f} us/tick")
+
+if __name__ == "__main__":
+    benchmark_process_registry()
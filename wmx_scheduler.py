@@ -0,0 +1,256 @@
+import time
+import heapq
+import itertools
+import logging
+
+# Deadline scheduler #
+# A heap of next-due tasks: the main loop runs what is due, then sleeps exactly until the next deadline.
+# Task intervals adapt to their results: a task reporting a change runs again at its minimum interval,
+# an idle task backs off up to its maximum interval.
+
+class ManualClock:
+    """
+    Deterministic clock for simulations: time only advances through sleep().
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+class Task:
+    """
+    A scheduled task.
+    - interval: current interval in seconds, kept between min_interval and max_interval.
+    - backoff: factor applied to the interval each time the task reports it was idle.
+    """
+
+    def __init__(self, name, fn, interval, min_interval, max_interval, backoff, group=None, key=None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.min_interval = interval if min_interval is None else min_interval
+        self.max_interval = interval if max_interval is None else max_interval
+        self.backoff = backoff
+        self.group = group
+        self.key = key
+        self.deadline = None
+        self.active = True
+        self.runs = 0
+
+    def adapt(self, changed):
+        """
+        Update the interval from the task result: True = state changed (speed up), False = idle (back off),
+        None = keep the interval.
+        """
+        if changed is None:
+            return
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+class DeadlineScheduler:
+    """
+    Deadline scheduler with an injectable clock and sleep function.
+    Single tasks are plain callables. Grouped tasks (e.g. one per table) share a handler called once with the keys
+    of every member due at the same time, so their work can be batched (e.g. one screen grab for all tables).
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self._heap = []
+        self._seq = itertools.count()
+        self._tasks = {}
+        self._groups = {} # {group: handler}
+
+    def _push(self, task, deadline):
+        task.deadline = deadline
+        heapq.heappush(self._heap, (deadline, next(self._seq), task))
+
+    def add(self, name, fn, interval, min_interval=None, max_interval=None, backoff=2.0, delay=0.0):
+        """
+        Add a task. fn() may return True (changed), False (idle) or None to adapt its interval.
+        The first run happens after `delay` seconds.
+        """
+        self.remove(name)
+        task = Task(name, fn, interval, min_interval, max_interval, backoff)
+        self._tasks[name] = task
+        self._push(task, self.clock() + delay)
+        return task
+
+    def add_group(self, group, handler):
+        """
+        Register the handler of a group: handler(keys) -> {key: True | False | None}.
+        """
+        self._groups[group] = handler
+
+    def add_member(self, group, key, interval, min_interval=None, max_interval=None, backoff=2.0, delay=0.0):
+        """
+        Add a member to a group, if not already there. Returns the member task.
+        """
+        name = (group, key)
+        if name in self._tasks:
+            return self._tasks[name]
+        task = Task(name, None, interval, min_interval, max_interval, backoff, group, key)
+        self._tasks[name] = task
+        self._push(task, self.clock() + delay)
+        return task
+
+    def remove(self, name):
+        task = self._tasks.pop(name, None)
+        if task is not None:
+            task.active = False # Lazily dropped from the heap
+
+    def remove_member(self, group, key):
+        self.remove((group, key))
+
+    def members(self, group):
+        return [task.key for task in self._tasks.values() if task.group == group]
+
+    def reschedule(self, name, delay=0.0):
+        """
+        Move the deadline of a task earlier (e.g. when an event makes its work urgent).
+        """
+        task = self._tasks.get(name)
+        if task is not None:
+            deadline = self.clock() + delay
+            if deadline < task.deadline:
+                self._push(task, deadline)
+
+    def _pop_stale(self):
+        while self._heap:
+            deadline, _, task = self._heap[0]
+            if task.active and task.deadline == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    def next_deadline(self):
+        self._pop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def time_until_next(self):
+        deadline = self.next_deadline()
+        return None if deadline is None else max(0.0, deadline - self.clock())
+
+    def run_pending(self):
+        """
+        Run every task whose deadline has passed. Returns the number of tasks run.
+        """
+        now = self.clock()
+        due = []
+        while True:
+            self._pop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            due.append(heapq.heappop(self._heap)[2])
+
+        grouped = {}
+        for task in due:
+            if task.group is None:
+                try:
+                    changed = task.fn()
+                except Exception as e:
+                    logging.error("Scheduled task %s failed: %s", task.name, e)
+                    changed = None
+                self._done(task, changed, now)
+            else:
+                grouped.setdefault(task.group, []).append(task)
+
+        for group, tasks in grouped.items():
+            try:
+                results = self._groups[group]([task.key for task in tasks]) or {}
+            except Exception as e:
+                logging.error("Scheduled group %s failed: %s", group, e)
+                results = {}
+            for task in tasks:
+                self._done(task, results.get(task.key), now)
+
+        return len(due)
+
+    def _done(self, task, changed, now):
+        task.runs += 1
+        if not task.active:
+            return # Removed while running
+        task.adapt(changed)
+        self._push(task, max(now, task.deadline + task.interval)) # Keep the cadence without bursts after a late run
+
+    def sleep_until_next(self, wait=None, max_sleep=None):
+        """
+        Sleep until the next deadline. If `wait` is given (e.g. an event wait(timeout)), it is used instead of
+        sleep so that an external change can end the sleep early; its result is returned.
+        """
+        delay = self.time_until_next()
+        if max_sleep is not None:
+            delay = max_sleep if delay is None else min(delay, max_sleep)
+        if wait is not None:
+            return wait(delay)
+        if delay:
+            self.sleep(delay)
+        return False
+
+def simulate_result_latency(num_results=200, loop_interval=1.0, probe_interval=0.5, min_probe_interval=0.2,
+                            tick_cost=0.05, seed=0):
+    """
+    Deterministic simulation of the delay between a result frame appearing on a table and its detection:
+    the fixed loop (pixel probe once per iteration, then sleep(1)) against the deadline scheduler.
+    """
+    import random
+    rng = random.Random(seed)
+    appear_times = sorted(rng.uniform(0, num_results * 3.0) for _ in range(num_results))
+
+    def latencies_of(detection_times):
+        return [detected - appeared for appeared, detected in zip(appear_times, detection_times)]
+
+    # Fixed loop: the work of a tick takes tick_cost, then a flat sleep
+    detections = []
+    now = 0.0
+    pending = list(appear_times)
+    while pending:
+        now += tick_cost
+        while pending and pending[0] <= now:
+            detections.append(now)
+            pending.pop(0)
+        now += loop_interval
+    fixed = latencies_of(detections)
+
+    # Scheduler: the probe group runs at its own deadline, speeds up after a change and backs off when idle
+    clock = ManualClock()
+    scheduler = DeadlineScheduler(clock=clock, sleep=clock.sleep)
+    detections = []
+    pending = list(appear_times)
+    displayed = {"table": False}
+
+    def probe(keys):
+        visible = bool(pending) and pending[0] <= clock()
+        results = {}
+        for key in keys:
+            changed = visible != displayed[key]
+            if visible:
+                detections.append(clock())
+                pending.pop(0)
+                visible = False
+            displayed[key] = visible
+            results[key] = changed
+        return results
+
+    scheduler.add_group("probe", probe)
+    scheduler.add_member("probe", "table", interval=probe_interval, min_interval=min_probe_interval,
+                         max_interval=probe_interval, backoff=1.5)
+    while pending:
+        scheduler.run_pending()
+        scheduler.sleep_until_next()
+    scheduled = latencies_of(detections)
+
+    for label, values in (("Fixed sleep(1) loop", fixed), ("Deadline scheduler", scheduled)):
+        values = sorted(values)
+        print(f"{label:20s} mean {sum(values) / len(values) * 1e3:6.0f} ms | "
+              f"p95 {values[int(0.95 * len(values))] * 1e3:6.0f} ms | max {values[-1] * 1e3:6.0f} ms")
+
+if __name__ == "__main__":
+    simulate_result_latency()
@@ -0,0 +1,188 @@
+import os
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import Future
+import numpy as np
+from wmx_frame import Frame
+from wmx_worker_queue import WorkerQueue
+
+# Screenshot writer #
+# The click handlers only grab the pixels; a background worker converts them, creates the folders and encodes
+# the JPEG, so the Qt thread never waits on the disk. The queue is bounded: when it is full the screenshot is
+# written on the calling thread instead of being dropped.
+
+# Names of the month folders, as strftime("%B") writes them under the fr_FR locale
+FRENCH_MONTHS = ("janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août", "septembre", "octobre",
+                 "novembre", "décembre")
+
+def month_name(month):
+    """
+    Name of a month in French, from a fixed table: no process-wide locale change.
+    """
+    return FRENCH_MONTHS[month - 1]
+
+class MonthFolders:
+    """
+    Path of the month sub-folder of a base folder, created once per month and memoized.
+    """
+
+    def __init__(self, base_folder, month_name_fn=month_name):
+        self.base_folder = base_folder
+        self.month_name_fn = month_name_fn
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def path(self, when):
+        """
+        Return the folder of the month of `when` (a datetime), creating it if needed.
+        """
+        key = (when.year, when.month)
+        with self._lock:
+            full_path = self._paths.get(key)
+            if full_path is None:
+                full_path = os.path.join(self.base_folder, self.month_name_fn(when.month))
+                if not os.path.exists(full_path):
+                    logging.debug("Creating the folder: %s", full_path)
+                    os.makedirs(full_path, exist_ok=True)
+                self._paths[key] = full_path
+        return full_path
+
+def to_pil_image(image):
+    """
+    Convert a BGRA or BGR capture (see wmx_capture) or a Frame to an RGB PIL image. PIL images are returned as they are.
+    """
+    if isinstance(image, Frame):
+        return image.pil()
+    if not isinstance(image, np.ndarray):
+        return image
+    from PIL import Image
+    height, width = image.shape[:2]
+    raw_mode = 'BGRX' if image.shape[2] == 4 else 'BGR'
+    return Image.frombuffer('RGB', (width, height), np.ascontiguousarray(image), 'raw', raw_mode, 0, 1)
+
+class ScreenshotWriter(WorkerQueue):
+    """
+    Background JPEG writer with a bounded queue.
+    Parameters:
+    - max_queue (int): Maximum number of pending screenshots; beyond it the screenshot is written on the caller thread.
+    - quality (int): JPEG quality.
+    - latency_window (int): Number of recent writes kept for the latency metrics.
+    """
+
+    def __init__(self, max_queue=16, quality=75, latency_window=256, name="screenshot-writer"):
+        super().__init__(latency_window) # Pending jobs: (future, image, path, submit_time)
+        self.max_queue = max_queue
+        self.quality = quality
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.written_inline = 0
+        self._start([name])
+
+    def submit(self, image, path):
+        """
+        Queue a screenshot and return a Future resolved with the path of the written file.
+        Parameters:
+        - image (np.ndarray | PIL.Image): BGRA or BGR capture, or PIL image.
+        - path (str | callable): File path, or a function returning it, called on the worker (folder creation,
+          title sanitising...).
+        """
+        future = Future()
+        job = (future, image, path, time.perf_counter())
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Screenshot writer is closed")
+            self.submitted += 1
+            if len(self._pending) < self.max_queue:
+                self._put(job)
+                return future
+            self.written_inline += 1
+        logging.warning("Screenshot queue full, writing on the calling thread.")
+        self._run(job)
+        return future
+
+    def _run(self, job):
+        future, image, path, submit_time = job
+        if not future.set_running_or_notify_cancel():
+            return
+        start = time.perf_counter()
+        try:
+            file_path = path() if callable(path) else path
+            to_pil_image(image).save(file_path, "JPEG", quality=self.quality)
+        except BaseException as e:
+            logging.error("Error saving the image: %s", e)
+            with self._cond:
+                self.failed += 1
+            future.set_exception(e)
+            return
+        end = time.perf_counter()
+        logging.info("Image successfully saved: %s", file_path)
+        with self._cond:
+            self.written += 1
+            self._record(submit_time, start, end)
+        future.set_result(file_path)
+
+    def close(self, timeout=None):
+        """
+        Write the pending screenshots, then stop the worker. Returns False if the timeout expired first.
+        """
+        flushed = self.flush(timeout)
+        self._stop(timeout=timeout)
+        return flushed
+
+    def metrics(self):
+        """
+        Return the counters and the write latency percentiles in milliseconds.
+        """
+        with self._cond:
+            metrics = {
+                "queue_depth": len(self._pending),
+                "submitted": self.submitted,
+                "written": self.written,
+                "failed": self.failed,
+                "written_inline": self.written_inline,
+            }
+        metrics.update(self.latency_metrics("write"))
+        return metrics
+
+def benchmark_screenshot_writer(count=50, width=1000, height=600, folder=None):
+    """
+    Time spent on the calling (Qt) thread per screenshot: synchronous save against a queued save.
+    """
+    import tempfile
+    from datetime import datetime
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8) for _ in range(4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = folder or tmp
+        folders = MonthFolders(folder, month_name_fn=lambda month: f"{month:02d}")
+
+        start = time.perf_counter()
+        for i in range(count):
+            full_path = os.path.join(folder, "sync")
+            os.makedirs(full_path, exist_ok=True)
+            to_pil_image(frames[i % len(frames)]).save(os.path.join(full_path, f"{i}.jpg"), "JPEG")
+        sync = (time.perf_counter() - start) / count
+
+        writer = ScreenshotWriter(max_queue=count)
+        start = time.perf_counter()
+        for i in range(count):
+            when = datetime.now()
+            writer.submit(frames[i % len(frames)], lambda i=i, when=when: os.path.join(folders.path(when), f"{i}.jpg"))
+        queued = (time.perf_counter() - start) / count
+        writer.close()
+
+    metrics = writer.metrics()
+    print(f"{count} screenshots of {width}x{height}: synchronous save {sync * 1e3:.2f} ms on the caller thread | "
+          f"queued {queued * 1e3:.3f} ms on the caller thread, write p50 {metrics['write_p50_ms']:.2f} ms, "
+          f"latency p95 {metrics['latency_p95_ms']:.1f} ms, {metrics['written']} written")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the background screenshot writer.")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--folder", default=None, help="Folder to write to (a temporary folder by default)")
+    args = parser.parse_args()
+    benchmark_screenshot_writer(count=args.count, folder=args.folder)
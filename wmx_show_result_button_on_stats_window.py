@@ -1,26 +1,38 @@
-import psutil
 import cv2
-import numpy as np
 import win32gui
-import win32con
-import win32api
 import win32process
 import time
-import locale
 from datetime import datetime
-from PIL import Image
-import pytesseract 
 import os
-import mss
 import pygetwindow as gw
-from PyQt5.QtWidgets import QApplication, QLabel, QPushButton, QWidget
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QRect
-import threading
+from PyQt5.QtWidgets import QApplication
 import queue
 import keyboard
 import logging
 import re
+import functools
+from wmx_process_registry import ProcessRegistry
+from wmx_capture import CaptureService, color_matches
+from wmx_templates import TemplateBank, DigitClassifier
+from wmx_ocr import create_ocr_engine, CachedEngine, OCRResultCache, FallbackEngine
+from wmx_glyph_ocr import load_glyph_engine
+from wmx_ocr_profiles import STAT_PROFILE, PLAYGROUND_DIGITS_PROFILE
+from wmx_ocr_executor import OCRExecutor
+from wmx_window_tracker import WindowTracker, Win32EventSource
+from wmx_scheduler import DeadlineScheduler
+from wmx_visibility import snapshot_z_order, compute_visibility
+from wmx_snapshot import build_window_snapshots
+from wmx_screenshot_writer import ScreenshotWriter, MonthFolders
+from wmx_frame_buffer import ResultFrameBuffer
+from wmx_auto_capture import AutoCapture
+from wmx_overlay import ButtonOverlay, GuiInvoker
+from wmx_pipeline import Pipeline
+from wmx_logging import setup_logging, Lazy
+from wmx_button_layout import Hysteresis
+from wmx_metrics import Tracer
+from wmx_frame import frame_stats
+from wmx_buffer_pool import BufferPool, PoolExhausted
+from wmx_stat_detector import StatDetector, StatTemplateMatcher, STAT_TEMPLATE_PATH
 
 # Global variables #
 
@@ -32,6 +44,8 @@ playground_value = "1" # list(range(1, 13)) # List of values to search for in th
 button_image_path = r"Assets\DLBTN.png"
 template_dir = 'Assets'
 num_templates = 12
+stat_template_path = STAT_TEMPLATE_PATH # Crop of the "Stat" word learned from the first OCR match, in the user data folder (Assets/stat_word.png, if shipped, is only read)
+glyph_model_path = os.path.join(template_dir, "glyphs.wmxg") # Fixed-font glyph model (python wmx_glyph_ocr.py train), Tesseract only if missing
 x_coord_window = 0
 y_coord_window = 0
 x_coord_playground = 0
@@ -40,31 +54,89 @@ playground_width = 0
 playground_height = 0
 string_found = None  
 playground_table_value_found = None
-button_stat_window_var =     None
-button_table_window_var = {}
+button_overlay = None # Overlay windows drawing every button (one per monitor), created in main()
+gui = None # Runs the button updates of the pipeline thread on the GUI thread, created in main()
+pipeline = None # Thread running the detection stages, created in main()
 button_instances = {}
 start_ocr_timestamp = time.time()
 search_interval_OCR = 1/2 # Interval in seconds to start the OCR thread
 last_pixel_check_timestamp = {} # Initialize a dictionary to store the last pixel check timestamp for each hwnd
-search_interval_pixel_color = 1/2 # Interval in seconds to check the pixel color
+search_interval_pixel_color = 1/2 # Interval in seconds to check the pixel color (idle tables back off up to this interval)
 result_frame_hex_color = "#232323" # Hex color code of the result frame in Winamax
-
-ocr_stat_thread_done = threading.Event()
-ocr_playground_thread_done = threading.Event()
+result_frame_color_tolerance = 6 # Maximum RGB distance to result_frame_hex_color still considered as the result frame
+last_table_result_displayed = {} # Initialize a dictionary to store the last pixel check result for each hwnd
+result_displayed_since = {} # {hwnd: result_frame_buffer.clock() of the last probe that saw the result frame appear}
+
+stat_ocr_future = None # Future of the last Stat OCR job, each job publishes its verdict to string_found when done
+playground_ocr_future = None # Future of the last Playground OCR job
+ocr_executor_workers = 1 # Number of OCR worker threads
+ocr_executor_max_queue = 2 # Maximum number of pending OCR jobs, the oldest frame is dropped beyond that
+screenshot_writer_max_queue = 16 # Maximum number of screenshots waiting to be written, written on the calling thread beyond that
+result_frames_per_table = 3 # Number of result frame captures kept per table
+result_frame_buffer_max_bytes = 32 * 1024 * 1024 # Memory cap of the result frame captures of all tables
+capture_pool_max_bytes = 8 * 1024 * 1024 # Memory ceiling of the reusable buffers of the Stat, Playground and result captures
+table_button_hide_after = 3 # Consecutive negative probes needed before a table button is hidden
+auto_capture_tables = False # Save the table results automatically as soon as they appear, without a click
+auto_capture_debounce = 0.5 # Seconds a result frame must stay displayed before it is captured automatically
+playground_debug_dump = False # Save every Playground capture as playground_table_<timestamp>.jpg next to the script, to debug the table count
+process_scan_interval = 1 # Interval in seconds between two scans of the process table
+window_scan_interval = 1 # Interval in seconds between two scans of the Winamax windows (sooner on a window event)
+min_search_interval_pixel_color = 0.2 # Interval in seconds to check the pixel color of a table whose result frame just changed
+escape_check_interval = 0.05 # Interval in seconds to check the escape key
+stage_metrics_enabled = False # Time every stage (rolling p50/p95/p99 per stage and per table), no cost when disabled
+stage_metrics_window = 1024 # Number of recent timings kept per stage for the percentiles
+stage_metrics_file = "winamaxocr_metrics.json" # File the stage percentiles are written to (None to disable)
+stage_metrics_export_interval = 5 # Interval in seconds between two writes of stage_metrics_file
+stage_metrics_http_port = None # Port of the localhost-only /metrics and /trace endpoint (None to disable)
+stage_trace_ticks = 100 # Number of recent pipeline ticks kept for the Chrome trace
+stage_trace_hotkey = 'ctrl+alt+t' # Dump the Chrome trace of the last ticks to a file
+stage_trace_key_down = False
+visible_tables = {} # Dictionary {hwnd: title} of the visible tables, each one has a pixel probe task in the scheduler
+table_snapshots = {} # Dictionary {hwnd: WindowSnapshot} built once per window scan and used by every later stage
+window_tracker = None # WindowTracker, created by main()
+scheduler = None # DeadlineScheduler running every stage of the main loop, created by main()
 input_queue = queue.Queue() # Queue for storing inputs
+process_registry = ProcessRegistry(winamax_proc_name) # Single process scan per tick, PIDs cached until one goes away
+capture_service = CaptureService() # Persistent screen grabber, one per thread, shared by every capture function
+template_bank = TemplateBank(template_dir, num_templates) # Grayscale templates loaded once, reloaded when a file changes
+digit_classifier = DigitClassifier(template_bank) # Scores every template in one pass for the Playground table count
 
 # Enable verbose logging
 VERBOSE_LOGGING = True
 
-# Configure logging
-logging.basicConfig(
+# Configure logging: records are formatted and written by a background listener, identical messages repeated
+# within log_repeat_window seconds are counted instead of written, and the last lines are kept for a dump
+log_repeat_window = 30 # Seconds during which an identical message is not written again
+log_ring_size = 5000 # Number of formatted lines kept in memory for a dump
+log_dump_hotkey = 'ctrl+alt+l' # Dump the last log lines to a file
+log_dump_key_down = False
+log_system = setup_logging(
     level=logging.DEBUG if VERBOSE_LOGGING else logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%d-%m-%Y | %H:%M:%S'
+    fmt='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%d-%m-%Y | %H:%M:%S',
+    ring_size=log_ring_size,
+    repeat_window=log_repeat_window,
 )
 
 # Path to the Tesseract executable
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Path to the Tesseract models, used by the resident OCR engines
+tessdata_path = r'C:\Program Files\Tesseract-OCR\tessdata'
+# Preprocessing and Tesseract settings (page segmentation, whitelist, DPI) of the OCR regions, see wmx_ocr_profiles
+stat_ocr_profile = STAT_PROFILE
+playground_ocr_profile = PLAYGROUND_DIGITS_PROFILE
+
+# OCR engines, created by create_ocr_engines_() in main() and closed when it returns
+stat_tesseract_engine = None # Resident Tesseract engine (tesserocr, or a local OCR process on the Tesseract DLL) with pytesseract as fallback, Stat profile
+playground_tesseract_engine = None # Same, Playground profile
+glyph_engine = None # Glyph OCR of the UI texts when a glyph model was trained, None otherwise
+stat_text_engine = None # Glyph OCR of the Stat strip, Tesseract for the crops with a glyph it does not know
+playground_ocr_engine = None # Same for the Playground crops
+stat_ocr_engine = None # stat_text_engine behind a cache: no OCR when the captured strip has not changed
+# The Stat strip is checked against the learned word crop, the OCR only runs when the match is ambiguous
+stat_detector = StatDetector(StatTemplateMatcher.load(stat_template_path), template_path=stat_template_path)
+# Fixed pool of OCR workers with a bounded queue, replacing a new thread per OCR tick
+ocr_executor = OCRExecutor(workers=ocr_executor_workers, max_queue=ocr_executor_max_queue)
 
 # Path to the folder where the Sessions captures will be saved
 stat_folder = "Statistiques Sessions"
@@ -76,25 +148,40 @@ tables_folder = "Résultat Tables"
 if not os.path.exists(tables_folder):
     os.makedirs(tables_folder)
 
+# Month sub-folders, created once per month
+stat_month_folders = MonthFolders(stat_folder)
+tables_month_folders = MonthFolders(tables_folder)
+
+# Screenshots are encoded and written by a background worker, the click handlers only grab the pixels
+screenshot_writer = ScreenshotWriter(max_queue=screenshot_writer_max_queue)
+
+# Reusable capture buffers, returned once their OCR job, save or copy is done
+capture_pool = BufferPool(max_bytes=capture_pool_max_bytes)
+
+# Result rectangle of each table, grabbed when the result frame appears and saved from there on click
+result_frame_buffer = ResultFrameBuffer(frames_per_table=result_frames_per_table, max_bytes=result_frame_buffer_max_bytes)
+
+# A flickering pixel probe does not hide and redraw the table buttons
+table_button_hysteresis = Hysteresis(hide_after=table_button_hide_after)
+
+# Debounce and duplicate detection of the automatic table result captures
+auto_capture = AutoCapture(debounce=auto_capture_debounce)
+
+# Timing of the detection stages and OCR jobs, the functions are left unwrapped when disabled
+tracer = Tracer(enabled=stage_metrics_enabled, window=stage_metrics_window, trace_ticks=stage_trace_ticks)
+
 def check_wmx_proc_alive_():
     """
     Check if the "winamax.exe" process is alive.
+    The answer comes from the process registry, refreshed once per tick by the main loop.
     Returns a set of unique process names found.
     """
 
-    found_wmx_proc = set() # Set to store unique process names
-    found_wmx_proc.clear() # Clear the set before checking again
-
-    processes = psutil.process_iter() # Get a list of all running processes
-
-    # Check if any process has the name "winamax.exe"
-    for process in processes:
-        if process.name() == winamax_proc_name:
-            found_wmx_proc.add(process.name())
+    found_wmx_proc = process_registry.wmx_proc_names() # Set to store unique process names
 
     # Log the unique process names
     for process_name in found_wmx_proc:
-        logging.debug(f"Winamax process found : {process_name}")
+        logging.debug("Winamax process found : %s", process_name)
 
     if not found_wmx_proc:
         logging.debug("Winamax process not found.")
@@ -104,19 +191,12 @@ def check_wmx_proc_alive_():
 def get_wmx_pids_():
     """
     Retrieves the PIDs of all running instances of "winamax.exe" process.
+    The PIDs are cached by the process registry until one of them goes away.
     Returns:
         list: A list of integers representing the PIDs of the "winamax.exe" processes.
     """
 
-    processes = psutil.process_iter() # Get a list of all running processes
-    wmx_pids = [] # List to store the PIDs of "winamax.exe" processes
-
-    # Check if any process has the name "winamax.exe" and if it's the case, add the PID to the list
-    for process in processes:
-        if process.name() == winamax_proc_name:
-            wmx_pids.append(process.pid)
-
-    return wmx_pids
+    return process_registry.wmx_pids()
 
 def get_wmx_hwnd_and_title_(pids):
     """
@@ -146,14 +226,11 @@ def get_wmx_hwnd_and_title_(pids):
 
 def get_explorer_pid():
     """
-    Get the PID of explorer.exe.
+    Get the PID of explorer.exe, cached by the process registry.
     Returns:
     - int: The PID of explorer.exe, or None if not found.
     """
-    for proc in psutil.process_iter(['pid', 'name']):
-        if proc.info['name'].lower() == 'explorer.exe':
-            return proc.info['pid']
-    return None
+    return process_registry.explorer_pid()
 
 def filter_hwnd_list_winamax_window_(hwnd_list, window_name):
     """
@@ -168,7 +245,7 @@ def filter_hwnd_list_winamax_window_(hwnd_list, window_name):
     try:
         hwnd_list_filtered = [(hwnd, title) for hwnd, title in hwnd_list if title == window_name] # Filter the list based on the window title matching the specified title
     except Exception as e:
-        logging.error(f"Error occurred during filtering: {e}")
+        logging.error("Error occurred during filtering: %s", e)
         hwnd_list_filtered = []
 
     return hwnd_list_filtered
@@ -190,7 +267,7 @@ def filter_hwnd_list_winamax_tables_(hwnd_list, window_name):
             if title.lower().startswith(window_name.lower()) and title.lower() != window_name.lower()
         ]
     except Exception as e:
-        logging.error(f"Error occurred during filtering: {e}")
+        logging.error("Error occurred during filtering: %s", e)
         hwnd_list_filtered = []
 
     return hwnd_list_filtered
@@ -212,10 +289,12 @@ def get_window_position_and_dimensions_(hwnd):
 
     return x, y, width, height
 
+@functools.lru_cache(maxsize=64)
 def get_center_rectangle(window_width, window_height):
     """
     Calculate the coordinates of the rectangle centered within a table window.
     The size of the rectangle depends on the width of the main window and scales gradually until a maximum size is reached.
+    Memoized by window size, as tables keep the same size most of the time.
     
     Parameters:
     - window_width (int): The width of the main window.
@@ -248,91 +327,47 @@ def get_center_rectangle(window_width, window_height):
     
     return (left, top, right, bottom)
 
-def is_full_screen(hwnd):
+def on_display_change_():
     """
-    Check if the window is in full screen mode.
-    Parameters:
-    - hwnd (int): The handle of the window.
-    Returns:
-    - bool: True if the window is in full screen mode, False otherwise.
+    Forget every cached screen metric after a display change (resolution, monitor added or removed).
     """
-    screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-    screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-    rect = win32gui.GetWindowRect(hwnd)
-    return rect[0] == 0 and rect[1] == 0 and rect[2] == screen_width and rect[3] == screen_height
+    logging.info("Display change detected, screen metrics cache cleared.")
+    capture_service.invalidate_monitors()
+    if button_overlay is not None:
+        button_overlay.on_display_change()
 
-def is_window_visible_(hwnd):
+def build_table_snapshots_(tables):
     """
-    Check if a window is visible on the screen and not obscured by another window.
+    Build the WindowSnapshot of every table with a single z-order snapshot and sweep (see wmx_visibility).
+    The rect, visibility, result rectangle, probe point and button position of a table are computed once here,
+    then passed through the pipeline instead of being queried again at every stage.
     Parameters:
-    - hwnd (int): The handle of the window.
+    - tables (list): A list of tuples containing the window handle (hwnd) and the window title (str) of the tables.
     Returns:
-    - bool: True if the window is visible on the screen and not obscured, False otherwise.
+    - dict: {hwnd: WindowSnapshot}, the uncovered fraction being computed on the result rectangle of the table.
     """
 
-    global button_table_window_var
+    titles = dict(tables)
+    z_order = snapshot_z_order(until=set(titles)) # The walk stops at the lowest table
 
-    # Get the PID of explorer.exe
-    explorer_pid = get_explorer_pid()
+    # Absolute result rectangle of each table, from the rect of the snapshot
+    result_rects = {}
+    for window in z_order:
+        if window.hwnd in titles:
+            left, top, right, bottom = window.rect
+            rect_left, rect_top, rect_right, rect_bottom = get_center_rectangle(right - left, bottom - top)
+            result_rects[window.hwnd] = (left + rect_left, top + rect_top, left + rect_right, top + rect_bottom)
 
-    # Get the window title
-    title = win32gui.GetWindowText(hwnd)
-    logging.debug(f"Checking visibility for window: {hwnd}, Title: {title}")
-    
-    if not win32gui.IsWindowVisible(hwnd):
-        logging.debug(f"Window {title} is not visible.")
-        return False
-    
-    if win32gui.IsIconic(hwnd):
-        logging.debug(f"Window {title} is minimized.")
-        return False
-    
-    rect = win32gui.GetWindowRect(hwnd) # (left, top, right, bottom)
-    logging.debug(f"Window {title} rect: {rect}")
+    visibility = compute_visibility(z_order, titles, get_explorer_pid(), result_rects)
+    snapshots = build_window_snapshots(z_order, titles, visibility, result_rects, table_btn_pos_from_rect_)
 
-    if rect[0] == -32000 or rect[1] == -32000: # Check if the window is minimized
-        logging.debug(f"Window {title} is minimized.")
-        return False
-    
-    # Check if the window is in full screen mode
-    full_screen = is_full_screen(hwnd)
-    if full_screen:
-        logging.debug(f"Window {title} is in full screen mode.")
-
-    # Check if the window is obscured by another window
-    top_hwnd = win32gui.GetTopWindow(None)
-    while top_hwnd:
-        top_title = win32gui.GetWindowText(top_hwnd)
-        if top_hwnd == hwnd:
-            logging.debug(f"Window {title} is the top window.") # The window is the top window
-            return True
-        elif top_title == "python": # Check if the window overlapping is a python frame (button is) ### FIXME: Find a better way to ignore python frames
-            logging.debug(f"Ignoring invisible python window: {top_hwnd}, Title: {top_title}")
-        elif full_screen and not win32gui.IsWindowVisible(top_hwnd): # Ignore invisible windows when in full screen
-            logging.debug(f"Ignoring invisible window: {top_hwnd}, Title: {top_title}")
-        elif win32gui.IsWindowVisible(top_hwnd): # Check if the window is visible
-            top_rect = win32gui.GetWindowRect(top_hwnd)
-            if (rect[0] < top_rect[2] and rect[2] > top_rect[0] and
-                rect[1] < top_rect[3] and rect[3] > top_rect[1]):
-                # Get the PID of the overlapping window
-                _, pid = win32process.GetWindowThreadProcessId(top_hwnd)
-                # Ignore explorer.exe taskbar windows (it's the taskbar overlapping our table)
-                if pid == explorer_pid: # Check if the window overlapping is an explorer.exe window (taskbar is if no title)
-                    if top_title != "": # Check if the window overlapping is not the taskbar
-                        logging.info(f"Explorer window: {top_hwnd}, PID: {pid}, Title: {top_title}")
-                        hide_table_button_(hwnd) # Hide the button window if the taskbar is overlapping the table
-                        return False
-                    else:
-                        logging.info(f"Window {hwnd} (Title: {title}) is obscured by the Taskbar, so window is visible.")
-                        return True
-                else:
-                    logging.info(f"Window {hwnd} (Title: {title}) is obscured by window {top_hwnd} (Title: {top_title}), PID: {pid}.")
-                    return False
-                
-        top_hwnd = win32gui.GetWindow(top_hwnd, win32con.GW_HWNDNEXT)
-    
-    logging.debug(f"Window {title} is visible and not obscured.")
-    return True
+    for hwnd, title in tables:
+        table = visibility[hwnd]
+        if not table.visible:
+            logging.debug("Window %s (Title: %s) is not visible or obscured by window %s, result rectangle %.0f%% uncovered.",
+                          hwnd, title, table.occluded_by, table.uncovered_fraction * 100)
+
+    return snapshots
 
 def capture_window_region_(x, y):
     """
@@ -342,191 +377,151 @@ def capture_window_region_(x, y):
     - y (int): The y-coordinate of the top-left corner of the region.
     - We use hard coded offsets as we know the exact text position we are looking for to form the region.
     Returns:
-    - image: The captured image of the region.
+    - Frame: The captured region, in a pooled buffer to be returned with Frame.release() (raises PoolExhausted when
+      capture_pool is full).
     """
 
     region = (x, y + 134, x + 400, y + 184)
 
-    # Capture the region of the window
-    with mss.mss() as sct:
-            img = sct.grab(region)
-            img_pil = Image.frombytes('RGB', img.size, img.rgb)
-    
-    return img_pil
+    # Capture the region of the window, without any PIL conversion
+    return capture_service.grab_frame(region, capture_pool)
 
 def OCR_string_search_(img, search_text):
     """
-    Search for a specific text in an image using OCR (Optical Character Recognition).
+    Search for a specific text in an image, with the word template of the Stat detector, or with OCR
+    (Optical Character Recognition) when the template match is ambiguous.
 
-    :param img: PIL image to search the text in
+    :param img: Frame to search the text in
     :param search_text: Text to search in the image
     :return: True if the text is found in the image, False otherwise
-    :return: string_found value to the global variable
     """
 
-    global string_found 
+    logging.debug("Searching for text '%s' in the image.", search_text)
 
-    logging.debug(f"Searching for text '{search_text}' in the image.")
+    def ocr_():
+        text = stat_ocr_engine.image_to_string(img.bgra) # The cache digests the BGRA pixels as they are
+        logging.debug("OCR cache: %s", Lazy(stat_ocr_engine.cache.stats))
+        return search_text in text
 
-    try:
-        text = pytesseract.image_to_string(img, lang='eng')
-        found = search_text in text
-        logging.debug(f"Text found: {found}")
-        string_found = found # Update the global variable for the main loop
+    def locate_():
+        # Box of the word in the strip, given by the OCR, to learn the Stat template from
+        words = stat_text_engine.image_to_words(img.bgra)
+        return next((box for text, box in words if search_text in text), None)
 
-        ocr_stat_thread_done.set()
+    try:
+        found = stat_detector.detect(img.gray, ocr_, locate_)
+        logging.debug("Text found: %s (Stat detector: %s)", found, Lazy(stat_detector.stats))
 
     except Exception as e:
-        logging.debug(f"Error occurred while searching for text in the image: {e}")
+        logging.debug("Error occurred while searching for text in the image: %s", e)
         found = False
-        string_found = found # Update the global variable for the main loop
-        ocr_stat_thread_done.set()
-        return found
+
+    return found
 
 def OCR_playground_value_search_(img, search_texts):
     """
     Search for specific texts in an image using OCR (Optical Character Recognition).
 
-    :param img: PIL image to search the texts in
+    :param img: Frame to search the texts in
     :param search_texts: List of texts to search in the image
     :return: True if any of the texts are found in the image, False otherwise
-    :return: playground_table_value_found value to the global variable
     """
 
-    global playground_table_value_found 
-
-    logging.info(f"Searching for texts '{search_texts}' in the image.")
+    logging.debug("Searching for texts %s in the image.", search_texts)
 
     try:
-        text = pytesseract.image_to_string(img, lang='eng')
+        text = playground_ocr_engine.image_to_string(img.bgra)
         found = any(search_text in text for search_text in search_texts)
-        logging.info(f"Text found: {found}")
-        playground_table_value_found = found # Update the global variable for the main loop
-
-        ocr_stat_thread_done.set()
+        logging.debug("Text found: %s", found)
 
     except Exception as e:
-        logging.info(f"Error occurred while searching for text in the image: {e}")
+        logging.info("Error occurred while searching for text in the image: %s", e)
         found = False
-        playground_table_value_found = found # Update the global variable for the main loop
-        ocr_stat_thread_done.set()
-        return found
 
     return found
 
-def pil_to_cv2(pil_image):
-    """
-    Convert a PIL image to an OpenCV image (NumPy array).
-    """
-    return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-
-def load_templates(template_dir, num_templates):
-    """
-    Load template images from the specified directory.
-
-    :param template_dir: Directory containing the template images
-    :param num_templates: Number of templates to load
-    :return: List of template images as NumPy arrays
-    """
-    templates = []
-    for i in range(1, num_templates + 1):
-        template_path = os.path.join(template_dir, f'{i}.jpg')
-        template = cv2.imread(template_path)
-        if template is not None:
-            templates.append(template)
-        else:
-            logging.warning(f"Template {i}.jpg not found in {template_dir}")
-    return templates
-
-def image_comparison_search(img, templates):
+def classify_playground_table_count_(img):
     """
-    Search for specific templates in an image using image comparison.
+    Find the Playground table count by scoring every template at once (see DigitClassifier).
+    The best template wins instead of the first one above the threshold, so "11" or "12" cannot be read as "1".
 
-    :param img: Main image to search in (as a numpy array)
-    :param templates: List of template images to search for (as numpy arrays)
-    :return: Tuple (found, matched_value) where found is True if any of the templates are found in the image,
-             and matched_value is the value of the matched template or None if no match is found.
+    :param img: Grayscale (or BGR) crop as a NumPy array, e.g. Frame.gray
+    :return: Tuple (found, matched_value) where found is True if a template matches the crop, and matched_value is
+             the value of the best template, or None if no template matches.
     :return: playground_table_value_found value to the global variable
     """
 
     global playground_table_value_found
 
-    logging.info(f"Searching for templates in the image.")
-
     try:
-        # Convert the main image to grayscale
-        img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        found = False
-        matched_value = None
-
-        for i, template in enumerate(templates):
-            # Convert the template to grayscale
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-
-            # Perform template matching
-            result = cv2.matchTemplate(img_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-
-            # Get the best match position
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-            # Define a threshold for a good match
-            threshold = 0.8
-
-            if max_val >= threshold:
-                found = True
-                matched_value = i + 1  # Assuming template values are 1-based index
-                logging.info(f"Template {matched_value} found with max_val: {max_val} at location: {max_loc}")
-
-                # Draw a bounding box around the detected match
-                h, w = template_gray.shape
-                top_left = max_loc
-                bottom_right = (top_left[0] + w, top_left[1] + h)
-                cv2.rectangle(img, top_left, bottom_right, (0, 255, 0), 2)
-
-                break  # Stop after finding the first match
-
-        playground_table_value_found = found  # Update the global variable for the main loop
+        matched_value, score, margin = digit_classifier.classify(img)
+        found = matched_value is not None
+        logging.debug("Best template: %s, score: %.3f, margin: %.3f", matched_value, score, margin)
 
     except Exception as e:
-        logging.info(f"Error occurred while searching for templates in the image: {e}")
+        logging.info("Error occurred while classifying the Playground table count: %s", e)
         found = False
         matched_value = None
-        playground_table_value_found = found  # Update the global variable for the main loop
-        return found, matched_value
+
+    playground_table_value_found = found  # Update the global variable for the main loop
 
     return found, matched_value
 
+def stat_ocr_done_(future):
+    """
+    Done callback of a Stat OCR job: publish its verdict for the window scan, whichever job finishes
+    (a job still queued behind a slow one must not hide the verdicts of the finished ones). Dropped jobs are skipped.
+    """
+    global string_found
+    if future.cancelled() or future.exception() is not None:
+        return
+    string_found = future.result()
+
 def start_OCR_Stat_thread_():
-    global start_ocr_timestamp, img, search_text, x_coord_window, y_coord_window
+    """
+    Capture the Stat region of the main Winamax window and queue its OCR on the OCR executor.
+    A pending Stat job not yet started is replaced by this newer frame.
+    :return: Future resolving to True if the Stat string is found, False otherwise
+    """
 
-    start_ocr_timestamp = time.time()
+    global start_ocr_timestamp, stat_ocr_future
 
-    ocr_stat_thread_done.clear()  # Reset the state of the threads
+    start_ocr_timestamp = time.time()
 
-    img = capture_window_region_(x_coord_window, y_coord_window)  
-    search_text = stat_string 
+    try:
+        img = capture_window_region_(x_coord_window, y_coord_window)
+    except PoolExhausted as e:
+        logging.debug("Stat capture skipped: %s", e)
+        return stat_ocr_future
 
-    ocr_thread = threading.Thread(target=OCR_string_search_, args=(img, search_text,))
-    logging.debug("Starting OCR Stat thread.")
+    stat_ocr_future = ocr_executor.submit(tracer.wrap("ocr_stat", OCR_string_search_), img, stat_string, key="stat")
+    stat_ocr_future.add_done_callback(lambda _: img.release()) # Also called when the job is dropped
+    stat_ocr_future.add_done_callback(stat_ocr_done_)
+    logging.debug("OCR Stat job queued (queue depth: %s).", Lazy(ocr_executor.queue_depth))
 
-    ocr_thread.start()
+    return stat_ocr_future
 
 def start_OCR_Playground_thread_():
+    """
+    Capture the table count region of the Playground window and queue its OCR on the OCR executor.
+    :return: Future resolving to True if the Playground value is found, False otherwise
+    """
 
-    global ocr_playground_thread, start_ocr_playground_timestamp, x_coord_playground, y_coord_playground
+    global start_ocr_playground_timestamp, playground_ocr_future
 
     start_ocr_playground_timestamp = time.time()
 
-    ocr_playground_thread_done.clear()  # Reset the state of the threads
-
-    img = capture_playground_region_(x_coord_playground, y_coord_playground)          # capture_window_region_(x_coord_window, y_coord_window)
-    search_text = playground_value
+    try:
+        img = capture_playground_region_(x_coord_playground, y_coord_playground)
+    except PoolExhausted as e:
+        logging.debug("Playground capture skipped: %s", e)
+        return playground_ocr_future
 
-    ocr_thread = threading.Thread(target=OCR_string_search_, args=(img, search_text,))
-    logging.debug("Starting OCR thread.")
+    playground_ocr_future = ocr_executor.submit(tracer.wrap("ocr_playground", OCR_playground_value_search_), img, [playground_value], key="playground")
+    playground_ocr_future.add_done_callback(lambda _: img.release()) # Also called when the job is dropped
+    logging.debug("OCR Playground job queued (queue depth: %s).", Lazy(ocr_executor.queue_depth))
 
-    ocr_thread.start()
+    return playground_ocr_future
 
 def capture_playground_region_(x, y):
     """
@@ -536,187 +531,165 @@ def capture_playground_region_(x, y):
     - y (int): The y-coordinate of the top-left corner of the region.
     - We use hard coded offsets as we know the exact text position we are looking for to form the region.
     Returns:
-    - image: The captured image of the region.
+    - Frame: The captured region, in a pooled buffer to be returned with Frame.release() (raises PoolExhausted when
+      capture_pool is full).
     """
 
     region = (x + 172, y + 7, x + 200, y + 22)
 
-    # Capture the region of the window
-    with mss.mss() as sct:
-            img = sct.grab(region)
-            img_pil = Image.frombytes('RGB', img.size, img.rgb)
-    
-    return img_pil
+    # Capture the region of the window, without any PIL conversion
+    return capture_service.grab_frame(region, capture_pool)
 
 def show_stat_button_(coords, hwnd):
     """
-    Displays a button window at the specified coordinates and associates it with the given window handle (hwnd).
-    If the button window is already displayed, it updates its position and brings it to the front.
+    Displays the Stat button at the specified coordinates and associates it with the given window handle (hwnd).
+    If the button is already displayed, it is moved (nothing is redrawn if it is already there).
 
     Parameters:
     - coords (tuple): A tuple containing the x and y coordinates where the button should be displayed.
     - hwnd (int): The window handle (hwnd) of the window to associate with the button.
-
-    Note:
-    - This function uses a global variable `button_stat_window_var` to keep track of the button window instance.
-    - If the button window is not already displayed, it creates a new instance of `Button_result` and shows it.
-    - If the button window is already displayed, it updates its position, brings it to the front, and updates the associated hwnd.
     """
 
-    global button_stat_window_var
-
-    if not button_stat_window_var:
-        button_stat_window_var = Button_result(coords, hwnd)
-        logging.debug(f"Button window created for HWND: {hwnd}")
-        button_stat_window_var.show()
-    else:
-        button_stat_window_var.setGeometry(QRect(coords[0], coords[1], 100, 100))
-        logging.debug(f"Button window position updated: ({coords[0]}, {coords[1]}) for HWND: {hwnd}")
-        button_stat_window_var.hwnd = hwnd # Update the associated hwnd
+    gui.call(button_overlay.show_button, "stat", coords, hwnd, on_stat_button_click_)
+    logging.debug("Button position: (%s, %s) for HWND: %s", coords[0], coords[1], hwnd)
 
 def show_table_button_(coords, hwnd):
     """
-    Displays a button window at the specified coordinates and associates it with the given window handle (hwnd).
-    If the button window is already displayed, it updates its position and brings it to the front.
+    Displays the button of a table at the specified coordinates and associates it with the given window handle (hwnd).
+    If the button is already displayed, it is moved (nothing is redrawn if it is already there).
 
     Parameters:
     - coords (tuple): A tuple containing the x and y coordinates where the button should be displayed.
-    - hwnd (int): The window handle (hwnd) of the window to associate with the button.
-
-    Note:
-    - This function uses a global variable `button_table_window_var` to keep track of the button window instance.
-    - If the button window is not already displayed, it creates a new instance of `Button_table` and shows it.
-    - If the button window is already displayed, it updates its position, brings it to the front, and updates the associated hwnd.
+    - hwnd (int): The window handle (hwnd) of the table to associate with the button.
     """
 
-    global button_table_window_var
-
-    if hwnd not in button_table_window_var:
-        button_table_window_var[hwnd] = Button_table(coords, hwnd)
-        logging.debug(f"Table button window created for HWND: {hwnd}")
-        button_table_window_var[hwnd].show()
-
-    else:
-        button = button_table_window_var[hwnd]
-        button.setGeometry(QRect(coords[0], coords[1], 100, 100))
-        button.hwnd = hwnd # Update the associated hwnd
+    gui.call(button_overlay.show_button, ("table", hwnd), coords, hwnd, on_table_button_click_)
 
 def hide_stat_button_():
     """
-    Hides the button window if it is currently displayed.
-    Closes the window and releases the global reference to this instance of Button_result.
+    Hides the Stat button if it is currently displayed.
     """
 
-    global button_stat_window_var
+    gui.call(button_overlay.hide_button, "stat")
 
-    if button_stat_window_var:
-        button_stat_window_var.close()
-        button_stat_window_var = None
+def hide_table_button_(hwnd, immediate=False):
+    """
+    Hides the button of a table if it is currently displayed.
+    With immediate=True, its area is repainted before returning (before capturing the table).
+    """
 
-        logging.debug("Button window closed.")
+    gui.call(button_overlay.hide_button, ("table", hwnd), immediate, wait=immediate)
 
-def hide_table_button_(hwnd):
+def on_stat_button_click_(hwnd):
     """
-    Hides the button window if it is currently displayed.
-    Closes the window and releases the global reference to this instance of Button_table.
+    Click handler of the Stat button, on the GUI thread: the capture and save run on the pipeline thread.
     """
 
-    global button_table_window_var
+    logging.debug("Button clicked.")
+    pipeline.post(tracer.wrap("save_result", save_result_screenshot_), hwnd)
 
-    if hwnd in button_table_window_var:
-        button_table_window_var[hwnd].close()
-        del button_table_window_var[hwnd]
+def on_table_button_click_(hwnd):
+    """
+    Click handler of the table buttons, on the GUI thread: the save runs on the pipeline thread.
+    """
 
-        logging.debug("Button window closed.")
+    logging.debug("Button clicked.")
+    pipeline.post(tracer.wrap("save_table", save_table_screenshot_), hwnd)
 
 def save_result_screenshot_(hwnd):
     """
-    Capture an image of the window specified by `hwnd` via the screen_session_result_() function, save the image in a JPG file, 
-    in the Result Folder, with a name based on the timestamp, and display a confirmation or error message.
+    Capture an image of the window specified by `hwnd` via the screen_session_result_() function, and queue it to be saved
+    in a JPG file, in the Result Folder, with a name based on the timestamp.
+    Only the pixels are grabbed here, the conversion, folder creation and encoding are done by the screenshot writer.
 
     :param hwnd: Handle of the window whose image needs to be captured
     """
 
-    result_jpg = screen_session_result_(hwnd)
+    result_img = screen_session_result_(hwnd)
 
-    if result_jpg:
-        new_month_folder = current_month_()
-        # Ensure the folder name is correctly encoded
-        new_month_folder = new_month_folder.encode('utf-8').decode('utf-8')
-        full_path = os.path.join(stat_folder, new_month_folder)
-        logging.debug(f"Saving the image in the folder: {full_path}")
+    if result_img is not None:
+        when = datetime.now()
 
-        if not os.path.exists(full_path):
-            logging.debug(f"Creating the folder: {full_path}")
-            os.makedirs(full_path)
+        def file_path_():
+            full_path = stat_month_folders.path(when)
+            logging.debug("Saving the image in the folder: %s", full_path)
+            return os.path.join(full_path, f"{when.strftime('%d_%m_%Y')}.jpg")
 
-        timestamp = datetime.now().strftime("%d_%m_%Y")
-        file_path = os.path.join(full_path, f"{timestamp}.jpg")
-        result_jpg.save(file_path, "JPEG")
-        logging.info(f"Image successfully saved: {file_path}")
+        screenshot_writer.submit(result_img, file_path_)
     else:
          logging.debug("Error capturing the image.")
 
-def save_table_screenshot_(hwnd):
+def table_screenshot_name_(window_title):
     """
-    Capture an image of the table specified by `hwnd` via the screen_table_result_() function, save the image in a JPG file, 
-    in the Table Result Folder, with a name based on the timestamp, and display a confirmation or error message.
+    Build the file name part of a table screenshot from the title of the table window.
 
-    :param hwnd: Handle of the window whose image needs to be captured
+    :param window_title: Title of the table window
+    :return: Sanitized title to be used in the file name
     """
 
-    global button_stat_window_var
-
-    hide_table_button_(hwnd) # Hide the button window before capturing the table result, will reopen once the main loop is done
-
-    result_jpg = screen_table_result_(hwnd)
+    # Remove "winamax" from the window title
+    window_title = window_title.replace("Winamax", "").strip()
+    # Remove everything between parentheses, including the parentheses themselves
+    window_title = re.sub(r'\(.*?\)', '', window_title).strip()
+    logging.debug("Window title: %s", window_title)
+    # Sanitize the window title to be used in the file name
+    return "".join(c for c in window_title if c.isalnum() or c in (' ', '_')).rstrip()
 
-    if result_jpg:
-        new_month_folder = current_month_()
-        # Ensure the folder name is correctly encoded
-        new_month_folder = new_month_folder.encode('utf-8').decode('utf-8')
-        full_path = os.path.join(tables_folder, new_month_folder)
-        logging.debug(f"Saving the image in the folder: {full_path}")
+def save_table_screenshot_(hwnd):
+    """
+    Queue the result of the table specified by `hwnd` to be saved in a JPG file, in the Table Result Folder,
+    with a name based on the timestamp and the table name.
+    The frame buffered when the result frame appeared is saved when there is one, otherwise the table is captured
+    via the screen_table_result_() function. The rest is done by the screenshot writer.
 
-        if not os.path.exists(full_path):
-            logging.debug(f"Creating the folder: {full_path}")
-            os.makedirs(full_path)
+    :param hwnd: Handle of the window whose image needs to be captured
+    """
 
-        # Get the window title
-        window_title = win32gui.GetWindowText(hwnd)
-        # Remove "winamax" from the window title
-        window_title = window_title.replace("Winamax", "").strip()
-        # Remove everything between parentheses, including the parentheses themselves
-        window_title = re.sub(r'\(.*?\)', '', window_title).strip()
-        logging.debug(f"Window title: {window_title}")
-        # Sanitize the window title to be used in the file name
-        sanitized_title = "".join(c for c in window_title if c.isalnum() or c in (' ', '_')).rstrip()
+    buffered_frame = result_frame_buffer.latest(hwnd)
+    if buffered_frame is not None and buffered_frame.timestamp < result_displayed_since.get(hwnd, float('-inf')):
+        # Buffered before the result frame last appeared (not re-buffered while the button stayed on): an older popup
+        logging.debug("Buffered result frame of table %s older than the displayed result, capturing it again.", hwnd)
+        buffered_frame = None
+    if buffered_frame is not None:
+        logging.debug("Saving the result frame buffered for table %s, %.1fs old.", hwnd, time.monotonic() - buffered_frame.timestamp)
+        result_img = buffered_frame.image
+    else:
+        hide_table_button_(hwnd, immediate=True) # Hide the button before capturing the table result, will reappear on the next probe
+        result_img = screen_table_result_(hwnd)
 
-        timestamp = datetime.now().strftime("%d_%m_%Y")
-        file_path = os.path.join(full_path, f"{timestamp}_{sanitized_title}.jpg")
-        result_jpg.save(file_path, "JPEG")
-        logging.info(f"Image successfully saved: {file_path}")
+    if result_img is not None:
+        queue_table_screenshot_(hwnd, result_img)
     else:
         logging.info("Error capturing the image.")
 
-def current_month_():
+def queue_table_screenshot_(hwnd, result_img, timestamped=False):
     """
-    Get the current month's name in French.
-
-    This function sets the locale to French to display the month name in French,
-    retrieves the current month's name, and returns it.
+    Queue the result image of a table to the screenshot writer, in the Table Result Folder.
 
-    Returns:
-        str: The name of the current month in French.
+    :param hwnd: Handle of the table window
+    :param result_img: BGRA or BGR array of the result rectangle
+    :param timestamped: Add the time to the file name, so that two results of the same tournament name on the same
+        day (auto-captures) do not overwrite each other
     """
 
-    # Set the locale to French to display the month name in French
-    locale.setlocale(locale.LC_TIME, 'fr_FR')
-    
-    # Get the current month's name
-    month = time.strftime("%B")
-    
-    return month
+    when = datetime.now()
+    window_title = win32gui.GetWindowText(hwnd) # Read now, the table may be closed by the time the image is written
+    date_format = '%d_%m_%Y_%H%M%S' if timestamped else '%d_%m_%Y'
+
+    def file_path_():
+        full_path = tables_month_folders.path(when)
+        logging.debug("Saving the image in the folder: %s", full_path)
+        file_path = os.path.join(full_path, f"{when.strftime(date_format)}_{table_screenshot_name_(window_title)}.jpg")
+        if timestamped:
+            # Two results of tables with the same name within the same second: suffix instead of overwriting
+            base, suffix = os.path.splitext(file_path)
+            counter = 2
+            while os.path.exists(file_path):
+                file_path = f"{base}_{counter}{suffix}"
+                counter += 1
+        return file_path
+
+    screenshot_writer.submit(result_img, file_path_)
 
 def screen_session_result_(hwnd):
     """
@@ -724,10 +697,10 @@ def screen_session_result_(hwnd):
     The dimension corresponds to the rectangle composing the "Statistics" part of Winamax, with the session results.
 
     :param hwnd: Handle of the window (HWND) to capture
-    :return: PIL image of the captured part of the window, or None in case of error
+    :return: BGRA array of the captured part of the window, or None in case of error
     """
 
-    logging.debug(f"Attempting to capture for the window with HWND: {hwnd}")
+    logging.debug("Attempting to capture for the window with HWND: %s", hwnd)
 
     try:
         win = gw.Window(hwnd)
@@ -756,18 +729,16 @@ def screen_session_result_(hwnd):
         )
 
         if capture_rect[0] >= capture_rect[2] or capture_rect[1] >= capture_rect[3]:
-            logging.debug(f"The adjusted coordinates of the capture rectangle are invalid: {capture_rect}")
+            logging.debug("The adjusted coordinates of the capture rectangle are invalid: %s", capture_rect)
             return None
 
-        with mss.mss() as sct:
-            img = sct.grab(capture_rect)
-            img_pil = Image.frombytes('RGB', img.size, img.rgb)
-            
-            logging.debug(f"Image capture successful for the window with HWND: {hwnd}")
-        return img_pil
+        img = capture_service.grab(capture_rect)
+        logging.debug("Image capture successful for the window with HWND: %s", hwnd)
+
+        return img
     
     except Exception as e:
-        logging.debug(f"Error capturing the window with HWND {hwnd}: {e}")
+        logging.debug("Error capturing the window with HWND %s: %s", hwnd, e)
         return None
 
 def screen_table_result_(hwnd):
@@ -776,16 +747,16 @@ def screen_table_result_(hwnd):
     The dimension corresponds to the rectangle composing the Result part of the Winamax table.
 
     :param hwnd: Handle of the window (HWND) to capture
-    :return: PIL image of the captured part of the window, or None in case of error
+    :return: BGRA array of the captured part of the window, or None in case of error
     """
 
-    logging.debug(f"Attempting to capture for the Result of the table with HWND: {hwnd}")
+    logging.debug("Attempting to capture for the Result of the table with HWND: %s", hwnd)
 
     try:
         x, y, width, height = get_window_position_and_dimensions_(hwnd) # Get the position and dimensions of the table window
         rectangle_coord = get_center_rectangle(width, height) # Get the coordinates of the result rectangle
-        logging.debug(f"Table position: ({x}, {y}), dimensions: {width}x{height}")
-        logging.debug(f"Result rectangle: ({rectangle_coord[0]}, {rectangle_coord[1]}, dimensions: {rectangle_coord[2] - rectangle_coord[0]}x{rectangle_coord[3] - rectangle_coord[1]}")
+        logging.debug("Table position: (%s, %s), dimensions: %sx%s", x, y, width, height)
+        logging.debug("Result rectangle: (%s, %s, dimensions: %sx%s", rectangle_coord[0], rectangle_coord[1], rectangle_coord[2] - rectangle_coord[0], rectangle_coord[3] - rectangle_coord[1])
         
 
         capture_window = (
@@ -795,30 +766,28 @@ def screen_table_result_(hwnd):
             y + rectangle_coord[3], # Bottom side of the window + Bottom side of the rectangle
         )
 
-        logging.debug(f"Capture rectangle: ({capture_window[0]}, {capture_window[1]}, {capture_window[2]}, {capture_window[3]})")
+        logging.debug("Capture rectangle: (%s, %s, %s, %s)", capture_window[0], capture_window[1], capture_window[2], capture_window[3])
 
         if capture_window[0] >= capture_window[2] or capture_window[1] >= capture_window[3]:
-            logging.debug(f"The adjusted coordinates of the capture rectangle are invalid: {capture_window}")
+            logging.debug("The adjusted coordinates of the capture rectangle are invalid: %s", capture_window)
             return None
 
-        with mss.mss() as sct:
-            img = sct.grab(capture_window)
-            img_pil = Image.frombytes('RGB', img.size, img.rgb)        
-            logging.debug(f"Image capture successful for the result of the table with HWND: {hwnd}")
+        img = capture_service.grab(capture_window)
+        logging.debug("Image capture successful for the result of the table with HWND: %s", hwnd)
 
-        return img_pil
+        return img
     
     except Exception as e:
-        logging.debug(f"Error capturing the window with HWND {hwnd}: {e}")
+        logging.debug("Error capturing the window with HWND %s: %s", hwnd, e)
         return None
 
-def calculate_stat_btn_pos_(x, y, width):
+@functools.lru_cache(maxsize=64)
+def calculate_stat_btn_offset_(width):
     """
-    Calculate the percentage of the width for the button position and the position in pixels.
-    :param x: X coordinate of the top-left corner of the window
-    :param y: Y coordinate of the top-left corner of the window
+    Calculate the percentage of the width for the button position and the resulting X offset in pixels.
+    Memoized by window width.
     :param width: Width of the window
-    :return: (x, y) button coordinates
+    :return: X offset of the button from the left side of the window
     """
 
     if width <= 1414: # Small window before the trigger point
@@ -827,22 +796,37 @@ def calculate_stat_btn_pos_(x, y, width):
         scale = (82 - 95) / (2000 - 1414) # Scale factor for the percentage
         percentage = 95 + scale * (width - 1414) # Calculate the percentage based on the width
 
-    x = int(x + ((percentage * width) / 100)) # Calculate the X coordinate of the button based on width
+    logging.debug("Width: %s, Width percentage: %s%%", width, percentage)
+
+    return (percentage * width) / 100
+
+def calculate_stat_btn_pos_(x, y, width):
+    """
+    Calculate the percentage of the width for the button position and the position in pixels.
+    :param x: X coordinate of the top-left corner of the window
+    :param y: Y coordinate of the top-left corner of the window
+    :param width: Width of the window
+    :return: (x, y) button coordinates
+    """
+
+    x = int(x + calculate_stat_btn_offset_(width)) # Calculate the X coordinate of the button based on width
     y = int(y + 108) # Calculate the Y coordinate of the button, fixed since it's on the same height at all times
 
-    logging.debug(f"Width: {width}, Width percentage: {percentage}%, Button coordinates: ({x}, {y})")
+    logging.debug("Button coordinates: (%s, %s)", x, y)
 
     return x, y
 
-def calculate_table_btn_pos_(x, y, hwnd):
-    
-    x, y, width, height = get_window_position_and_dimensions_(hwnd) # Get the position and dimensions of the table window
-    result_rect = get_center_rectangle(width, height) # Get the coordinates of the result rectangle
-
-    x = x - result_rect[0] + (0.95*width) # Offset to ensure table button is in the top left result rectangle
-    y = y + result_rect[1]  # Offset to ensure table button is in the top left result rectangle
+def table_btn_pos_from_rect_(rect, result_rect):
+    """
+    Calculate the table button position from the window rect and the absolute result rectangle.
+    :param rect: (left, top, right, bottom) of the table window
+    :param result_rect: (left, top, right, bottom) of the result rectangle, in screen coordinates
+    :return: (x, y) button coordinates
+    """
 
-    logging.debug(f"Table:{hwnd}, Button coordinates: ({x}, {y})")
+    width = rect[2] - rect[0]
+    x = rect[0] - (result_rect[0] - rect[0]) + (0.95*width) # Offset to ensure table button is in the top left result rectangle
+    y = result_rect[1]  # Offset to ensure table button is in the top left result rectangle
 
     return int(x), int(y)
 
@@ -851,266 +835,425 @@ def check_table_pixel_color_(x, y, hwnd):
     Check the pixel color at the specified coordinates (x, y) and return True if the color is #232323, False otherwise.
     This function is used to detect the presence of the result frame in a table window.
     Hex color code: result_frame_hex_color var : #232323 is the color of the table result window in Winamax.
+    The comparison tolerates a distance of result_frame_color_tolerance in RGB space.
     :param x: X coordinate of the pixel
     :param y: Y coordinate of the pixel
-    :return: bool indicating if the pixel color is == to result_frame_hex_color var
+    :return: bool indicating if the pixel color matches the result_frame_hex_color var
     """
 
-    global result_frame_hex_color
+    r, g, b = capture_service.pixel(x, y)
+    logging.debug("Pixel color at (%s, %s): R=%s, G=%s, B=%s", x, y, r, g, b)
 
-    with mss.mss() as sct:
-        img = sct.grab({"left": x, "top": y, "width": 1, "height": 1})
-        r, g, b = img.pixel(0, 0)
+    return color_matches((r, g, b), result_frame_hex_color, result_frame_color_tolerance)
 
-        logging.debug(f"Pixel color at ({x}, {y}): R={r}, G={g}, B={b}")
+def check_tables_pixel_color_(probe_points):
+    """
+    Batched version of check_table_pixel_color_ for every table due for a check in this tick.
+    All the probe points are read with a single grab per monitor (see CaptureService.probe_pixels).
+    :param probe_points: dict {hwnd: (x, y)} of the pixel to check for each table
+    :return: dict {hwnd: bool} indicating if the result frame is displayed on each table
+    """
 
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    logging.debug(f"Hex color at ({x}, {y}): {hex_color}")
+    hwnds = list(probe_points)
+    colors = capture_service.probe_pixels([probe_points[hwnd] for hwnd in hwnds])
+    matches = color_matches(colors, result_frame_hex_color, result_frame_color_tolerance)
 
-    return hex_color == result_frame_hex_color
+    for hwnd, (r, g, b) in zip(hwnds, colors):
+        logging.debug("Pixel color at %s: R=%d, G=%d, B=%d, HWND: %s", probe_points[hwnd], r, g, b, hwnd)
 
-class Button_result(QWidget):
-    def __init__(self, coords, hwnd, parent=None):
-        super(Button_result, self).__init__(parent)
-        self.hwnd = hwnd
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setGeometry(QRect(coords[0], coords[1], 100, 100))
+    return {hwnd: bool(match) for hwnd, match in zip(hwnds, matches)}
 
-        self.label = QLabel(self)
-        self.label.setPixmap(QPixmap(button_image_path))
-        self.label.setGeometry(0, 0, 100, 100)
+def process_scan_task_():
+    """
+    Scheduled task: scan the process table once (reused by every PID lookup) and update the tracked PIDs.
+    """
 
-        self.button = QPushButton(self)
-        self.button.setGeometry(0, 0, 100, 100)
-        self.button.setFlat(True)
-        self.button.setStyleSheet("background: transparent;")
-        self.button.clicked.connect(self.on_button_click)
+    process_registry.refresh()
+    window_tracker.set_pids(process_registry.wmx_pids()) # Full window resync only when the Winamax PIDs change
 
-        # Ensure the button is always visible and in the first row
-        self.raise_()
-        self.show()
+def window_scan_task_():
+    """
+    Scheduled task: handle the main Winamax window and the Playground, then update the list of visible tables.
+    Visible tables are registered in the "table_probe" group of the scheduler, vanished ones are removed
+    and their button hidden.
+    """
 
-    def on_button_click(self):
-        logging.debug("Button clicked.")
-        save_result_screenshot_(self.hwnd)
+    global x_coord_window, y_coord_window, string_found, x_coord_playground, y_coord_playground, playground_width, playground_height, table_snapshots
 
-class Button_table(QWidget):
-    def __init__(self, coords, hwnd, parent=None):
-        super(Button_table, self).__init__(parent)
-        self.hwnd = hwnd
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setGeometry(QRect(coords[0], coords[1], 100, 100))
+    # Call the function to check for the "winamax.exe" process
+    found_wmx_proc = check_wmx_proc_alive_()
 
-        self.label = QLabel(self)
-        self.label.setPixmap(QPixmap(button_image_path))
-        self.label.setGeometry(0, 0, 100, 100)
+    # Check if any "winamax.exe" process is found
+    if not found_wmx_proc:
+        update_visible_tables_({})
+        result_frame_buffer.retain(())
+        tracer.retain(())
+        return
+
+    # Get the PIDs of "winamax.exe" processes
+    wmx_pids = get_wmx_pids_()
+    logging.debug("Winamax PIDs: %s", Lazy(list, wmx_pids))
+
+    # Get the HWNDs of "winamax.exe" processes, kept up to date by the window tracker
+    wmx_hwnd_list = window_tracker.windows()
+    logging.debug("Winamax HWNDs: %s", Lazy(list, wmx_hwnd_list))
+
+    ### PART 1: Main Winamax Stats window : Drawing button and Screenhot of Results ###
+
+    # Get the HWND of main launcher window title
+    main_wmx_hwnd_list_filtered = filter_hwnd_list_winamax_window_(wmx_hwnd_list, winamax_window_name)
+
+    # Check if the filtered Window HWND is found
+    if main_wmx_hwnd_list_filtered:
+        # Get the first HWND and title from the filtered list
+        hwnd, title = main_wmx_hwnd_list_filtered[0]
+        logging.debug("Winamax window found: %s (HWND: %s)", title, hwnd)
+
+        # Get the position and dimensions of the window
+        x, y, width, height = get_window_position_and_dimensions_(hwnd)
+        logging.debug("%s position: (%s, %s), dimensions: %sx%s", title, x, y, width, height)
+
+        # Check if the window is minimized
+        if x == -32000 and y == -32000:
+            string_found = False
+           # hide_stat_button_()
+            logging.debug("Window is minimized")
+        else:
+            # Store the coordinates of the window
+            x_coord_window, y_coord_window = x, y
+
+            # string_found holds the verdict of the last finished Stat OCR job (set by stat_ocr_done_)
+            # Draw a button on the screen if string_found is True, given by OCR thread
+            if string_found:
+                logging.debug("String found, drawing button on screen.")
+                button_pos_x, button_pos_y = calculate_stat_btn_pos_(x, y, width)
+                logging.debug("Button position: (%s, %s), hwnd: %s", button_pos_x, button_pos_y, hwnd)
+                show_stat_button_((button_pos_x, button_pos_y), hwnd)
+                logging.debug("Affichage du bouton à la position : %s, %s", button_pos_x, button_pos_y)
+            else:
+                logging.debug("String not found.")
+                # hide_stat_button_()
 
-        self.button = QPushButton(self)
-        self.button.setGeometry(0, 0, 100, 100)
-        self.button.setFlat(True)
-        self.button.setStyleSheet("background: transparent;")
-        self.button.clicked.connect(self.on_button_click)
+    ### END OF PART 1 ###
 
-    def on_button_click(self):
-        logging.debug("Button clicked.")
-        save_table_screenshot_(self.hwnd)
+    ### PART 2: Winamax Tables detection ###
 
-def main():
+    # Check if Playground is found
 
-    global x_coord_window, y_coord_window, start_ocr_timestamp, string_found, x_coord_playground, y_coord_playground, playground_width, playground_height
+    playground_wmx_hwnd_list_filtered = filter_hwnd_list_winamax_window_(wmx_hwnd_list, playground_window_name)
 
-    app = QApplication([]) # Create a QApplication instance
+    if playground_wmx_hwnd_list_filtered:
+        # Get the first HWND and title from the filtered list
+        hwnd, title = playground_wmx_hwnd_list_filtered[0]
+        logging.debug("Playground window found: %s (HWND: %s)", title, hwnd)
+
+        # Get the position and dimensions of the Playground window
+        x_coord_playground, y_coord_playground, playground_width, playground_height = get_window_position_and_dimensions_(hwnd)
+
+        # Check if the Playground window is minimized
+        if x_coord_playground == -32000 and y_coord_playground == -32000:
+            playground_table_img = False
+            logging.debug("%s is minimized", title)
+        else:
+            logging.debug("%s position: (%s, %s), dimensions: %sx%s", title, x_coord_playground, y_coord_playground, playground_width, playground_height)
+
+        # Once detected, part where all the magic happens for Playground
+
+        # Find the number of tables 
+
+        try:
+            playground_table_frame = capture_playground_region_(x_coord_playground, y_coord_playground)
+        except PoolExhausted as e:
+            logging.debug("Playground capture skipped: %s", e)
+            playground_table_frame = None
+
+        if playground_table_frame is not None:
+            # Score every template in a single pass, on the grayscale conversion of the grab
+            found, matched_value = classify_playground_table_count_(playground_table_frame.gray)
+            if found:
+                logging.debug("Matched template value: %s", matched_value)
+            else:
+                logging.debug("No match found")
+
+            if playground_debug_dump:
+                # screenshot of the Playground table to test and save
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                file_path = os.path.join(os.path.dirname(__file__), f"playground_table_{timestamp}.jpg")
+                saved = screenshot_writer.submit(playground_table_frame, file_path) # Converted to PIL by the writer only
+                saved.add_done_callback(lambda _: playground_table_frame.release())
+            else:
+                playground_table_frame.release()
+        else:
+              logging.info("No playground table value captured.")
+
+
+    else:
+        logging.debug("Playground window not found.")
+        x_coord_playground, y_coord_playground, playground_width, playground_height = 0, 0, 0, 0
+
+    # Get the HWNDs of all Winamax tables
+    wmx_hwnd_table_list = filter_hwnd_list_winamax_tables_(wmx_hwnd_list, winamax_window_name)
+    logging.debug("Tables HWNDs and Title: %s", Lazy(list, wmx_hwnd_table_list))
+
+    # Forget the buffered result frames of the closed tables
+    for hwnd in result_frame_buffer.retain(hwnd for hwnd, _ in wmx_hwnd_table_list):
+        logging.debug("Table %s closed, buffered result frames dropped.", hwnd)
+    tracer.retain(hwnd for hwnd, _ in wmx_hwnd_table_list) # Per-table timing series of the closed tables
+    auto_capture.retain(hwnd for hwnd, _ in wmx_hwnd_table_list)
+
+    # Snapshot every table once (rect, visibility, result rectangle, button position) with a single z-order sweep
+    with tracer.span("table_snapshots"):
+        table_snapshots = build_table_snapshots_(wmx_hwnd_table_list) if wmx_hwnd_table_list else {}
+    update_visible_tables_({hwnd: snapshot.title for hwnd, snapshot in table_snapshots.items() if snapshot.visible})
+
+    # Keep the buttons of the tables showing their result frame on top of their (possibly moved) table
+    for hwnd in visible_tables:
+        if last_table_result_displayed.get(hwnd, False):
+            show_table_button_(table_snapshots[hwnd].button_pos, hwnd)
+
+    logging.debug("Frame conversions since the last window scan: %s", Lazy(frame_stats.delta))
+
+def update_visible_tables_(tables):
+    """
+    Replace the set of visible tables: new tables get a pixel probe task in the scheduler,
+    tables that are gone or hidden lose theirs and their button is hidden.
+    :param tables: dict {hwnd: title} of the visible tables
+    """
+
+    global visible_tables
+
+    logging.debug("Visible tables: %d", len(tables))
+
+    for hwnd in set(visible_tables) - set(tables):
+        scheduler.remove_member("table_probe", hwnd)
+        last_table_result_displayed.pop(hwnd, None)
+        result_displayed_since.pop(hwnd, None)
+        auto_capture.on_probe(hwnd, False)
+        table_button_hysteresis.forget(hwnd)
+        hide_table_button_(hwnd)
+
+    for hwnd in tables:
+        scheduler.add_member("table_probe", hwnd, interval=search_interval_pixel_color,
+                             min_interval=min_search_interval_pixel_color, max_interval=search_interval_pixel_color,
+                             backoff=1.5)
 
-    while True:       
-        # Get the current timestamp
-        current_timestamp = time.time()
-
-        # Call the function to check for the "winamax.exe" process
-        found_wmx_proc = check_wmx_proc_alive_()
-
-        # Check if any "winamax.exe" process is found
-        if found_wmx_proc:
-            # Get the PIDs of "winamax.exe" processes
-            wmx_pids = get_wmx_pids_()
-            logging.debug(f"Winamax PIDs: {wmx_pids}")
-
-            # Get the HWNDs of "winamax.exe" processes
-            wmx_hwnd_list = get_wmx_hwnd_and_title_(wmx_pids)
-            logging.debug(f"Winamax HWNDs: {wmx_hwnd_list}")
-
-            ### PART 1: Main Winamax Stats window : Drawing button and Screenhot of Results ###
-
-            # Get the HWND of main launcher window title
-            main_wmx_hwnd_list_filtered = filter_hwnd_list_winamax_window_(wmx_hwnd_list, winamax_window_name)
-
-            # Check if the filtered Window HWND is found
-            if main_wmx_hwnd_list_filtered:
-                # Get the first HWND and title from the filtered list
-                hwnd, title = main_wmx_hwnd_list_filtered[0]
-                logging.debug(f"Winamax window found: {title} (HWND: {hwnd})")
-
-                # Get the position and dimensions of the window
-                x, y, width, height = get_window_position_and_dimensions_(hwnd)
-                logging.debug(f"{title} position: ({x}, {y}), dimensions: {width}x{height}")
-
-                # Check if the window is minimized
-                if x == -32000 and y == -32000:
-                    string_found = False
-                   # hide_stat_button_()
-                    logging.debug("Window is minimized")
-                else:
-                    # Store the coordinates of the window
-                    x_coord_window, y_coord_window = x, y
-                    
-                    # Draw a button on the screen if string_found is True, given by OCR thread
-                    if string_found:
-                        logging.debug("String found, drawing button on screen.")
-                        button_pos_x, button_pos_y = calculate_stat_btn_pos_(x, y, width)
-                        logging.debug(f"Button position: ({button_pos_x}, {button_pos_y}), hwnd: {hwnd}")
-                        show_stat_button_((button_pos_x, button_pos_y), hwnd)
-                        logging.debug(f"Affichage du bouton à la position : {button_pos_x}, {button_pos_y}")
-                    else:
-                        logging.debug("String not found.")
-                        # hide_stat_button_()
-
-                    # Réinitialiser l'état des threads
-                    ocr_stat_thread_done.clear()   
-
-                ### END OF PART 1 ###
-
-                ### PART 2: Winamax Tables detection ###
-
-            # Check if Playground is found
-
-            playground_wmx_hwnd_list_filtered = filter_hwnd_list_winamax_window_(wmx_hwnd_list, playground_window_name)
-
-            if playground_wmx_hwnd_list_filtered:
-                # Get the first HWND and title from the filtered list
-                hwnd, title = playground_wmx_hwnd_list_filtered[0]
-                logging.info(f"Playground window found: {title} (HWND: {hwnd})")
-
-                # Get the position and dimensions of the Playground window
-                x_coord_playground, y_coord_playground, playground_width, playground_height = get_window_position_and_dimensions_(hwnd)
-
-                # Check if the Playground window is minimized
-                if x_coord_playground == -32000 and y_coord_playground == -32000:
-                    playground_table_img = False
-                    logging.info(f"{title} is minimized")
-                else:
-                    logging.info(f"{title} position: ({x_coord_playground}, {y_coord_playground}), dimensions: {playground_width}x{playground_height}")
-
-                # Once detected, part where all the magic happens for Playground
-
-                # Find the number of tables 
-
-                playground_table_pil = capture_playground_region_(x_coord_playground, y_coord_playground)
-                playground_table_img = pil_to_cv2(playground_table_pil)
-                
-                templates = load_templates(template_dir, num_templates)
-                
-                if playground_table_pil:
-                    # Perform the image comparison search
-                    found, matched_value = image_comparison_search(playground_table_img, templates)      
-                    if found:
-                        print(f"Matched template value: {matched_value}")
-                    else:
-                        print("No match found")
-                        
-                    # screenshot of the Playground table to test and save
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    file_path = os.path.join(os.path.dirname(__file__), f"playground_table_{timestamp}.jpg")
-                    playground_table_pil.save(file_path, "JPEG")
-                    logging.info(f"Playground table image saved: {file_path}")
-                else:
-                      logging.info("No playground table value captured.")
+    visible_tables = tables
+
+def buffer_table_result_(hwnd):
+    """
+    Grab the result rectangle of a table from its snapshot and keep it in the result frame buffer.
+    :param hwnd: Handle of the table window
+    """
+
+    result_rect = table_snapshots[hwnd].result_rect
+    try:
+        frame = capture_service.grab_frame(result_rect, capture_pool)
+        try:
+            result_frame_buffer.push(hwnd, frame.bgra, rect=result_rect) # Copied as BGR by the buffer
+        finally:
+            frame.release()
+    except Exception as e:
+        logging.debug("Error capturing the result of the table with HWND %s: %s", hwnd, e)
 
+def table_probe_task_(hwnds):
+    """
+    Scheduled group task: check the result frame pixel of every table due for a check with a single grab per monitor,
+    then draw or hide the table buttons.
+    :param hwnds: list of the table HWNDs due for a check
+    :return: dict {hwnd: bool} telling the scheduler which tables just changed state (checked again sooner)
+    """
 
+    # Collect the pixels to check from the snapshot of each table (20 pixels inside the result rectangle)
+    probe_points = {hwnd: table_snapshots[hwnd].probe_point for hwnd in hwnds if hwnd in table_snapshots}
+
+    with tracer.span("pixel_probe"):
+        probe_results = check_tables_pixel_color_(probe_points)
+
+    changed = {}
+    for hwnd, table_result_displayed in probe_results.items():
+        with tracer.span("table_update", hwnd):
+            changed[hwnd] = table_result_displayed != last_table_result_displayed.get(hwnd, False)
+            last_table_result_displayed[hwnd] = table_result_displayed
+            last_pixel_check_timestamp[hwnd] = time.time()
+            if auto_capture_tables:
+                auto_capture.on_probe(hwnd, table_result_displayed)
+
+            if table_result_displayed and changed[hwnd]:
+                result_displayed_since[hwnd] = result_frame_buffer.clock()
+                if not table_button_hysteresis.is_on(hwnd):
+                    buffer_table_result_(hwnd) # Grab the result as soon as it appears, before the button covers it
+                # Otherwise the button still covers the table: a click grabs the result again, button hidden
+
+            # If the result frame is displayed, draw a button on the screen (kept for a few negative probes, see table_button_hide_after)
+            if table_button_hysteresis.update(hwnd, table_result_displayed):
+                logging.debug("Result frame on screen : %s / on table %s", table_result_displayed, visible_tables.get(hwnd))
+                button_pos_x, button_pos_y = table_snapshots[hwnd].button_pos
+                show_table_button_((button_pos_x, button_pos_y), hwnd)
+                logging.debug("Draw Button at position: (%s, %s), hwnd: %s", button_pos_x, button_pos_y, hwnd)
             else:
-                logging.info("Playground window not found.")
-                x_coord_playground, y_coord_playground, playground_width, playground_height = 0, 0, 0, 0
-
-            # Get the HWNDs of all Winamax tables
-            wmx_hwnd_table_list = filter_hwnd_list_winamax_tables_(wmx_hwnd_list, winamax_window_name)
-            logging.debug(f"Tables HWNDs and Title: {wmx_hwnd_table_list}")
-
-            # If there's a list of tables
-            if wmx_hwnd_table_list:
-                # Filter the list to only include visible tables
-                visible_windows = [(hwnd, title) for hwnd, title in wmx_hwnd_table_list if is_window_visible_(hwnd)]
-                logging.debug(f"Visible tables: {len(visible_windows)}")
-
-                # Get the position and dimensions of each visible table
-                for hwnd, title in visible_windows:
-                    x, y, width, height = get_window_position_and_dimensions_(hwnd)
-                    logging.debug(f"Table {title} position: ({x}, {y}), dimensions: {width}x{height}, HWND: {hwnd}")
-                    # We load the coordinates of the theorical rectangle within the table window 
-                    rectangle_coord = get_center_rectangle(width, height) 
-
-                    x_pixel_check_coord = x + rectangle_coord[0] + 20 # Offset of 20 pixels on the left side of the rectangle to ensure we're in the rectangle
-                    y_pixel_check_coord = y + rectangle_coord[1] + 20 # Offset of 20 pixels on the top side of the rectangle to ensure we're in the rectangle
-
-                     # Check the last timestamp for this hwnd
-                    last_check_time = last_pixel_check_timestamp.get(hwnd, 0)  # Default to 0 if no previous check
-                    
-                    # If the time since the last check is greater than the specified interval, proceed
-                    if current_timestamp - last_check_time >= search_interval_pixel_color: 
-                        logging.debug(f"Checking pixel color for table {title}")              
-                        # Check the pixel color at the specified coordinates
-                        table_result_displayed = check_table_pixel_color_(x_pixel_check_coord, y_pixel_check_coord, hwnd)
-                        if table_result_displayed:
-                            logging.debug(f"Result frame on screen : {table_result_displayed} / on table {title}")
-                        else:
-                            logging.debug(f"Result frame not displayed on table {title}")
-                        
-                        last_pixel_check_timestamp[hwnd] = current_timestamp
-
-                    else:
-                        logging.debug(f"Skipping pixel color check for table {title}")
-                        
-                    # If the result frame is displayed, draw a button on the screen
-                    if table_result_displayed:
-                            button_pos_x, button_pos_y = calculate_table_btn_pos_(x, y, hwnd)
-                            show_table_button_((button_pos_x, button_pos_y), hwnd)
-                            logging.debug(f"Draw Button at position: ({button_pos_x}, {button_pos_y}), hwnd: {hwnd}")
-                    else:
-                        logging.debug("Result frame not displayed.")
-                        hide_table_button_(hwnd)
-
-                    ### TEST ONLY ###
-                    ### WE TEST THE TABLE SCREENSHOT FUNCTION ###
-                    ### TO BE REMOVED IN PRODUCTION ###
-                    ### FROM HERE WE NEED TO LAUNCH PIXEL COLOR CHECK ON EACH VISIBLE TABLE TO FIND THE RESULT WINDOW ###
-                    ### IF THE PIXEL COLOR IS THE SAME AS THE RESULT WINDOW, WE DRAW A BUTTON AT A SPECIFIC COORD GIVEN BY TABLE COORD AND SIZE ###
-                    ### WHEN THE BUTTON IS CLICKED, WE SAVE THE SCREENSHOT OF THE RESULT WINDOW ###
-                    
-                    # save_table_screenshot_(hwnd) # Save the screenshot of the table
-                    # logging.debug(f"Saving the screenshot of the table {title}")
-
-                    ### TEST ONLY ###
-
-                    ### END OF PART 2 ###
-
-                    ### PART 3: Thread Management for Main Winamax Detection, Results of Tables Detection and Exit main loop ###
-                    
-                    # Check if the "escape" key is pressed
-
-        if keyboard.is_pressed('escape'):
-            logging.debug("Script terminated by user.")
-            QApplication.quit()
-            return
-
-        # Process other periodic tasks
-        if current_timestamp - start_ocr_timestamp >= search_interval_OCR:
-            logging.debug("Boucle OCR thread relancé")
-            start_OCR_Stat_thread_()
-            start_ocr_timestamp = current_timestamp  # Reset the timestamp
-
-        app.processEvents()
-
-        # Wait for 1 second before checking again
-        time.sleep(1)
+                logging.debug("Result frame not displayed on table %s", visible_tables.get(hwnd))
+                hide_table_button_(hwnd)
+
+    return changed
+
+def auto_capture_task_():
+    """
+    Scheduled task (auto-capture mode): capture the result of the tables whose result frame has been displayed for the
+    debounce delay, and queue it to the screenshot writer unless the same popup was already saved.
+    """
+
+    for hwnd in auto_capture.due():
+        if not last_table_result_displayed.get(hwnd, False) or hwnd not in table_snapshots:
+            continue
+        result_rect = table_snapshots[hwnd].result_rect
+        try:
+            frame = capture_service.grab_frame(result_rect, capture_pool)
+        except Exception as e:
+            logging.debug("Error capturing the result of the table with HWND %s: %s", hwnd, e)
+            continue
+        try:
+            buffered = result_frame_buffer.push(hwnd, frame.bgra, rect=result_rect) # The settled popup is also the one a click saves
+        finally:
+            frame.release()
+        if buffered is None:
+            continue
+        result_img = buffered.image # BGR copy owned by the buffer, the pooled capture is already back in the pool
+        if auto_capture.accept(hwnd, result_img):
+            logging.info("Result of table %s captured automatically.", visible_tables.get(hwnd))
+            queue_table_screenshot_(hwnd, result_img, timestamped=True)
+        else:
+            logging.debug("Result of table %s already saved, capture skipped.", visible_tables.get(hwnd))
+
+def stat_ocr_task_():
+    """
+    Scheduled task: queue a new OCR of the Stat region of the main Winamax window.
+    """
+
+    logging.debug("Boucle OCR thread relancé, OCR executor: %s", Lazy(ocr_executor.metrics))
+    start_OCR_Stat_thread_()
+
+def metrics_export_task_():
+    """
+    Scheduled task (stage metrics enabled): write the rolling percentiles of every stage to stage_metrics_file.
+    """
+
+    try:
+        tracer.write_summary(stage_metrics_file)
+    except OSError as e:
+        logging.debug("Error writing the stage metrics to %s: %s", stage_metrics_file, e)
+
+def escape_check_task_():
+    """
+    Scheduled task: quit the application when the "escape" key is pressed, dump the last log lines on log_dump_hotkey
+    and the Chrome trace of the last ticks on stage_trace_hotkey.
+    """
+
+    global log_dump_key_down, stage_trace_key_down
+
+    if keyboard.is_pressed('escape'):
+        logging.debug("Script terminated by user.")
+        gui.call(QApplication.quit)
+
+    dump_pressed = keyboard.is_pressed(log_dump_hotkey)
+    if dump_pressed and not log_dump_key_down: # Once per key press
+        log_system.dump(f"winamaxocr_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    log_dump_key_down = dump_pressed
+
+    if tracer.enabled:
+        trace_pressed = keyboard.is_pressed(stage_trace_hotkey)
+        if trace_pressed and not stage_trace_key_down: # Once per key press, to be opened in chrome://tracing or Perfetto
+            trace_path = tracer.write_chrome_trace(f"winamaxocr_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            logging.info("Trace of the last %s ticks written to %s", stage_trace_ticks, trace_path)
+        stage_trace_key_down = trace_pressed
+
+def create_ocr_engines_():
+    """
+    Create the OCR engines (one resident Tesseract engine per region profile, and the glyph OCR if a model was
+    trained), from main() rather than at import so that no OCR process starts before the application does.
+    """
+
+    global stat_tesseract_engine, playground_tesseract_engine, glyph_engine, stat_text_engine, playground_ocr_engine, stat_ocr_engine
+
+    stat_tesseract_engine = create_ocr_engine(tessdata_path=tessdata_path, tesseract_cmd=tesseract_cmd,
+                                              profile=stat_ocr_profile.compile())
+    playground_tesseract_engine = create_ocr_engine(tessdata_path=tessdata_path, tesseract_cmd=tesseract_cmd,
+                                                    profile=playground_ocr_profile.compile())
+    glyph_engine = load_glyph_engine(glyph_model_path)
+    stat_text_engine = FallbackEngine(glyph_engine, stat_tesseract_engine) if glyph_engine else stat_tesseract_engine
+    playground_ocr_engine = FallbackEngine(glyph_engine, playground_tesseract_engine) if glyph_engine else playground_tesseract_engine
+    stat_ocr_engine = CachedEngine(stat_text_engine, OCRResultCache())
+
+def main():
+
+    global window_tracker, scheduler, button_overlay, gui, pipeline
+
+    app = QApplication([]) # Create a QApplication instance
+
+    create_ocr_engines_()
+
+    # Every button is drawn by one transparent overlay window per monitor
+    button_overlay = ButtonOverlay(app, button_image_path)
+    gui = GuiInvoker()
+
+    # Screen metrics are cached until the display configuration changes
+    app.primaryScreenChanged.connect(lambda _: on_display_change_())
+    app.screenAdded.connect(lambda _: on_display_change_())
+    app.screenRemoved.connect(lambda _: on_display_change_())
+    for screen in app.screens():
+        screen.geometryChanged.connect(lambda _: on_display_change_())
+
+    # Every stage runs at its own deadline on the pipeline thread, which sleeps exactly until the next one
+    # (each stage is timed by the tracer when the stage metrics are enabled)
+    scheduler = DeadlineScheduler()
+    scheduler.add("process_scan", tracer.wrap("process_scan", process_scan_task_), interval=process_scan_interval)
+    scheduler.add("window_scan", tracer.wrap("window_scan", window_scan_task_), interval=window_scan_interval)
+    scheduler.add_group("table_probe", tracer.wrap("table_probe", table_probe_task_))
+    scheduler.add("stat_ocr", tracer.wrap("stat_ocr", stat_ocr_task_), interval=search_interval_OCR, delay=search_interval_OCR)
+    scheduler.add("escape_check", escape_check_task_, interval=escape_check_interval)
+    if auto_capture_tables:
+        scheduler.add("auto_capture", tracer.wrap("auto_capture", auto_capture_task_), interval=auto_capture_debounce / 5)
+    metrics_server = None
+    if tracer.enabled:
+        if stage_metrics_file:
+            scheduler.add("metrics_export", metrics_export_task_, interval=stage_metrics_export_interval)
+        if stage_metrics_http_port is not None:
+            metrics_server = tracer.serve(stage_metrics_http_port)
+    # The pipeline thread does the captures, it closes its own grabber when it stops
+    pipeline = Pipeline(scheduler, on_tick=tracer.tick if tracer.enabled else None, on_exit=capture_service.close_thread)
+
+    # Track the Winamax windows from window events, a change of a Winamax window triggers a window scan right away
+    window_tracker = WindowTracker(Win32EventSource(), on_change=lambda: pipeline.reschedule_soon("window_scan"))
+    window_tracker.start()
+
+    # The GUI thread only runs the Qt event loop: button clicks are handled as soon as they happen
+    pipeline.start()
+    app.exec_()
+
+    pipeline.stop(timeout=5)
+    window_tracker.stop()
+    if tracer.enabled:
+        logging.info("Stage timings: %s", tracer.summary()['stages'])
+        if metrics_server is not None:
+            metrics_server.shutdown()
+    capture_service.close()
+    logging.info("Stat detector: %s, Stat OCR cache: %s", stat_detector.stats(), stat_ocr_engine.cache.stats())
+    logging.info("OCR executor: %s", ocr_executor.metrics())
+    ocr_executor.shutdown(wait=True)
+    screenshot_writer.close(timeout=5) # Write the queued screenshots before leaving
+    logging.info("Screenshot writer: %s", screenshot_writer.metrics())
+    logging.info("Result frame buffer: %s", result_frame_buffer.stats())
+    logging.info("Frames: %s, capture pool: %s", frame_stats.snapshot(), capture_pool.stats())
+    if auto_capture_tables:
+        logging.info("Auto-capture: %s", auto_capture.stats())
+    if glyph_engine:
+        logging.info("Glyph OCR: %d Stat and %d Playground crops handed to Tesseract",
+                     stat_text_engine.fallback_calls, playground_ocr_engine.fallback_calls)
+    stat_tesseract_engine.close()
+    playground_tesseract_engine.close()
+    logging.info("Button overlay: %s, flickers absorbed: %s", button_overlay.stats(), table_button_hysteresis.absorbed)
+    button_overlay.close()
+    logging.info("Logging: %s", log_system.stats())
+    log_system.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,50 @@
+from collections import namedtuple
+
+# Per-tick window snapshot #
+# Everything the pipeline needs about a table, gathered once per window scan and passed along,
+# instead of querying GetWindowRect and recomputing the result rectangle at every stage.
+
+WindowSnapshot = namedtuple("WindowSnapshot", [
+    "hwnd",
+    "title",
+    "pid",
+    "rect", # (left, top, right, bottom) of the window
+    "visible", # Visible and not obscured (see wmx_visibility.compute_visibility)
+    "uncovered_fraction", # Fraction of the result rectangle not covered by other windows
+    "result_rect", # Absolute (left, top, right, bottom) of the result rectangle
+    "probe_point", # Absolute (x, y) of the pixel checked for the result frame
+    "button_pos", # Absolute (x, y) of the table button
+])
+
+def build_window_snapshots(z_order, tables, visibility, result_rects, button_pos_fn, probe_offset=20):
+    """
+    Build the immutable snapshot of every table from a z-order snapshot and its visibility sweep.
+    Parameters:
+    - z_order (list): List of ZWindow (see wmx_visibility.snapshot_z_order).
+    - tables (dict): {hwnd: title} of the tables.
+    - visibility (dict): {hwnd: TableVisibility} (see wmx_visibility.compute_visibility).
+    - result_rects (dict): {hwnd: (left, top, right, bottom)} absolute result rectangle of each table, as computed for
+      the visibility sweep.
+    - button_pos_fn (callable): (rect, result_rect) -> (x, y) absolute position of the button.
+    - probe_offset (int): Offset in pixels of the probe point from the top-left corner of the result rectangle.
+    Returns:
+    - dict: {hwnd: WindowSnapshot}, only for the tables present in the z-order snapshot and in result_rects.
+    """
+    snapshots = {}
+    for window in z_order:
+        result_rect = result_rects.get(window.hwnd)
+        if window.hwnd not in tables or result_rect is None:
+            continue
+        table_visibility = visibility.get(window.hwnd)
+        snapshots[window.hwnd] = WindowSnapshot(
+            hwnd=window.hwnd,
+            title=tables[window.hwnd],
+            pid=window.pid,
+            rect=window.rect,
+            visible=bool(table_visibility and table_visibility.visible),
+            uncovered_fraction=table_visibility.uncovered_fraction if table_visibility else 0.0,
+            result_rect=result_rect,
+            probe_point=(result_rect[0] + probe_offset, result_rect[1] + probe_offset),
+            button_pos=button_pos_fn(window.rect, result_rect),
+        )
+    return snapshots
@@ -0,0 +1,342 @@
+import os
+import time
+import logging
+import threading
+import cv2
+import numpy as np
+
+# "Stat" detector #
+# The Stat strip is drawn by the Winamax client with a fixed font, so the word can be found by normalized
+# cross-correlation against a stored crop of it instead of a full OCR. The crop is learned from the first strip
+# the OCR reads as containing "Stat", at the box the OCR gives for the word, and saved in the user data folder
+# (a crop shipped in Assets is only read, as the template until one is learned). The OCR still answers when the
+# correlation is neither clearly high nor clearly low, and checks one confident answer now and then.
+
+def user_data_dir():
+    """
+    Folder of the files the application writes for itself (%LOCALAPPDATA%\\WinamaxOCR on Windows).
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "WinamaxOCR")
+
+SHIPPED_STAT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Assets", "stat_word.png")
+STAT_TEMPLATE_PATH = os.path.join(user_data_dir(), "stat_word.png") # Learned template
+
+def first_word_box(gray, ink_delta=40, min_gap=6):
+    """
+    Bounding box of the leftmost word of a text strip, to locate the word on strips known to start with it
+    (the synthetic samples) without OCR.
+    Ink pixels are the ones differing from the background (the median level) by more than ink_delta; words are
+    separated by at least min_gap columns without ink.
+    :param gray: Grayscale strip as a NumPy array
+    :return: (x, y, width, height), or None if the strip has no ink
+    """
+    ink = np.abs(gray.astype(np.int16) - int(np.median(gray))) > ink_delta
+    columns = np.flatnonzero(ink.any(axis=0))
+    if not len(columns):
+        return None
+    gaps = np.flatnonzero(np.diff(columns) > min_gap)
+    left = columns[0]
+    right = columns[gaps[0]] if len(gaps) else columns[-1]
+    rows = np.flatnonzero(ink[:, left:right + 1].any(axis=1))
+    return int(left), int(rows[0]), int(right - left + 1), int(rows[-1] - rows[0] + 1)
+
+def _normalized(values):
+    values = values - values.mean()
+    return values / max(float(np.linalg.norm(values)), 1e-6)
+
+def ncc_1d(signal, template):
+    """
+    Normalized cross-correlation of a zero-mean, unit-norm 1D template at every position of a signal.
+    """
+    n = len(template)
+    cumsum = np.concatenate(([0.0], np.cumsum(signal, dtype=np.float64)))
+    cumsum2 = np.concatenate(([0.0], np.cumsum(signal.astype(np.float64) ** 2)))
+    sums = cumsum[n:] - cumsum[:-n]
+    variance = np.maximum(cumsum2[n:] - cumsum2[:-n] - sums * sums / n, 1e-6)
+    return np.correlate(signal, template, 'valid') / np.sqrt(variance)
+
+class StatTemplateMatcher:
+    """
+    Normalized cross-correlation (the TM_CCOEFF_NORMED score) of a strip against the stored word crop.
+    The word is located with the 1D correlations of the column and row ink profiles, then scored exactly in 2D on
+    the 3x3 positions around it: cv2.matchTemplate costs more than the whole search on a strip this small.
+    Parameters:
+    - template (np.ndarray): Grayscale word crop, or None until one is learned.
+    - accept (float): Score from which the word is present.
+    - reject (float): Score up to which the word is absent. In between, the answer is ambiguous.
+    - margin (int): Pixels of background kept around a learned word.
+    """
+
+    def __init__(self, template=None, accept=0.9, reject=0.7, margin=2):
+        self.accept = accept
+        self.reject = reject
+        self.margin = margin
+        self.template = template
+
+    @property
+    def template(self):
+        return self._template
+
+    @template.setter
+    def template(self, template):
+        self._template = template
+        if template is not None:
+            template = template.astype(np.float32)
+            self._normalized = _normalized(template)
+            self._columns = _normalized(template.sum(axis=0))
+            self._rows = _normalized(template.sum(axis=1))
+
+    @classmethod
+    def load(cls, path=STAT_TEMPLATE_PATH, shipped_path=SHIPPED_STAT_TEMPLATE_PATH, **kwargs):
+        """
+        Matcher with the word crop learned at `path`, else the one shipped at `shipped_path`, or without template if
+        there is none yet.
+        """
+        for candidate in (path, shipped_path):
+            template = cv2.imread(candidate, cv2.IMREAD_GRAYSCALE) if candidate and os.path.exists(candidate) else None
+            if template is not None:
+                logging.debug("Stat template loaded from %s (%dx%d)", candidate, template.shape[1], template.shape[0])
+                return cls(template, **kwargs)
+        return cls(None, **kwargs)
+
+    def save(self, path=STAT_TEMPLATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not cv2.imwrite(path, self._template):
+            raise OSError(f"Cannot write {path}")
+
+    def score(self, gray):
+        """
+        Best correlation of the word crop over the strip (None without template).
+        """
+        if self._template is None:
+            return None
+        height, width = self._template.shape
+        if gray.shape[0] < height or gray.shape[1] < width:
+            return 0.0
+        strip = gray.astype(np.float32)
+        x = int(np.argmax(ncc_1d(strip.sum(axis=0), self._columns)))
+        y = int(np.argmax(ncc_1d(strip[:, x:x + width].sum(axis=1), self._rows)))
+
+        # Exact score on the 3x3 positions around (x, y)
+        left, top = max(0, x - 1), max(0, y - 1)
+        region = strip[top:y + height + 1, left:x + width + 1]
+        windows = np.lib.stride_tricks.sliding_window_view(region, (height, width))
+        products = np.tensordot(windows, self._normalized, axes=([2, 3], [0, 1]))
+        integral, integral2 = cv2.integral2(region, sdepth=cv2.CV_64F)
+        n = height * width
+        sums = integral[height:, width:] - integral[:-height, width:] - integral[height:, :-width] + integral[:-height, :-width]
+        sums2 = integral2[height:, width:] - integral2[:-height, width:] - integral2[height:, :-width] + integral2[:-height, :-width]
+        norms = np.sqrt(np.maximum(sums2 - sums * sums / n, 1e-6))
+        return float((products / norms).max())
+
+    def decide(self, gray):
+        """
+        :return: Tuple (verdict, score): verdict is True or False when the score is conclusive, None otherwise
+        """
+        score = self.score(gray)
+        if score is None:
+            return None, None
+        if score >= self.accept:
+            return True, score
+        if score <= self.reject:
+            return False, score
+        return None, score
+
+    def learn(self, gray, box):
+        """
+        Take the word at `box` (x, y, width, height) of a strip known to contain it as the new template.
+        Returns False if the box holds no usable crop.
+        """
+        x, y, width, height = box
+        m = self.margin
+        crop = gray[max(0, y - m):y + height + m, max(0, x - m):x + width + m]
+        if crop.shape[0] < 4 or crop.shape[1] < 8 or crop.std() == 0:
+            return False
+        self.template = np.ascontiguousarray(crop)
+        return True
+
+class StatDetector:
+    """
+    "Stat" trigger answered by the template matcher, with the OCR as fallback.
+    The OCR runs when there is no template yet (and a template is learned from its first positive answer, at the
+    box where the OCR located the word), when the correlation is ambiguous, and on every verify_every-th
+    conclusive answer; a template contradicted by the OCR is dropped and learned again.
+    Parameters:
+    - matcher (StatTemplateMatcher): Word template matcher.
+    - template_path (str): Where a learned template is saved (None to keep it in memory only).
+    - verify_every (int): Conclusive answers between two OCR checks (0 to never check).
+    """
+
+    def __init__(self, matcher, template_path=STAT_TEMPLATE_PATH, verify_every=50):
+        self.matcher = matcher
+        self.template_path = template_path
+        self.verify_every = verify_every
+        self._lock = threading.Lock()
+        self._since_verify = 0
+        self.matched = 0
+        self.ocr_fallbacks = 0
+        self.verified = 0
+        self.disagreements = 0
+        self.learned = 0
+
+    def detect(self, gray, ocr, locate=None):
+        """
+        Tell whether the strip contains the word, same contract as OCR_string_search_.
+        :param gray: Grayscale Stat strip
+        :param ocr: Function without argument running the OCR and returning True if the word is found
+        :param locate: Function without argument returning the box (x, y, width, height) of the word in the strip,
+                       or None if the OCR does not locate it. Called only to learn a template; without it, none is learned.
+        :return: True if the word is found, False otherwise
+        """
+        verdict, score = self.matcher.decide(gray)
+        with self._lock:
+            if verdict is not None:
+                self._since_verify += 1
+                if not self.verify_every or self._since_verify < self.verify_every:
+                    self.matched += 1
+                    return verdict
+                self._since_verify = 0
+                self.verified += 1
+            else:
+                self.ocr_fallbacks += 1
+
+        found = ocr()
+        if verdict is not None and verdict != found:
+            with self._lock:
+                self.disagreements += 1
+            logging.info("Stat template contradicted by the OCR (score %.3f), learning it again.", score)
+            self.matcher.template = None
+        if found and self.matcher.template is None and locate is not None:
+            self._learn(gray, locate)
+        elif score is not None:
+            logging.debug("Stat template score %.3f ambiguous, OCR says %s.", score, found)
+        return found
+
+    def _learn(self, gray, locate):
+        try:
+            box = locate()
+        except Exception as e:
+            logging.debug("Error locating the Stat word: %s", e)
+            return
+        if box is None or not self.matcher.learn(gray, box):
+            return
+        with self._lock:
+            self.learned += 1
+        logging.info("Stat template learned (%sx%s).", self.matcher.template.shape[1], self.matcher.template.shape[0])
+        if self.template_path:
+            try:
+                self.matcher.save(self.template_path)
+            except Exception as e:
+                logging.debug("Error saving the Stat template to %s: %s", self.template_path, e)
+
+    def stats(self):
+        with self._lock:
+            answered = self.matched + self.ocr_fallbacks + self.verified
+            return {
+                "matched": self.matched,
+                "ocr_fallbacks": self.ocr_fallbacks,
+                "verified": self.verified,
+                "disagreements": self.disagreements,
+                "learned": self.learned,
+                "ocr_share": (self.ocr_fallbacks + self.verified) / answered if answered else 0.0,
+            }
+
+STAT_POSITIVE_TEXTS = ["Statistiques", "Statistiques  Sessions", "Statistiques  Tournois", "Statistiques  Cash Game"]
+STAT_NEGATIVE_TEXTS = ["Tournois", "Cash Game", "Sit & Go", "Expresso", "Historique", "Start", "Lobby", "Profil",
+                       "Boutique", "Classements", "Sessions", "Mes tournois"]
+
+def make_stat_samples(count=400, seed=0, width=400, height=50, noise_sigma=4.0):
+    """
+    Labelled synthetic Stat strips (BGR): the client font is stood in for by a fixed OpenCV font, with the text
+    shifted by a few pixels, a varying background level and noise.
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(count):
+        positive = i % 2 == 0
+        texts = STAT_POSITIVE_TEXTS if positive else STAT_NEGATIVE_TEXTS
+        text = texts[rng.integers(len(texts))]
+        background = int(rng.integers(28, 44))
+        img = np.full((height, width, 3), background, dtype=np.uint8)
+        origin = (int(rng.integers(6, 16)), int(rng.integers(31, 37)))
+        cv2.putText(img, text, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.9, (230, 230, 230), 2, cv2.LINE_AA)
+        noisy = np.clip(img.astype(np.float32) + rng.normal(0, noise_sigma, img.shape), 0, 255).astype(np.uint8)
+        samples.append(("Stat" in text, noisy))
+    return samples
+
+def benchmark_stat_detector(count=400, noise_sigma=4.0, ocr_engines=("tesserocr", "pytesseract"), tessdata_path=None,
+                            tesseract_cmd=None):
+    """
+    Precision, recall and latency on synthetic Stat strips: the template matcher alone, the detector with its OCR
+    fallback, and Tesseract alone when it is installed (otherwise the fallback is answered by the labels).
+    """
+    from wmx_ocr import _make_engine, DEFAULT_LANG
+
+    samples = make_stat_samples(count, noise_sigma=noise_sigma)
+    grays = [cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) for _, img in samples]
+
+    engine = None
+    for name in ocr_engines:
+        try:
+            engine = _make_engine(name, DEFAULT_LANG, tessdata_path, tesseract_cmd)
+            break
+        except Exception as e:
+            print(f"OCR engine {name} unavailable: {e}")
+
+    def report(label, answers, elapsed, extra=""):
+        tp = sum(1 for (truth, _), answer in zip(samples, answers) if truth and answer)
+        fp = sum(1 for (truth, _), answer in zip(samples, answers) if not truth and answer)
+        fn = sum(1 for (truth, _), answer in zip(samples, answers) if truth and not answer)
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        print(f"{label:32s}: precision {precision:6.1%} | recall {recall:6.1%} | {elapsed * 1e6:9.1f} us/strip{extra}")
+
+    if engine is not None:
+        start = time.perf_counter()
+        answers = ["Stat" in engine.image_to_string(img) for _, img in samples]
+        report(f"Tesseract ({engine.name})", answers, (time.perf_counter() - start) / count)
+
+    def locate(img, gray):
+        # The word box given by the OCR, or the leftmost word without OCR (the positive strips start with it)
+        if engine is None:
+            return first_word_box(gray)
+        return next((box for text, box in engine.image_to_words(img) if "Stat" in text), None)
+
+    # The template is learned from the first positive strip, as the detector does at run time
+    matcher = StatTemplateMatcher()
+    box = locate(samples[0][1], grays[0])
+    if box is None or not matcher.learn(grays[0], box):
+        print("The OCR did not locate the word on the first strip, no template.")
+        return
+    start = time.perf_counter()
+    decisions = [matcher.decide(gray) for gray in grays]
+    elapsed = (time.perf_counter() - start) / count
+    ambiguous = sum(1 for verdict, _ in decisions if verdict is None)
+    report("Template matcher alone", [verdict is True for verdict, _ in decisions], elapsed, f" | {ambiguous} ambiguous")
+
+    detector = StatDetector(StatTemplateMatcher(accept=matcher.accept, reject=matcher.reject), template_path=None)
+    start = time.perf_counter()
+    answers = []
+    for (truth, img), gray in zip(samples, grays):
+        if engine is not None:
+            ocr = lambda img=img: "Stat" in engine.image_to_string(img)
+        else:
+            ocr = lambda truth=truth: truth # Labels standing in for a perfect OCR
+        answers.append(detector.detect(gray, ocr, lambda img=img, gray=gray: locate(img, gray)))
+    elapsed = (time.perf_counter() - start) / count
+    stats = detector.stats()
+    report("Detector + OCR fallback" + ("" if engine is not None else " (labels)"), answers, elapsed,
+           f" | OCR on {stats['ocr_share']:.1%} of the strips")
+    if engine is not None:
+        engine.close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Stat detector against Tesseract on synthetic Stat strips")
+    parser.add_argument("--count", type=int, default=400)
+    parser.add_argument("--noise", type=float, default=4.0, help="Standard deviation of the pixel noise")
+    parser.add_argument("--tessdata-path")
+    parser.add_argument("--tesseract-cmd")
+    args = parser.parse_args()
+    benchmark_stat_detector(args.count, args.noise, tessdata_path=args.tessdata_path, tesseract_cmd=args.tesseract_cmd)
@@ -0,0 +1,255 @@
+import os
+import time
+import logging
+import cv2
+import numpy as np
+
+# Template bank #
+# The Playground digit templates (Assets/1.jpg .. Assets/12.jpg) loaded once, stored as contiguous
+# grayscale arrays, and reloaded only when one of the files changes on disk.
+
+class TemplateBank:
+    """
+    Cache of the grayscale digit templates of the Playground table count.
+    Parameters:
+    - template_dir (str): Directory containing the template images named 1.jpg .. N.jpg.
+    - num_templates (int): Number of templates to load.
+    - check_interval (float): Minimum delay in seconds between two mtime checks of the template files.
+    """
+
+    def __init__(self, template_dir, num_templates, check_interval=1.0, clock=time.monotonic):
+        self.template_dir = template_dir
+        self.num_templates = num_templates
+        self.check_interval = check_interval
+        self.clock = clock
+        self._templates = []
+        self._values = [] # Template value (1-based index) of each loaded template
+        self._mtimes = None
+        self._last_check = None
+        self.load_count = 0
+
+    def _paths(self):
+        return [os.path.join(self.template_dir, f'{i}.jpg') for i in range(1, self.num_templates + 1)]
+
+    def _current_mtimes(self):
+        mtimes = []
+        for path in self._paths():
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def load(self):
+        """
+        (Re)load every template from disk and convert it to a contiguous grayscale array.
+        """
+        templates = []
+        values = []
+        for i, template_path in enumerate(self._paths(), start=1):
+            template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+            if template is not None:
+                templates.append(np.ascontiguousarray(template))
+                values.append(i)
+            else:
+                logging.warning("Template %s.jpg not found in %s", i, self.template_dir)
+
+        self._templates = templates
+        self._values = values
+        self._mtimes = self._current_mtimes()
+        self._last_check = self.clock()
+        self.load_count += 1
+        logging.debug("%s templates loaded from %s", len(templates), self.template_dir)
+
+    def _refresh(self):
+        if self._mtimes is None:
+            self.load()
+            return
+        now = self.clock()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self._current_mtimes() != self._mtimes:
+            logging.info("Templates changed on disk, reloading %s", self.template_dir)
+            self.load()
+
+    def templates(self):
+        """
+        Return the list of grayscale templates, reloading them if a file changed.
+        """
+        self._refresh()
+        return self._templates
+
+    def values(self):
+        """
+        Return the value (1-based index) of each template returned by templates().
+        """
+        self._refresh()
+        return self._values
+
+class DigitClassifier:
+    """
+    Single-pass classifier for the Playground table count.
+    Every template is scored at once: the crop and its shifted copies (up to max_shift pixels in each direction)
+    are stacked, zero-mean normalized, and correlated against the stacked normalized templates with one
+    matrix product, the same score as cv2.TM_CCOEFF_NORMED. The best template wins, whatever its order.
+    Parameters:
+    - bank (TemplateBank): Source of the grayscale templates, all of the same size.
+    - max_shift (int): Maximum offset in pixels tolerated between the crop and the templates.
+    - min_score (float): Minimum correlation for a match, same threshold as the former first-match search.
+    """
+
+    def __init__(self, bank, max_shift=2, min_score=0.8):
+        self.bank = bank
+        self.max_shift = max_shift
+        self.min_score = min_score
+        self._compiled_for = None
+        self._matrix = None
+        self._values = None
+        self._shape = None
+
+    @staticmethod
+    def _normalize_rows(rows):
+        rows = rows - rows.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        return rows / np.maximum(norms, 1e-6) # Flat patches get a null score instead of a division by zero
+
+    def _compile(self):
+        templates = self.bank.templates()
+        if self._compiled_for == self.bank.load_count:
+            return
+        shapes = {template.shape for template in templates}
+        if len(shapes) != 1:
+            raise ValueError(f"Templates must all have the same size, got {sorted(shapes)}")
+        self._shape = shapes.pop()
+        stacked = np.stack(templates).reshape(len(templates), -1).astype(np.float32)
+        self._matrix = np.ascontiguousarray(self._normalize_rows(stacked).T) # (pixels, templates)
+        self._values = np.array(self.bank.values())
+        self._compiled_for = self.bank.load_count
+
+    def scores(self, img):
+        """
+        Return the best correlation of every template over all the tolerated offsets.
+        :param img: BGR or grayscale crop as a NumPy array
+        :return: float32 array of shape (num_templates,)
+        """
+        self._compile()
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        height, width = self._shape
+        if gray.shape != self._shape:
+            gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+        shift = self.max_shift
+        if shift:
+            padded = np.pad(gray, shift, mode='edge')
+            windows = np.lib.stride_tricks.sliding_window_view(padded, (height, width))
+            patches = windows.reshape(-1, height * width)
+        else:
+            patches = gray.reshape(1, -1)
+
+        patches = self._normalize_rows(patches.astype(np.float32))
+        return (patches @ self._matrix).max(axis=0)
+
+    def classify(self, img):
+        """
+        Classify a Playground digit crop.
+        :param img: BGR or grayscale crop as a NumPy array (capture_playground_region_ size)
+        :return: Tuple (value, score, margin) where value is the best template value or None if its score is
+                 below min_score, score its correlation and margin the gap to the second best template.
+        """
+        scores = self.scores(img)
+        order = np.argsort(scores)
+        best = order[-1]
+        score = float(scores[best])
+        margin = score - float(scores[order[-2]]) if len(scores) > 1 else score
+        value = int(self._values[best]) if score >= self.min_score else None
+        return value, score, margin
+
+def _synthetic_digit_samples(bank, max_offset=2, noise_sigma=12.0, repeats=20, seed=0):
+    """
+    Build labelled test crops from the templates with a random offset and Gaussian noise.
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for value, template in zip(bank.values(), bank.templates()):
+        for _ in range(repeats):
+            dx, dy = rng.integers(-max_offset, max_offset + 1, size=2)
+            shifted = np.roll(np.pad(template, max_offset, mode='edge'), (dy, dx), axis=(0, 1))
+            crop = shifted[max_offset:max_offset + template.shape[0], max_offset:max_offset + template.shape[1]]
+            noisy = np.clip(crop.astype(np.float32) + rng.normal(0, noise_sigma, crop.shape), 0, 255).astype(np.uint8)
+            samples.append((value, cv2.cvtColor(noisy, cv2.COLOR_GRAY2BGR)))
+    return samples
+
+def benchmark_digit_classifier(template_dir="Assets", num_templates=12, max_offset=2, noise_sigma=12.0):
+    """
+    Accuracy and latency of the sequential first-above-threshold search against the single-pass classifier,
+    on the Assets digits with synthetic noise and offsets.
+    """
+    bank = TemplateBank(template_dir, num_templates)
+    classifier = DigitClassifier(bank, max_shift=max_offset)
+
+    for offset in sorted({0, max_offset}):
+        samples = _synthetic_digit_samples(bank, max_offset=offset, noise_sigma=noise_sigma)
+
+        start = time.perf_counter()
+        legacy_correct = sum(_bank_search(img, bank) == value for value, img in samples)
+        legacy = (time.perf_counter() - start) / len(samples)
+
+        start = time.perf_counter()
+        results = [classifier.classify(img) for _, img in samples]
+        single_pass = (time.perf_counter() - start) / len(samples)
+        correct = sum(result[0] == value for (value, _), result in zip(samples, results))
+        min_margin = min(result[2] for (value, _), result in zip(samples, results) if result[0] == value)
+
+        print(f"offset <= {offset}px, noise sigma {noise_sigma}: {len(samples)} samples")
+        print(f"  Sequential search : {legacy_correct / len(samples):6.1%} accuracy, {legacy * 1e6:7.1f} us/call")
+        print(f"  Single pass       : {correct / len(samples):6.1%} accuracy, {single_pass * 1e6:7.1f} us/call, "
+              f"min margin {min_margin:.3f}")
+
+def _legacy_load_and_search(img, template_dir, num_templates):
+    """
+    The per-tick path before the template bank: read every JPEG, then convert each one to grayscale.
+    """
+    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    for i in range(1, num_templates + 1):
+        template = cv2.imread(os.path.join(template_dir, f'{i}.jpg'))
+        if template is None:
+            continue
+        template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+        result = cv2.matchTemplate(img_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+        if cv2.minMaxLoc(result)[1] >= 0.8:
+            return i
+    return None
+
+def _bank_search(img, bank):
+    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    for value, template_gray in zip(bank.values(), bank.templates()):
+        result = cv2.matchTemplate(img_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+        if cv2.minMaxLoc(result)[1] >= 0.8:
+            return value
+    return None
+
+def benchmark_template_bank(template_dir="Assets", num_templates=12, iterations=500):
+    """
+    Per-call latency of loading + searching the templates, before (disk read and cvtColor every call)
+    and after (TemplateBank), searching for the last template so every template is scanned.
+    """
+    img = cv2.imread(os.path.join(template_dir, f'{num_templates}.jpg'))
+    bank = TemplateBank(template_dir, num_templates)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        legacy_value = _legacy_load_and_search(img, template_dir, num_templates)
+    legacy = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        bank_value = _bank_search(img, bank)
+    cached = (time.perf_counter() - start) / iterations
+
+    print(f"Legacy load_templates + search : {legacy * 1e6:8.1f} us/call (matched {legacy_value})")
+    print(f"TemplateBank + search          : {cached * 1e6:8.1f} us/call (matched {bank_value}, {bank.load_count} load)")
+
+if __name__ == "__main__":
+    benchmark_template_bank()
+    benchmark_digit_classifier()
@@ -0,0 +1,205 @@
+import time
+from collections import namedtuple
+import numpy as np
+
+# Visibility engine #
+# The z-order is snapshotted once per tick as plain data, then swept top-down once while accumulating the
+# rectangles of the windows already seen: every table gets its visibility and the uncovered fraction of its
+# result rectangle from a single pass, instead of one z-order walk per table.
+
+ZWindow = namedtuple("ZWindow", ["hwnd", "title", "pid", "rect", "visible", "iconic"]) # rect = (left, top, right, bottom)
+TableVisibility = namedtuple("TableVisibility", ["visible", "uncovered_fraction", "occluded_by"])
+
+MINIMIZED_COORD = -32000 # Position Windows gives to minimized windows
+
+def snapshot_z_order(ignore_pids=None, until=None):
+    """
+    Walk the z-order once, from the top window down, and return it as a list of ZWindow.
+    Visible windows of the processes in ignore_pids (our own overlay windows, by default) are left out.
+    If `until` is a set of HWNDs (the tables), the walk stops once all of them have been seen:
+    the windows below the lowest table cannot hide any of them.
+    """
+    import os
+    import win32gui
+    import win32con
+    import win32process
+
+    ignore_pids = {os.getpid()} if ignore_pids is None else set(ignore_pids)
+    z_order = []
+    remaining = set(until) if until is not None else None
+    hwnd = win32gui.GetTopWindow(None)
+    while hwnd:
+        if remaining is not None:
+            if not remaining:
+                break
+            remaining.discard(hwnd)
+        title = win32gui.GetWindowText(hwnd)
+        if win32gui.IsWindowVisible(hwnd):
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            if pid not in ignore_pids:
+                z_order.append(ZWindow(hwnd, title, pid, tuple(win32gui.GetWindowRect(hwnd)), True, bool(win32gui.IsIconic(hwnd))))
+        else:
+            z_order.append(ZWindow(hwnd, title, 0, (0, 0, 0, 0), False, False)) # Invisible windows never occlude
+        hwnd = win32gui.GetWindow(hwnd, win32con.GW_HWNDNEXT)
+    return z_order
+
+def _union_area(rects):
+    """
+    Exact area of the union of rectangles (left, top, right, bottom), by coordinate compression.
+    """
+    if not len(rects):
+        return 0
+    rects = np.asarray(rects)
+    xs = np.unique(rects[:, [0, 2]])
+    ys = np.unique(rects[:, [1, 3]])
+    covered = np.zeros((len(ys) - 1, len(xs) - 1), dtype=bool)
+    x_index = np.searchsorted(xs, rects[:, [0, 2]]).tolist()
+    y_index = np.searchsorted(ys, rects[:, [1, 3]]).tolist()
+    for (x0, x1), (y0, y1) in zip(x_index, y_index):
+        covered[y0:y1, x0:x1] = True
+    cell_areas = np.outer(np.diff(ys), np.diff(xs))
+    return int(cell_areas[covered].sum())
+
+def uncovered_fraction(target, occluders):
+    """
+    Fraction of the target rectangle not covered by the occluder rectangles.
+    """
+    left, top, right, bottom = target
+    area = (right - left) * (bottom - top)
+    if area <= 0:
+        return 0.0
+    if not len(occluders):
+        return 1.0
+    clipped = np.column_stack((
+        np.maximum(occluders[:, 0], left), np.maximum(occluders[:, 1], top),
+        np.minimum(occluders[:, 2], right), np.minimum(occluders[:, 3], bottom),
+    ))
+    clipped = clipped[(clipped[:, 0] < clipped[:, 2]) & (clipped[:, 1] < clipped[:, 3])]
+    return 1.0 - _union_area(clipped) / area
+
+def compute_visibility(z_order, tables, explorer_pid=None, result_rects=None):
+    """
+    Sweep the z-order snapshot once, top-down, and compute the visibility of every table.
+    A table is visible if it is shown, not minimized and no window above it overlaps it (the taskbar,
+    an untitled explorer.exe window, is ignored). The uncovered fraction is computed on its result rectangle.
+    Parameters:
+    - z_order (list): List of ZWindow from the top window down (see snapshot_z_order).
+    - tables (iterable): HWNDs of the tables.
+    - explorer_pid (int): PID of explorer.exe, to recognize the taskbar.
+    - result_rects (dict): Optional {hwnd: (left, top, right, bottom)} absolute result rectangles; the whole
+      table rectangle is used when missing.
+    Returns:
+    - dict: {hwnd: TableVisibility(visible, uncovered_fraction, occluded_by)}
+    """
+    tables = set(tables)
+    remaining = len(tables)
+    result_rects = result_rects or {}
+    occluders = np.empty((len(z_order), 4), dtype=np.int64)
+    owners = []
+    count = 0
+    visibility = {}
+
+    for window in z_order:
+        if not remaining:
+            break # Every table has been reached, the windows below cannot hide them
+        if not window.visible:
+            continue
+        rect = window.rect
+
+        if window.hwnd in tables:
+            remaining -= 1
+            if window.iconic or rect[0] == MINIMIZED_COORD or rect[1] == MINIMIZED_COORD:
+                visibility[window.hwnd] = TableVisibility(False, 0.0, None)
+                continue
+            above = occluders[:count]
+            overlaps = np.flatnonzero((above[:, 0] < rect[2]) & (above[:, 2] > rect[0]) &
+                                      (above[:, 1] < rect[3]) & (above[:, 3] > rect[1]))
+            target = result_rects.get(window.hwnd, rect)
+            visibility[window.hwnd] = TableVisibility(
+                not len(overlaps),
+                uncovered_fraction(target, above[overlaps]) if len(overlaps) else 1.0,
+                owners[overlaps[0]] if len(overlaps) else None,
+            )
+
+        if window.pid == explorer_pid and explorer_pid is not None and window.title == "":
+            continue # The taskbar may overlap the tables without hiding their content
+        if rect[0] == MINIMIZED_COORD or rect[2] <= rect[0] or rect[3] <= rect[1]:
+            continue
+        occluders[count] = rect
+        owners.append(window.hwnd)
+        count += 1
+
+    for hwnd in tables - visibility.keys():
+        visibility[hwnd] = TableVisibility(False, 0.0, None) # Not in the z-order (closed or hidden)
+    return visibility
+
+def build_synthetic_desktop(num_windows=500, num_tables=12, seed=0, explorer_pid=4, wmx_pid=4242):
+    """
+    Build a random z-order: a taskbar on top, num_tables tables tiled on a 1920x1080 screen and spread through
+    the upper half of the z-order, and foreign windows (mostly hidden, like most top-level windows).
+    Returns (z_order, table_hwnds).
+    """
+    rng = np.random.default_rng(seed)
+    z_order = [ZWindow(0x10, "", explorer_pid, (0, 1040, 1920, 1080), True, False)] # Taskbar on top
+    table_positions = sorted(rng.choice(np.arange(1, num_windows // 2), size=num_tables, replace=False).tolist())
+    tables = []
+    for i in range(1, num_windows):
+        if table_positions and i == table_positions[0]:
+            table_positions.pop(0)
+            n = len(tables)
+            left, top = (n % 4) * 480 + (n // 12) * 40, ((n // 4) % 3) * 340 + (n // 12) * 40
+            hwnd = 0x2000 + n
+            z_order.append(ZWindow(hwnd, f"Winamax Table {n}", wmx_pid, (left, top, left + 480, top + 340), True, False))
+            tables.append(hwnd)
+        else:
+            left, top = int(rng.integers(0, 1900)), int(rng.integers(0, 1060))
+            width, height = int(rng.integers(20, 200)), int(rng.integers(20, 200))
+            z_order.append(ZWindow(0x10000 + i, f"Window {i}", 1000 + i, (left, top, left + width, top + height),
+                                   bool(rng.random() < 0.05), False)) # Most top-level windows are hidden
+    return z_order, tables
+
+def _legacy_visibility(z_order, table, explorer_pid):
+    """
+    Per-table z-order walk of the former is_window_visible_, on the snapshot. Returns (visible, window visits).
+    """
+    rect = next(window.rect for window in z_order if window.hwnd == table)
+    visits = 0
+    for window in z_order:
+        visits += 1
+        if window.hwnd == table:
+            return True, visits
+        if window.visible:
+            top_rect = window.rect
+            if rect[0] < top_rect[2] and rect[2] > top_rect[0] and rect[1] < top_rect[3] and rect[3] > top_rect[1]:
+                if window.pid == explorer_pid:
+                    return window.title == "", visits
+                return False, visits
+    return True, visits
+
+def benchmark_visibility(num_windows=500, table_counts=(1, 12, 24), iterations=50):
+    """
+    Per-tick cost of the visibility of every table: one walk per table (legacy) against one sweep.
+    Window visits stand for the Win32 calls made on a real desktop (about 4 per visited window).
+    """
+    for num_tables in table_counts:
+        z_order, tables = build_synthetic_desktop(num_windows, num_tables)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            visits = sum(_legacy_visibility(z_order, table, 4)[1] for table in tables)
+        legacy = (time.perf_counter() - start) / iterations
+
+        # The snapshot stops at the lowest table (snapshot_z_order(until=tables))
+        lowest = max(i for i, window in enumerate(z_order) if window.hwnd in tables)
+        snapshot = z_order[:lowest + 1]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            visibility = compute_visibility(snapshot, tables, explorer_pid=4)
+        sweep = (time.perf_counter() - start) / iterations
+
+        visible = sum(v.visible for v in visibility.values())
+        print(f"{num_windows} windows, {num_tables:2d} tables: per-table walks {legacy * 1e3:6.2f} ms ({visits:5d} window visits) "
+              f"| single sweep {sweep * 1e3:6.2f} ms ({len(snapshot):3d} window visits), {visible} visible")
+
+if __name__ == "__main__":
+    benchmark_visibility()
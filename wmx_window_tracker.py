@@ -0,0 +1,391 @@
+import time
+import logging
+import threading
+from collections import namedtuple
+
+# Window tracker #
+# Incremental model of the Winamax windows, kept up to date by window events (WinEvent hooks on Windows)
+# instead of rebuilding the whole HWND list with EnumWindows on every tick.
+
+# WinEvent constants (winuser.h)
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_SYSTEM_MINIMIZESTART = 0x0016
+EVENT_SYSTEM_MINIMIZEEND = 0x0017
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+EVENT_OBJECT_NAMECHANGE = 0x800C
+
+# Event ranges hooked by Win32EventSource
+HOOKED_EVENT_RANGES = (
+    (EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND),
+    (EVENT_SYSTEM_MINIMIZESTART, EVENT_SYSTEM_MINIMIZEEND),
+    (EVENT_OBJECT_CREATE, EVENT_OBJECT_HIDE),
+    (EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_NAMECHANGE),
+)
+
+WindowInfo = namedtuple("WindowInfo", ["hwnd", "pid", "title", "rect"]) # rect = (left, top, right, bottom)
+
+class Win32EventSource:
+    """
+    Window event source based on SetWinEventHook.
+    The hooks are installed out of context on a dedicated thread running its own message loop,
+    so events are delivered whatever the main loop is doing.
+    """
+
+    OBJID_WINDOW = 0
+    CHILDID_SELF = 0
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    WM_QUIT = 0x0012
+    GA_ROOT = 2
+
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes
+        import win32gui
+        import win32process
+        self._ctypes = ctypes
+        self._win32gui = win32gui
+        self._win32process = win32process
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._user32.GetAncestor.argtypes = [ctypes.wintypes.HWND, ctypes.wintypes.UINT]
+        self._user32.GetAncestor.restype = ctypes.wintypes.HWND
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+
+    def start(self, callback):
+        self._callback = callback
+        self._thread = threading.Thread(target=self._run, name="winevent-hooks", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        ctypes = self._ctypes
+        wintypes = ctypes.wintypes
+        user32 = self._user32
+
+        WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [wintypes.UINT, wintypes.UINT, wintypes.HMODULE, WinEventProc,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.UINT]
+        user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+
+        def on_event(hook, event, hwnd, id_object, id_child, event_thread, event_time):
+            if hwnd and id_object == self.OBJID_WINDOW and id_child == self.CHILDID_SELF:
+                try:
+                    self._callback(event, hwnd)
+                except Exception as e:
+                    logging.error("Error while handling window event %#x for HWND %s: %s", event, hwnd, e)
+
+        self._proc = WinEventProc(on_event) # Keep a reference, the hooks call it until they are removed
+        self._thread_id = self._kernel32.GetCurrentThreadId()
+        hooks = [user32.SetWinEventHook(low, high, None, self._proc, 0, 0,
+                                        self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS)
+                 for low, high in HOOKED_EVENT_RANGES]
+        if not all(hooks):
+            logging.error("Some window event hooks could not be installed.")
+        self._ready.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        if self._thread is not None and self._thread_id is not None:
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def pid_of(self, hwnd):
+        """
+        Return the PID owning a window, or None if it does not exist anymore.
+        """
+        try:
+            _, pid = self._win32process.GetWindowThreadProcessId(hwnd)
+        except Exception:
+            return None
+        return pid or None
+
+    def is_top_level(self, hwnd):
+        """
+        Return True for a top-level window (the hooks also report the child windows).
+        """
+        return self._user32.GetAncestor(hwnd, self.GA_ROOT) == hwnd
+
+    def query(self, hwnd):
+        """
+        Return the WindowInfo of a window, or None if it does not exist anymore.
+        """
+        win32gui = self._win32gui
+        try:
+            if not win32gui.IsWindow(hwnd):
+                return None
+            _, pid = self._win32process.GetWindowThreadProcessId(hwnd)
+            return WindowInfo(hwnd, pid, win32gui.GetWindowText(hwnd), tuple(win32gui.GetWindowRect(hwnd)))
+        except Exception:
+            return None # The window was destroyed while being queried
+
+    def enumerate(self):
+        """
+        Return the HWND of every top-level window.
+        """
+        hwnds = []
+        self._win32gui.EnumWindows(lambda hwnd, _: hwnds.append(hwnd), None)
+        return hwnds
+
+class ScriptedEventSource:
+    """
+    Fake window system driven by a script, to test and benchmark the tracker on any platform.
+    Every change to the fake desktop emits the matching event synchronously, like a hook would, child windows
+    included.
+    """
+
+    def __init__(self):
+        self._windows = {}
+        self._parents = {} # {hwnd: parent hwnd} of the child windows
+        self._callback = None
+        self.queries = 0 # Full queries (title and rect)
+        self.pid_queries = 0
+        self.events = 0
+
+    def start(self, callback):
+        self._callback = callback
+
+    def stop(self):
+        self._callback = None
+
+    def pid_of(self, hwnd):
+        self.pid_queries += 1
+        info = self._windows.get(hwnd)
+        return info.pid if info is not None else None
+
+    def is_top_level(self, hwnd):
+        return hwnd not in self._parents
+
+    def query(self, hwnd):
+        self.queries += 1
+        return self._windows.get(hwnd)
+
+    def enumerate(self):
+        return [hwnd for hwnd in self._windows if hwnd not in self._parents]
+
+    def _emit(self, event, hwnd):
+        self.events += 1
+        if self._callback is not None:
+            self._callback(event, hwnd)
+
+    def create_window(self, hwnd, pid, title, rect=(0, 0, 800, 600), parent=None):
+        self._windows[hwnd] = WindowInfo(hwnd, pid, title, tuple(rect))
+        if parent is not None:
+            self._parents[hwnd] = parent
+        self._emit(EVENT_OBJECT_CREATE, hwnd)
+        self._emit(EVENT_OBJECT_SHOW, hwnd)
+
+    def destroy_window(self, hwnd):
+        self._windows.pop(hwnd, None)
+        self._parents.pop(hwnd, None)
+        self._emit(EVENT_OBJECT_DESTROY, hwnd)
+
+    def move_window(self, hwnd, rect):
+        self._windows[hwnd] = self._windows[hwnd]._replace(rect=tuple(rect))
+        self._emit(EVENT_OBJECT_LOCATIONCHANGE, hwnd)
+
+    def rename_window(self, hwnd, title):
+        self._windows[hwnd] = self._windows[hwnd]._replace(title=title)
+        self._emit(EVENT_OBJECT_NAMECHANGE, hwnd)
+
+    def set_foreground(self, hwnd):
+        self._emit(EVENT_SYSTEM_FOREGROUND, hwnd)
+
+    def play(self, script):
+        """
+        Apply a list of (method_name, *args) steps, e.g. ("move_window", hwnd, rect).
+        """
+        for step in script:
+            getattr(self, step[0])(*step[1:])
+
+class WindowTracker:
+    """
+    Incremental model of the windows owned by the Winamax processes.
+    Parameters:
+    - source: Event source (Win32EventSource on Windows, ScriptedEventSource to run it anywhere else).
+    - on_change (callable): Optional function called (from the event thread) on every change of the model.
+    """
+
+    def __init__(self, source, on_change=None):
+        self.source = source
+        self.on_change = on_change
+        self._windows = {} # {hwnd: WindowInfo}
+        self._pids = frozenset()
+        self._lock = threading.RLock()
+        self._changed = threading.Event()
+        self.foreground = None
+        self.version = 0 # Incremented on every change of the model
+        self.events_received = 0
+        self.resyncs = 0
+
+    def start(self):
+        self.source.start(self._on_event)
+
+    def stop(self):
+        self.source.stop()
+
+    def _mark_changed(self):
+        self.version += 1
+        self._changed.set()
+        if self.on_change is not None:
+            self.on_change()
+
+    def set_pids(self, pids):
+        """
+        Set the Winamax PIDs whose windows are tracked. A full resync is done only when they change.
+        """
+        pids = frozenset(pids)
+        if pids != self._pids:
+            with self._lock:
+                self._pids = pids
+            self.resync()
+
+    def resync(self):
+        """
+        Rebuild the model from a full enumeration of the top-level windows.
+        """
+        with self._lock:
+            windows = {}
+            if self._pids:
+                for hwnd in self.source.enumerate():
+                    info = self.source.query(hwnd)
+                    if info is not None and info.pid in self._pids:
+                        windows[hwnd] = info
+            self._windows = windows
+            self.resyncs += 1
+            self._mark_changed()
+        logging.debug("Window tracker resynced: %s Winamax windows", len(windows))
+
+    def _on_event(self, event, hwnd):
+        self.events_received += 1
+        if event == EVENT_SYSTEM_FOREGROUND:
+            with self._lock:
+                previous, self.foreground = self.foreground, hwnd
+                if hwnd in self._windows or previous in self._windows:
+                    self._mark_changed() # A table came to the front, or another window covers it now
+            return
+
+        pids = self._pids
+        if not pids:
+            return # Winamax is not running, nothing to track
+
+        if event == EVENT_OBJECT_DESTROY:
+            with self._lock:
+                if self._windows.pop(hwnd, None) is not None:
+                    self._mark_changed()
+            return
+
+        if event == EVENT_OBJECT_LOCATIONCHANGE and hwnd not in self._windows:
+            return # Most frequent event by far, only relevant for the tracked windows
+
+        # Cheapest checks first, outside the lock: the owner PID, then top-level only (like resync), then the
+        # title and rect of the Winamax windows only
+        info = None
+        if self.source.pid_of(hwnd) in pids and self.source.is_top_level(hwnd):
+            info = self.source.query(hwnd)
+        with self._lock:
+            if info is not None and info.pid in self._pids:
+                if self._windows.get(hwnd) != info:
+                    self._windows[hwnd] = info
+                    self._mark_changed()
+            elif self._windows.pop(hwnd, None) is not None:
+                self._mark_changed()
+
+    def windows(self):
+        """
+        Return the tracked windows as a list of (hwnd, title), same format as get_wmx_hwnd_and_title_.
+        """
+        with self._lock:
+            return [(hwnd, info.title) for hwnd, info in self._windows.items()]
+
+    def info(self, hwnd):
+        """
+        Return the cached WindowInfo of a tracked window, or None.
+        """
+        with self._lock:
+            return self._windows.get(hwnd)
+
+    def wait_for_change(self, timeout=None):
+        """
+        Block until the model changes or the timeout expires. Returns True if a change happened.
+        """
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+def build_scripted_desktop(num_windows=500, num_tables=12, wmx_pid=4242):
+    """
+    Build a ScriptedEventSource with num_windows foreign windows, the Winamax lobby and num_tables tables.
+    """
+    source = ScriptedEventSource()
+    for i in range(num_windows):
+        source.create_window(0x10000 + i, 1000 + i % 50, f"Window {i}", (i % 40 * 40, i % 20 * 40, i % 40 * 40 + 600, i % 20 * 40 + 400))
+    source.create_window(0x1000, wmx_pid, "Winamax", (0, 0, 1414, 800))
+    for i in range(num_tables):
+        source.create_window(0x2000 + i, wmx_pid, f"Winamax Table {i}", (i % 4 * 480, i // 4 * 360, i % 4 * 480 + 800, i // 4 * 360 + 560))
+    return source
+
+def benchmark_window_tracker(num_windows=500, num_tables=12, ticks=200, events_per_tick=5):
+    """
+    Compare a full enumeration per tick (EnumWindows + PID/title query of every window) with the
+    incremental tracker receiving a few events per tick, on a scripted desktop.
+    """
+    wmx_pid = 4242
+    source = build_scripted_desktop(num_windows, num_tables, wmx_pid)
+    hwnds = source.enumerate()
+
+    start = time.perf_counter()
+    queries_before = source.queries
+    for _ in range(ticks):
+        [(info.hwnd, info.title) for info in map(source.query, source.enumerate()) if info.pid == wmx_pid]
+    polling = (time.perf_counter() - start) / ticks
+    polling_queries = (source.queries - queries_before) / ticks
+
+    def play_moves(tick):
+        for i in range(events_per_tick):
+            hwnd = hwnds[(tick * events_per_tick + i) % len(hwnds)]
+            rect = source._windows[hwnd].rect
+            source.move_window(hwnd, (rect[0] + 1, rect[1], rect[2] + 1, rect[3]))
+
+    # Cost of the scripted desktop alone, subtracted from the tracker timing
+    start = time.perf_counter()
+    for tick in range(ticks):
+        play_moves(tick)
+    script_only = (time.perf_counter() - start) / ticks
+
+    tracker = WindowTracker(source)
+    tracker.start()
+    tracker.set_pids([wmx_pid])
+    queries_before = source.queries
+    start = time.perf_counter()
+    for tick in range(ticks):
+        play_moves(tick)
+        tracker.windows()
+    incremental = (time.perf_counter() - start) / ticks - script_only
+    incremental_queries = (source.queries - queries_before) / ticks
+    tracker.stop()
+
+    print(f"{num_windows} windows, {num_tables} tables, {events_per_tick} move events per tick")
+    print(f"Polling     : {polling * 1e6:8.1f} us/tick, {polling_queries:.0f} window queries/tick")
+    print(f"Incremental : {incremental * 1e6:8.1f} us/tick, {incremental_queries:.1f} window queries/tick, "
+          f"{len(tracker.windows())} windows tracked")
+
+if __name__ == "__main__":
+    benchmark_window_tracker()
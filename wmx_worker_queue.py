@@ -0,0 +1,142 @@
+import time
+import threading
+from collections import deque
+from wmx_metrics import percentile
+
+# Worker queue #
+# Base of the background queues (OCR executor, screenshot writer): the pending jobs are kept in a deque under a
+# Condition, served by worker threads, and the latencies of the finished jobs are kept in rolling windows and
+# reported as percentiles the same way as the stage timings (wmx_metrics.percentile).
+
+class WorkerQueue:
+    """
+    Pending jobs served by worker threads. A subclass queues its jobs with _put() (the Condition held), runs them in
+    _run(job) and records their timings with _record().
+    Parameters:
+    - latency_window (int): Number of recent jobs kept for the latency metrics.
+    """
+
+    def __init__(self, latency_window=256):
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._running = 0 # Jobs taken by a worker and not finished yet
+        self._latencies = deque(maxlen=latency_window) # Submit to completion, in seconds
+        self._run_times = deque(maxlen=latency_window) # Time spent running the job, in seconds
+        self._threads = []
+
+    def _start(self, names):
+        """
+        Start one worker thread per name.
+        """
+        self._threads = [threading.Thread(target=self._worker, name=name, daemon=True) for name in names]
+        for thread in self._threads:
+            thread.start()
+
+    def _put(self, job):
+        # Called with self._cond held
+        self._pending.append(job)
+        self._cond.notify()
+
+    def _run(self, job):
+        raise NotImplementedError
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return # Closed and queue drained
+                job = self._pending.popleft()
+                self._running += 1
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._cond.notify_all()
+
+    def _record(self, submit_time, start, end):
+        # Called with self._cond held
+        self._latencies.append(end - submit_time)
+        self._run_times.append(end - start)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued job has run. Returns False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _stop(self, wait=True, timeout=None):
+        """
+        Let the workers drain the queue and exit; if wait, wait for them (up to timeout seconds each).
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout)
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def latency_metrics(self, run_label="run"):
+        """
+        Return the p50 and p95 of the submit-to-completion latency and of the run time, in milliseconds.
+        """
+        with self._cond:
+            latencies = sorted(self._latencies)
+            run_times = sorted(self._run_times)
+        return {
+            "latency_p50_ms": percentile(latencies, 0.50) * 1e3,
+            "latency_p95_ms": percentile(latencies, 0.95) * 1e3,
+            f"{run_label}_p50_ms": percentile(run_times, 0.50) * 1e3,
+            f"{run_label}_p95_ms": percentile(run_times, 0.95) * 1e3,
+        }
+
+class _CallQueue(WorkerQueue):
+    # Minimal subclass for the benchmark: runs callables
+
+    def __init__(self, workers=1):
+        super().__init__()
+        self._start([f"call-{i}" for i in range(workers)])
+
+    def submit(self, fn):
+        with self._cond:
+            self._put((fn, time.perf_counter()))
+
+    def _run(self, job):
+        fn, submit_time = job
+        start = time.perf_counter()
+        fn()
+        end = time.perf_counter()
+        with self._cond:
+            self._record(submit_time, start, end)
+
+def benchmark_worker_queue(jobs=2000, workers=1):
+    """
+    Hand-off cost of the queue: submit time on the caller thread and submit-to-completion latency of empty jobs.
+    """
+    queue = _CallQueue(workers)
+    start = time.perf_counter()
+    for _ in range(jobs):
+        queue.submit(lambda: None)
+    submit = (time.perf_counter() - start) / jobs
+    queue.flush()
+    queue._stop()
+    metrics = queue.latency_metrics()
+    print(f"{jobs} empty jobs, {workers} worker(s): submit {submit * 1e6:.2f} us on the caller thread | "
+          f"latency p50 {metrics['latency_p50_ms']:.3f} ms, p95 {metrics['latency_p95_ms']:.3f} ms")
+
+if __name__ == "__main__":
+    benchmark_worker_queue()